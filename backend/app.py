@@ -7,11 +7,14 @@ Forex Signal API
 """
 
 import sys
+import time
 from pathlib import Path
 
+_APP_IMPORT_STARTED = time.perf_counter()
+
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from flask_mail import Mail, Message
 from pymongo import MongoClient, ReturnDocument
@@ -46,35 +49,63 @@ from config.settings import (
     POLICY_TERMS_VERSION, POLICY_PRIVACY_VERSION,
 )
 import threading
-import time
 
-# Import Yahoo Finance handler (real-time + historical forex data, no API key)
-from utils.yfinance_handler import (
-    get_twelvedata_live_rate,
-    get_twelvedata_historical,
-    get_twelvedata_dataframe,
-    get_twelvedata_multitf,
-    get_all_forex_rates
-)
+from utils.runtime_profile import lazy_import, record_import_timing, runtime_report
+from ml.signal_executor import SignalExecutor, SignalExecutorBusy, generate_signal_task
+from utils.shared_news_cache import SharedNewsStore
+from utils.http_client import http_client
+from utils.event_analyses import EventAnalysisStore, event_analysis_key
+from utils.job_events import TERMINAL_JOB_STATUSES, JobEventHub, sse_event
+from utils.job_wakeup import IdleBackoff, JobWakeup
+from utils.worker_leases import LeaseManager
+from utils.news_deadlines import ALERT_LEAD_SECONDS, AlertDeadlines
+from utils.job_scheduler import CronTrigger, IntervalTrigger, JobScheduler, OnceTrigger
+from utils.notification_outbox import NotificationOutbox
+from utils.expo_push_sender import ExpoReceiptPoller
+from utils.notification_reads import NotificationReadState
+from utils.preference_cache import VersionedPreferenceCache
+from utils.signal_rollups import SignalRollups
+from utils.model_runs import ModelRunRegistry
+from utils.model_outputs import ModelOutputSeries, output_row, query_range
+from utils import fast_json
+from utils.signal_payloads import compact_signals, parse_fields
+from utils.sync_cursor import CursorError, decode_cursor, fetch_page, page_cursors, page_etag
+
+
+# Yahoo Finance handler (pandas + yfinance) is imported on first use so the
+# API role does not pay its import time and RSS at cold start.
+def _market_data():
+    return lazy_import('utils.yfinance_handler')
+
+
+def get_twelvedata_live_rate(*args, **kwargs):
+    return _market_data().get_twelvedata_live_rate(*args, **kwargs)
+
 
-# Import Market Analyst (News & AI)
+def get_twelvedata_dataframe(*args, **kwargs):
+    return _market_data().get_twelvedata_dataframe(*args, **kwargs)
+
+
+def get_twelvedata_multitf(*args, **kwargs):
+    return _market_data().get_twelvedata_multitf(*args, **kwargs)
+
+
+def get_all_forex_rates(*args, **kwargs):
+    return _market_data().get_all_forex_rates(*args, **kwargs)
+
+
+# Import Market Analyst (News & AI); google-genai itself loads on the first AI call.
 try:
-    from utils.market_analyst import market_analyst
+    _market_analyst_module = lazy_import('utils.market_analyst')
+    market_analyst = _market_analyst_module.market_analyst
+    EVENT_ANALYSIS_AI_FAILED = _market_analyst_module.EVENT_ANALYSIS_AI_FAILED
+    EVENT_ANALYSIS_ERROR = _market_analyst_module.EVENT_ANALYSIS_ERROR
     print("[OK] market_analyst loaded", flush=True)
 except Exception as _e:
     print(f"[CRITICAL] market_analyst import failed: {_e}", flush=True)
     import traceback; traceback.print_exc()
     raise
 
-# Import GBDT Signal Generator (trained multi-timeframe model)
-try:
-    from ml.signal_generator_gbdt import get_signal_generator_gbdt
-    print("[OK] signal_generator_gbdt loaded", flush=True)
-except Exception as _e:
-    print(f"[CRITICAL] signal_generator_gbdt import failed: {_e}", flush=True)
-    import traceback; traceback.print_exc()
-    raise
-
 # Import Push Notification Service
 from utils.push_notifications import push_service
 
@@ -157,6 +188,73 @@ def _parse_float_query_param(name: str):
     except (TypeError, ValueError):
         return None, jsonify({'success': False, 'error': f'{name} must be numeric'}), 400
 
+
+def _parse_sync_cursor_params():
+    """since/before keyset cursors -> ((since, before), error_response, status)."""
+    from bson import ObjectId
+
+    def to_id(raw):
+        return ObjectId(raw) if ObjectId.is_valid(raw) else raw
+
+    cursors = []
+    for name in ('since', 'before'):
+        raw_value = request.args.get(name)
+        if raw_value in (None, ''):
+            cursors.append(None)
+            continue
+        try:
+            cursors.append(decode_cursor(raw_value, to_id))
+        except CursorError:
+            return None, jsonify({'success': False, 'error': f'{name} cursor is invalid'}), 400
+    return tuple(cursors), None, None
+
+
+def _fast_json_response(payload, status: int = 200):
+    """Compact JSON via the fast encoder, gzipped when large and the client accepts it."""
+    body, gzipped = fast_json.maybe_gzip(fast_json.dumps(payload), request.headers.get('Accept-Encoding'))
+    response = Response(body, status=status, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if gzipped:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def _conditional_json(body_factory, etag: str, cache_control: str = 'no-cache'):
+    """304 when the client already has this ETag, otherwise the JSON body built lazily."""
+    # Weak: the gzipped and plain bodies are the same representation for revalidation purposes
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = _fast_json_response(body_factory())
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def _parse_signal_payload_params():
+    """fields= projection and format=full|compact -> ((projection, compact), error_response, status)."""
+    try:
+        projection = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return None, jsonify({'success': False, 'error': str(e)}), 400
+    response_format = str(request.args.get('format', 'full')).strip().lower()
+    if response_format not in ('full', 'compact'):
+        return None, jsonify({'success': False, 'error': 'format must be full or compact'}), 400
+    return (projection, response_format == 'compact'), None, None
+
+
+def _signal_rows_payload(rows, compact: bool):
+    """Serialisable rows plus, in compact mode, the shared provenance dictionary keyed by run_id."""
+    model_runs.attach(rows)
+    for row in rows:
+        row['_id'] = str(row['_id'])
+        if row.get('created_at'):
+            row['created_at'] = row['created_at'].isoformat()
+    if not compact:
+        return rows, {}
+    rows, provenance = compact_signals(rows)
+    return rows, {'format': 'compact', 'provenance': provenance}
+
 # ==================== BACKGROUND JOB MONITORING ====================
 
 _background_jobs = {}
@@ -169,6 +267,10 @@ _BACKGROUND_JOB_STALE_SECONDS = {
     'signal_generator': 180,
     'pair_analysis_preloader': 900,
     'pair_analysis_worker': 900,
+    'event_analysis_precompute': 900,
+    'notification_fanout': 300,
+    'expo_receipts': 1800,
+    'model_runs_migration': 600,
 }
 
 
@@ -194,102 +296,237 @@ BACKGROUND_WORKERS_ENABLED = _env_bool(
     default=(APP_PROCESS_ROLE in ('all', 'worker'))
 )
 
+# The GBDT model (numpy/pandas/joblib + boosters) is only loaded where signals are
+# generated. API-only processes serve the latest stored signal instead.
+SIGNAL_MODEL_ENABLED = _env_bool('SIGNAL_MODEL_ENABLED', default=BACKGROUND_WORKERS_ENABLED)
+
+# gunicorn --preload: the model is loaded and warmed in the master so forked workers
+# share its pages copy-on-write; threads and Mongo clients are (re)created post-fork
+# by start_post_fork_services() (see gunicorn.conf.py).
+PRELOAD_MODE = _env_bool('GUNICORN_PRELOAD_APP', default=False)
+_post_fork_threads = []
+_post_fork_started = False
+
 WORKER_INSTANCE_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
 job_locks_collection = None
 analysis_jobs_collection = None
+notification_outbox_collection = None
+notification_deliveries_collection = None
+push_tickets_collection = None
+notification_read_state_collection = None
+signal_rollups_collection = None
+model_runs_collection = None
+# Model provenance lives once per run in model_runs; signals store provenance_ref and reads join it back.
+model_runs = ModelRunRegistry()
+model_outputs_collection = None
+
+# Every generator cycle's probabilities go to the model_outputs time-series collection (batched inserts).
+try:
+    MODEL_OUTPUTS_RETENTION_DAYS = max(1, int(os.environ.get('MODEL_OUTPUTS_RETENTION_DAYS', '90')))
+except Exception:
+    MODEL_OUTPUTS_RETENTION_DAYS = 90
 
+try:
+    MODEL_OUTPUTS_FLUSH_ROWS = max(1, int(os.environ.get('MODEL_OUTPUTS_FLUSH_ROWS', '5')))
+except Exception:
+    MODEL_OUTPUTS_FLUSH_ROWS = 5
 
-def _acquire_worker_lock(job_name: str, ttl_seconds: int):
-    if job_locks_collection is None:
-        return True
+model_outputs = ModelOutputSeries(flush_rows=MODEL_OUTPUTS_FLUSH_ROWS)
+# Only auto-generated signals (and legacy ones without a source) are public/trusted.
+TRUSTED_SIGNAL_SOURCES = ['auto', None]
+# /signals/stats reads per-pair rollups kept up to date by the signal generator.
+signal_rollups = SignalRollups(trusted_match={'source': {'$in': TRUSTED_SIGNAL_SOURCES}})
+# In-app read state lives per user (watermark + sparse read set + cached unread count),
+# not as read_by arrays on every broadcast notification.
+in_app_reads = NotificationReadState()
 
-    now = datetime.now(timezone.utc)
-    expires_at = now + timedelta(seconds=max(int(ttl_seconds or 60), 30))
 
-    try:
-        doc = job_locks_collection.find_one_and_update(
-            {
-                '_id': job_name,
-                '$or': [
-                    {'expires_at': {'$lte': now}},
-                    {'owner_id': WORKER_INSTANCE_ID},
-                ],
-            },
-            {
-                '$set': {
-                    'owner_id': WORKER_INSTANCE_ID,
-                    'updated_at': now,
-                    'expires_at': expires_at,
-                },
-                '$setOnInsert': {
-                    'created_at': now,
-                },
-            },
-            upsert=True,
-            return_document=ReturnDocument.AFTER,
-        )
-        return bool(doc and doc.get('owner_id') == WORKER_INSTANCE_ID)
-    except Exception as lock_err:
-        logger.warning(f'Worker lock acquire fallback for {job_name}: {lock_err}')
-        return True
+# Leases live in job_locks: singleton jobs elect one leader, queue-style jobs run up to N
+# sharded consumers across processes. One heartbeat per process renews all of them.
+try:
+    LEASE_HEARTBEAT_SECONDS = max(5, int(os.environ.get('LEASE_HEARTBEAT_SECONDS', '30')))
+except Exception:
+    LEASE_HEARTBEAT_SECONDS = 30
 
+try:
+    LEASE_STANDBY_RETRY_SECONDS = max(5, int(os.environ.get('LEASE_STANDBY_RETRY_SECONDS', '60')))
+except Exception:
+    LEASE_STANDBY_RETRY_SECONDS = 60
 
-def _renew_worker_lock(job_name: str, ttl_seconds: int):
-    if job_locks_collection is None:
-        return True
+worker_leases = LeaseManager(owner_id=lambda: WORKER_INSTANCE_ID, heartbeat_seconds=LEASE_HEARTBEAT_SECONDS)
+_lease_context = threading.local()
 
-    now = datetime.now(timezone.utc)
-    expires_at = now + timedelta(seconds=max(int(ttl_seconds or 60), 30))
+# Push notifications go through a durable outbox (notification_outbox + notification_deliveries);
+# producers write one document, fan-out workers resolve recipients and send in Expo batches.
+try:
+    NOTIFICATION_FANOUT_WORKERS = max(1, int(os.environ.get('NOTIFICATION_FANOUT_WORKERS', '2')))
+except Exception:
+    NOTIFICATION_FANOUT_WORKERS = 2
 
-    try:
-        result = job_locks_collection.update_one(
-            {
-                '_id': job_name,
-                'owner_id': WORKER_INSTANCE_ID,
-            },
-            {
-                '$set': {
-                    'updated_at': now,
-                    'expires_at': expires_at,
-                },
-            },
-        )
-        return result.matched_count > 0
-    except Exception as lock_err:
-        logger.warning(f'Worker lock renew fallback for {job_name}: {lock_err}')
-        return True
+try:
+    NOTIFICATION_MAX_ATTEMPTS = max(1, int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', '5')))
+except Exception:
+    NOTIFICATION_MAX_ATTEMPTS = 5
 
+try:
+    NOTIFICATION_FANOUT_IDLE_MAX_SECONDS = max(1, int(os.environ.get('NOTIFICATION_FANOUT_IDLE_MAX_SECONDS', '30')))
+except Exception:
+    NOTIFICATION_FANOUT_IDLE_MAX_SECONDS = 30
 
-def _release_worker_lock(job_name: str):
-    if job_locks_collection is None:
-        return
+# In-app feed endpoints cache each user's news visibility in-process; the read-state
+# document's prefs_version invalidates it across processes, the TTL bounds staleness.
+try:
+    NOTIFICATION_PREFS_CACHE_TTL_SECONDS = max(1, int(os.environ.get('NOTIFICATION_PREFS_CACHE_TTL_SECONDS', '300')))
+except Exception:
+    NOTIFICATION_PREFS_CACHE_TTL_SECONDS = 300
 
-    try:
-        job_locks_collection.delete_one({'_id': job_name, 'owner_id': WORKER_INSTANCE_ID})
-    except Exception as lock_err:
-        logger.warning(f'Worker lock release failed for {job_name}: {lock_err}')
+try:
+    NOTIFICATION_PREFS_CACHE_MAX_ENTRIES = max(1, int(os.environ.get('NOTIFICATION_PREFS_CACHE_MAX_ENTRIES', '10000')))
+except Exception:
+    NOTIFICATION_PREFS_CACHE_MAX_ENTRIES = 10000
+
+try:
+    EXPO_RECEIPTS_POLL_SECONDS = max(60, int(os.environ.get('EXPO_RECEIPTS_POLL_SECONDS', '300')))
+except Exception:
+    EXPO_RECEIPTS_POLL_SECONDS = 300
+
+try:
+    EXPO_RECEIPTS_DELAY_SECONDS = max(0, int(os.environ.get('EXPO_RECEIPTS_DELAY_SECONDS', '900')))
+except Exception:
+    EXPO_RECEIPTS_DELAY_SECONDS = 900
+
+notification_outbox = NotificationOutbox(
+    resolve_recipients=push_service.resolve_recipients,
+    build_messages=push_service.build_messages,
+    send_batch=push_service.send_expo_batch,
+    owner_id=lambda: WORKER_INSTANCE_ID,
+    batch_size=push_service.sender.max_in_flight * 100,
+    max_attempts=NOTIFICATION_MAX_ATTEMPTS,
+)
+expo_receipts = ExpoReceiptPoller(
+    push_service.sender,
+    prune_tokens=push_service.prune_tokens,
+    delay_seconds=EXPO_RECEIPTS_DELAY_SECONDS,
+)
+
+
+def _acquire_worker_lock(job_name: str, ttl_seconds: int, slots: int = 1):
+    """Acquire a free lease slot for job_name; returns the lease id or None."""
+    return worker_leases.acquire(job_name, ttl_seconds, slots=slots)
 
 
-def _start_background_job(job_name: str, target, lock_ttl_seconds: int = 300):
+def _renew_worker_lock(job_name: str, ttl_seconds: int):
+    """True while the calling job thread still holds its lease (renewed by the shared heartbeat)."""
+    lease_id = getattr(_lease_context, 'lease_id', None) or job_name
+    return worker_leases.renew(lease_id)
+
+
+def _release_worker_lock(lease_id: str):
+    worker_leases.release(lease_id)
+
+
+def _start_background_job(job_name: str, target, lock_ttl_seconds: int = 300, slots: int = 1):
+    """Run a long-lived target (queue consumer / deadline loop) under a lease.
+
+    Periodic jobs go through _schedule_background_job instead. slots > 1 starts
+    that many consumers in this process, each holding its own job#i slot, so the
+    fleet as a whole never runs more than slots consumers. A consumer that finds
+    every slot taken (or loses its lease) stays on standby and keeps retrying,
+    so another process takes over when the holder dies.
+    """
     if not BACKGROUND_WORKERS_ENABLED:
         update_background_job_state(job_name, 'disabled', f'background disabled (role={APP_PROCESS_ROLE})')
         logger.info(f'Skipping background job {job_name} (role={APP_PROCESS_ROLE})')
         return False
 
     def _runner():
-        if not _acquire_worker_lock(job_name, lock_ttl_seconds):
-            update_background_job_state(job_name, 'skipped', 'lock held by another worker')
-            logger.info(f'Skipping background job {job_name} (lock held)')
-            return
+        while True:
+            lease_id = _acquire_worker_lock(job_name, lock_ttl_seconds, slots=slots)
+            if not lease_id:
+                update_background_job_state(job_name, 'standby', 'all lease slots held by other workers')
+                time.sleep(LEASE_STANDBY_RETRY_SECONDS)
+                continue
+
+            _lease_context.lease_id = lease_id
+            try:
+                target()
+            finally:
+                lease_lost = not worker_leases.renew(lease_id)
+                _lease_context.lease_id = None
+                _release_worker_lock(lease_id)
+
+            if not lease_lost:
+                return
+            time.sleep(LEASE_STANDBY_RETRY_SECONDS)
+
+    for _ in range(max(1, int(slots))):
+        _start_thread(_runner)
+    return True
+
+
+# Periodic jobs share one dispatcher thread; singleton runs are gated by the same leases.
+job_scheduler = JobScheduler(
+    leases=worker_leases,
+    on_error=lambda name, message: update_background_job_state(name, 'error', message),
+    on_standby=lambda name, message: update_background_job_state(name, 'standby', message),
+)
+_job_scheduler_started = False
 
-        try:
-            target()
-        finally:
-            _release_worker_lock(job_name)
 
-    threading.Thread(target=_runner, daemon=True).start()
+def _schedule_background_job(job_name: str, func, trigger, lock_ttl_seconds: int = 300, jitter_seconds: float = 0):
+    """Register a periodic (or one-shot) job with the shared scheduler under a singleton lease."""
+    global _job_scheduler_started
+    if not BACKGROUND_WORKERS_ENABLED:
+        update_background_job_state(job_name, 'disabled', f'background disabled (role={APP_PROCESS_ROLE})')
+        logger.info(f'Skipping background job {job_name} (role={APP_PROCESS_ROLE})')
+        return False
+
+    job_scheduler.add_job(job_name, func, trigger, jitter_seconds=jitter_seconds, lease_ttl_seconds=lock_ttl_seconds)
+    if not _job_scheduler_started:
+        _job_scheduler_started = True
+        _start_thread(job_scheduler.run)
     return True
 
+
+def _start_thread(target):
+    """Start a daemon thread now, or after fork when the app is preloaded by gunicorn."""
+    if PRELOAD_MODE and not _post_fork_started:
+        _post_fork_threads.append(target)
+        return
+    threading.Thread(target=target, daemon=True).start()
+
+
+def start_post_fork_services():
+    """Called in each gunicorn worker after fork (preload mode only)."""
+    global WORKER_INSTANCE_ID, _post_fork_started
+    if _post_fork_started:
+        return
+
+    # Still single-threaded here: fork the signal pool now so it shares the preloaded model.
+    if SIGNAL_MODEL_ENABLED:
+        try:
+            signal_executor.prefork()
+        except Exception as e:
+            print(f"[WARN] Signal executor prefork failed: {e}", flush=True)
+
+    # Locks and runtime reports are keyed per process; the master's id was inherited.
+    WORKER_INSTANCE_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    try:
+        _connect_mongo()
+    except Exception as e:
+        print(f"✗ MongoDB post-fork reconnect алдаа: {e}", flush=True)
+    shared_news_store.collection = news_snapshots_collection
+    event_analysis_store.collection = event_analyses_collection
+    push_service.reconnect()
+    market_analyst.reconnect()
+
+    _post_fork_started = True
+    pending = list(_post_fork_threads)
+    _post_fork_threads.clear()
+    for target in pending:
+        threading.Thread(target=target, daemon=True).start()
+    publish_runtime_report()
+
 def update_background_job_state(name: str, status: str, message: str = ''):
     with _background_jobs_lock:
         _background_jobs[name] = {
@@ -324,6 +561,11 @@ def get_background_job_health():
                 'updated_at': updated_at.isoformat() if isinstance(updated_at, datetime) else None,
             }
 
+    # Run-duration histogram, last success and skipped runs for scheduler-driven jobs.
+    for name, schedule in job_scheduler.stats().items():
+        snapshot.setdefault(name, {'status': 'scheduled', 'age_seconds': None, 'message': '', 'updated_at': None})
+        snapshot[name]['schedule'] = schedule
+
     return overall, snapshot
 
 # ==================== DISTRIBUTED RATE LIMIT ====================
@@ -355,6 +597,7 @@ PUBLIC_RATE_LIMIT_DEFAULTS = {
     'signals_history': (30, 60),
     'signals_stats': (30, 60),
     'signals_latest': (30, 60),
+    'signals_outputs': (20, 60),
     'api_news_analyze': (20, 60),
     'api_market_analysis': (25, 60),
 }
@@ -527,7 +770,16 @@ def _drop_non_unique_email_indexes(collection, keep_name: str):
     except Exception as drop_err:
         print(f"[WARN] drop non-unique email index failed: {drop_err}", flush=True)
 
-try:
+def _connect_mongo():
+    """Create the Mongo client and (re)bind the module-level collection handles."""
+    global client, db, users_collection, verification_codes, reset_codes
+    global refresh_tokens_collection, signals_collection, in_app_notifications
+    global job_locks_collection, analysis_jobs_collection, runtime_reports_collection
+    global news_snapshots_collection, event_analyses_collection
+    global notification_outbox_collection, notification_deliveries_collection, push_tickets_collection
+    global notification_read_state_collection, signal_rollups_collection, model_runs_collection
+    global model_outputs_collection
+
     client = MongoClient(
         MONGO_URI,
         serverSelectionTimeoutMS=5000,
@@ -545,6 +797,32 @@ try:
     in_app_notifications = db['in_app_notifications']  # In-app мэдэгдлүүд
     job_locks_collection = db['job_locks']
     analysis_jobs_collection = db['analysis_jobs']
+    runtime_reports_collection = db['runtime_reports']
+    news_snapshots_collection = db['news_snapshots']
+    event_analyses_collection = db['event_analyses']
+    worker_leases.collection = job_locks_collection
+    notification_outbox_collection = db['notification_outbox']
+    notification_deliveries_collection = db['notification_deliveries']
+    notification_outbox.outbox = notification_outbox_collection
+    notification_outbox.deliveries = notification_deliveries_collection
+    push_tickets_collection = db['push_tickets']
+    notification_outbox.tickets = push_tickets_collection
+    expo_receipts.tickets = push_tickets_collection
+    expo_receipts.deliveries = notification_deliveries_collection
+    notification_read_state_collection = db['notification_read_state']  # Хэрэглэгч бүрийн уншсан төлөв
+    in_app_reads.collection = notification_read_state_collection
+    in_app_reads.notifications = in_app_notifications
+    signal_rollups_collection = db['signal_rollups']  # Pair/өдөр тутмын signal статистик
+    signal_rollups.collection = signal_rollups_collection
+    signal_rollups.signals = signals_collection
+    model_runs_collection = db['model_runs']  # Моделийн provenance, run тутамд нэг удаа
+    model_runs.collection = model_runs_collection
+    model_outputs_collection = db['model_outputs']  # Минут тутмын моделийн гаралт (time-series)
+    model_outputs.collection = model_outputs_collection
+
+
+try:
+    _connect_mongo()
 
     # Reliability indexes for auth flows and query performance.
     _drop_non_unique_email_indexes(users_collection, keep_name='uniq_users_email')
@@ -558,6 +836,8 @@ try:
     _ensure_index(refresh_tokens_collection, 'user_id', name='idx_refresh_user_id')
     _ensure_index(refresh_tokens_collection, 'expires_at', name='ttl_refresh_expires', expireAfterSeconds=0)
     _ensure_index(signals_collection, [('pair', 1), ('created_at', -1)], name='idx_signals_pair_created')
+    # Keyset pages sort on (created_at, _id); with _id in the key the sort stays an index walk per pair
+    _ensure_index(signals_collection, [('pair', 1), ('created_at', -1), ('_id', -1)], name='idx_signals_pair_created_id')
     _ensure_index(signals_collection, [('pair', 1), ('source', 1), ('created_at', -1)], name='idx_signals_pair_source_created')
     _ensure_index(signals_collection, [('run_id', 1), ('created_at', -1)], name='idx_signals_run_id_created')
     _ensure_index(signals_collection, [('model_version', 1), ('created_at', -1)], name='idx_signals_model_version_created')
@@ -572,6 +852,18 @@ try:
         partialFilterExpression={'status': {'$in': ['queued', 'running']}},
     )
     _ensure_index(analysis_jobs_collection, 'expires_at', name='ttl_analysis_jobs_expires', expireAfterSeconds=0)
+    _ensure_index(runtime_reports_collection, 'expires_at', name='ttl_runtime_reports_expires', expireAfterSeconds=0)
+    _ensure_index(event_analyses_collection, 'expires_at', name='ttl_event_analyses_expires', expireAfterSeconds=0)
+    _ensure_index(notification_outbox_collection, [('status', 1), ('available_at', 1)], name='idx_notification_outbox_status_available')
+    _ensure_index(notification_outbox_collection, 'expires_at', name='ttl_notification_outbox_expires', expireAfterSeconds=0)
+    _ensure_index(
+        notification_deliveries_collection,
+        [('outbox_id', 1), ('status', 1), ('next_attempt_at', 1)],
+        name='idx_notification_deliveries_outbox_status_next',
+    )
+    _ensure_index(notification_deliveries_collection, 'expires_at', name='ttl_notification_deliveries_expires', expireAfterSeconds=0)
+    _ensure_index(push_tickets_collection, 'sent_at', name='idx_push_tickets_sent')
+    _ensure_index(push_tickets_collection, 'expires_at', name='ttl_push_tickets_expires', expireAfterSeconds=0)
 
     # Migration: drop conflicting old index if it exists
     try:
@@ -591,6 +883,12 @@ try:
         in_app_notifications.create_index('expires_at', expireAfterSeconds=0)
     except Exception as idx_err:
         print(f"[WARN] in_app_notifications TTL index: {idx_err}", flush=True)
+    _ensure_index(in_app_notifications, [('created_at', 1), ('type', 1)], name='idx_in_app_created_type')
+    _ensure_index(in_app_notifications, [('created_at', -1), ('_id', -1)], name='idx_in_app_created_id')
+    try:
+        model_outputs.ensure_collection(db, retention_days=MODEL_OUTPUTS_RETENTION_DAYS)
+    except Exception as ts_err:
+        print(f"[WARN] model_outputs collection setup: {ts_err}", flush=True)
     print("✓ MongoDB холбогдлоо", flush=True)
 except Exception as e:
     print(f"✗ MongoDB холбогдох алдаа: {e}", flush=True)
@@ -605,6 +903,7 @@ def load_signal_generator():
     update_background_job_state('signal_model_loader', 'starting', 'Loading GBDT model')
     
     try:
+        get_signal_generator_gbdt = lazy_import('ml.signal_generator_gbdt').get_signal_generator_gbdt
         signal_generator = get_signal_generator_gbdt()
         if signal_generator.is_loaded:
             print("✓ GBDT Signal Generator ачаалагдлаа (Trained Multi-TF Ensemble)")
@@ -621,8 +920,59 @@ def load_signal_generator():
         update_background_job_state('signal_model_loader', 'error', str(e))
         return False
 
-# Load on startup in background thread (avoid blocking gunicorn bind)
-_start_background_job('signal_model_loader', load_signal_generator, lock_ttl_seconds=600)
+try:
+    SIGNAL_EXECUTOR_WORKERS = max(0, int(os.environ.get('SIGNAL_EXECUTOR_WORKERS', '1')))
+except Exception:
+    SIGNAL_EXECUTOR_WORKERS = 1
+
+# The pool only protects request threads. The worker role has none, and its
+# background threads are already running by the time a pool could be forked, so
+# it generates inline (and keeps a single model copy). `python app.py` does the
+# same: spawn/forkserver children would re-run this script as __mp_main__.
+if APP_PROCESS_ROLE == 'worker' or __name__ == '__main__':
+    SIGNAL_EXECUTOR_WORKERS = 0
+
+try:
+    SIGNAL_EXECUTOR_MAX_PENDING = max(1, int(os.environ.get('SIGNAL_EXECUTOR_MAX_PENDING', '4')))
+except Exception:
+    SIGNAL_EXECUTOR_MAX_PENDING = 4
+
+try:
+    SIGNAL_EXECUTOR_TIMEOUT_SECONDS = max(5, int(os.environ.get('SIGNAL_EXECUTOR_TIMEOUT_SECONDS', '60')))
+except Exception:
+    SIGNAL_EXECUTOR_TIMEOUT_SECONDS = 60
+
+# generate_signal is pandas/numpy heavy and holds the GIL; run it in a bounded
+# process pool so the other gunicorn threads keep serving cheap endpoints.
+signal_executor = SignalExecutor(
+    workers=SIGNAL_EXECUTOR_WORKERS,
+    max_pending=SIGNAL_EXECUTOR_MAX_PENDING,
+    timeout_seconds=SIGNAL_EXECUTOR_TIMEOUT_SECONDS,
+)
+
+
+def _generate_signal(**kwargs):
+    return signal_executor.run(generate_signal_task, **kwargs)
+
+
+def _signal_busy_response(busy: SignalExecutorBusy):
+    return jsonify({
+        'success': False,
+        'error': 'Signal тооцоолол түр ачаалалтай байна. Түр хүлээгээд дахин оролдоно уу.',
+        'retry_after': busy.retry_after,
+    }), 429
+
+# Load on startup in background thread (avoid blocking gunicorn bind).
+# Every signal-generating process needs its own copy, so no shared job lock here.
+if SIGNAL_MODEL_ENABLED and PRELOAD_MODE:
+    # Load + warm before fork so every worker shares the ensemble pages.
+    if load_signal_generator() and not signal_generator.warmup():
+        logger.warning('GBDT warmup failed before fork')
+elif SIGNAL_MODEL_ENABLED:
+    threading.Thread(target=load_signal_generator, daemon=True).start()
+else:
+    update_background_job_state('signal_model_loader', 'disabled', f'model disabled (role={APP_PROCESS_ROLE})')
+    logger.info(f'Skipping GBDT model load (role={APP_PROCESS_ROLE})')
 
 # ==================== PRELOAD HISTORICAL DATA ====================
 
@@ -645,12 +995,44 @@ def preload_historical_data():
     return False
 
 # Preload on startup in background thread (avoid blocking gunicorn bind)
-_start_background_job('historical_preload', preload_historical_data, lock_ttl_seconds=600)
+_schedule_background_job('historical_preload', preload_historical_data, OnceTrigger(), lock_ttl_seconds=600)
+
+
+def migrate_signal_provenance():
+    """Signals written before model_runs existed: move their embedded provenance out (idempotent)."""
+    update_background_job_state('model_runs_migration', 'starting', 'Moving embedded provenance to model_runs')
+    try:
+        result = model_runs.migrate(signals_collection)
+        update_background_job_state(
+            'model_runs_migration', 'ok', f"Migrated {result['migrated']} signals across {result['runs']} runs"
+        )
+    except Exception as e:
+        update_background_job_state('model_runs_migration', 'error', str(e))
+
+
+_schedule_background_job('model_runs_migration', migrate_signal_provenance, OnceTrigger(), lock_ttl_seconds=600)
 
 # ==================== NEWS CACHE SYSTEM ====================
 
+try:
+    NEWS_CACHE_CHECK_SECONDS = max(1, int(os.environ.get('NEWS_CACHE_CHECK_SECONDS', '15')))
+except Exception:
+    NEWS_CACHE_CHECK_SECONDS = 15
+
+try:
+    NEWS_CACHE_STALE_SECONDS = max(60, int(os.environ.get('NEWS_CACHE_STALE_SECONDS', '3600')))
+except Exception:
+    NEWS_CACHE_STALE_SECONDS = 3600
+
+
 class NewsCache:
-    def __init__(self):
+    """News cache filled by the worker's news_updater and shared via a versioned Mongo snapshot.
+
+    Only the worker role refreshes news; API processes read the shared snapshot
+    (re-read only when its version changes) instead of calling providers per request.
+    """
+
+    def __init__(self, shared_store=None):
         self.cache = {
             'history': None,
             'upcoming': None,
@@ -659,16 +1041,20 @@ class NewsCache:
         }
         self.last_updated = None
         self.lock = threading.Lock()
+        self.shared_store = shared_store
+        self._updated = threading.Event()
 
     def update(self):
         """Update all news categories in cache"""
         print("[INFO] Updating news cache...")
         try:
-            # Fetch latest data
-            history = market_analyst.get_news_history()
-            upcoming = market_analyst.get_upcoming_news()
-            outlook = market_analyst.get_market_outlook()
-            latest = market_analyst.get_latest_news()
+            # One calendar + news fetch per cycle, partitioned locally for each view
+            # (the outlook prompt builder reuses the same news set).
+            ingest = market_analyst.build_calendar_ingest()
+            history = market_analyst.get_news_history(ingest=ingest)
+            upcoming = market_analyst.get_upcoming_news(ingest=ingest)
+            outlook = market_analyst.get_market_outlook(ingest=ingest)
+            latest = market_analyst.get_latest_news(ingest=ingest)
 
             # Push dispatch is handled by the dedicated news scheduler below.
             # Avoid sending/marking events during cache refresh, which can suppress
@@ -681,7 +1067,13 @@ class NewsCache:
                 self.cache['outlook'] = outlook
                 self.cache['latest'] = latest
                 self.last_updated = datetime.now()
-            print("[OK] News cache updated successfully")
+                snapshot = dict(self.cache)
+
+            version = None
+            if self.shared_store is not None:
+                version = self.shared_store.publish(snapshot, publisher=WORKER_INSTANCE_ID)
+            self._updated.set()
+            print(f"[OK] News cache updated successfully (shared version={version})")
         except Exception as e:
             print(f"[ERROR] News cache update failed: {e}")
 
@@ -717,89 +1109,171 @@ class NewsCache:
                 event_title = event.get('title', event.get('event', 'Economic News'))
                 event_key = f"{event.get('date', '')}_{event_title}_{event.get('currency', '')}"
                 
-                # Skip if already notified
-                if push_service.is_event_notified(event_key):
+                # One atomic claim: only the worker that inserts the marker notifies
+                if not push_service.claim_event_notification(event_key):
                     continue
-                    
-                push_service.mark_event_notified(event_key)
 
-                # Save in-app notification (always, regardless of push permission)
                 currency = event.get('currency', event.get('country', 'USD'))
-                impact_emoji = "\U0001f534" if impact == "high" else "\U0001f7e1"
-                save_in_app_notification(
-                    ntype='news',
-                    title=f"{impact_emoji} {currency} - News Alert",
-                    body=event_title,
-                    data={'impact': impact, 'currency': currency}
-                )
+                outbox_id, created = notification_outbox.enqueue_once('news', {
+                    'title': event_title,
+                    'impact': impact,
+                    'currency': currency,
+                    'description': event.get('forecast', event.get('description', '')),
+                }, dedupe_key=f"news:{event_key}")
+                if not outbox_id:
+                    # Not durable: give the claim back so the next update retries this event
+                    push_service.release_event_notification(event_key)
+                    continue
 
-                threading.Thread(
-                    target=push_service.send_news_notification,
-                    args=({
-                        'title': event_title,
-                        'impact': impact,
-                        'currency': currency,
-                        'description': event.get('forecast', event.get('description', '')),
-                    },),
-                    daemon=True
-                ).start()
+                # In-app notification (regardless of push permission) only from the worker whose
+                # outbox write created the alert; a fail-open claim must not duplicate it.
+                if created:
+                    impact_emoji = "\U0001f534" if impact == "high" else "\U0001f7e1"
+                    save_in_app_notification(
+                        ntype='news',
+                        title=f"{impact_emoji} {currency} - News Alert",
+                        body=event_title,
+                        data={'impact': impact, 'currency': currency}
+                    )
+
+    def wait_for_update(self, timeout):
+        """Block until the next local update() or timeout; True when woken by an update."""
+        updated = self._updated.wait(max(0.0, timeout))
+        self._updated.clear()
+        return updated
 
     def get(self, key):
-        """Get data from cache"""
+        """Get data from cache (local copy first, then the shared snapshot)"""
         with self.lock:
-            return self.cache.get(key)
-        
+            value = self.cache.get(key)
+        if value is not None or self.shared_store is None:
+            return value
+        return self.shared_store.get(key)
+
+    def metadata(self):
+        """Version/age of the data served by get(); stale when the updater has stopped publishing."""
+        if self.shared_store is not None:
+            meta = self.shared_store.metadata()
+            if meta.get('version') is not None:
+                return meta
+
+        with self.lock:
+            last_updated = self.last_updated
+        age_seconds = int((datetime.now() - last_updated).total_seconds()) if last_updated else None
+        return {
+            'version': None,
+            'updated_at': last_updated.isoformat() if last_updated else None,
+            'age_seconds': age_seconds,
+            'stale': age_seconds is None or age_seconds > NEWS_CACHE_STALE_SECONDS,
+        }
+
     def is_ready(self):
         with self.lock:
-            return self.last_updated is not None
+            if self.last_updated is not None:
+                return True
+        return self.shared_store is not None and self.shared_store.metadata().get('version') is not None
 
-news_cache = NewsCache()
+# News alerts fire NEWS_ALERT_LEAD_SECONDS before each event (deadline heap, see news_notification_scheduler)
+try:
+    NEWS_ALERT_LEAD_SECONDS = max(60, int(os.environ.get('NEWS_ALERT_LEAD_SECONDS', str(ALERT_LEAD_SECONDS))))
+except Exception:
+    NEWS_ALERT_LEAD_SECONDS = ALERT_LEAD_SECONDS
+
+NEWS_SCHEDULER_MAX_SLEEP_SECONDS = 300
+
+shared_news_store = SharedNewsStore(
+    news_snapshots_collection,
+    check_interval_seconds=NEWS_CACHE_CHECK_SECONDS,
+    stale_after_seconds=NEWS_CACHE_STALE_SECONDS,
+)
+news_cache = NewsCache(shared_store=shared_news_store)
 
 def news_updater_task():
-    """Background task to update news every 30 minutes"""
-    print("[INFO] Starting background news updater...")
-    update_background_job_state('news_updater', 'starting', 'News updater started')
-    if not _renew_worker_lock('news_updater', 3900):
-        update_background_job_state('news_updater', 'error', 'Worker lock unavailable at start')
-        return
+    """News cache refresh; scheduled on the hour and half hour, when most calendar releases land."""
+    news_cache.update()
+    update_background_job_state('news_updater', 'ok', 'Cache update complete')
+
+# Start background updater (once at startup, then every 30 minutes)
+_schedule_background_job(
+    'news_updater',
+    news_updater_task,
+    CronTrigger('*/30 * * * *', run_at_start=True),
+    lock_ttl_seconds=3900,
+    jitter_seconds=60,
+)
 
-    # Initial update
-    try:
-        news_cache.update()
-        update_background_job_state('news_updater', 'ok', 'Initial cache update complete')
-    except Exception as e:
-        update_background_job_state('news_updater', 'error', f'Initial update failed: {e}')
-    
-    while True:
-        if not _renew_worker_lock('news_updater', 3900):
-            update_background_job_state('news_updater', 'error', 'Worker lock lost')
-            return
+# ==================== NEWS NOTIFICATION SCHEDULER ====================
+# Sleeps until the next event deadline, sends notifications 10 min before event
+
+def _upcoming_events(upcoming):
+    if isinstance(upcoming, dict):
+        return upcoming.get('events', upcoming.get('data', []))
+    if isinstance(upcoming, list):
+        return upcoming
+    return []
+
+
+def _send_scheduled_news_alert(event, event_time, event_key):
+    """Push + in-app alert for one event; True once the event is claimed and its push is in the outbox."""
+    raw_impact = str(event.get('impact', event.get('sentiment', ''))).lower()
+    if raw_impact in ('high', 'red', '3', 'critical'):
+        impact = 'high'
+    elif raw_impact in ('medium', 'orange', '2', 'yellow'):
+        impact = 'medium'
+    else:
+        impact = 'low'
 
-        # Sleep for 30 minutes (1800 seconds)
-        time.sleep(1800)
-        try:
-            news_cache.update()
-            update_background_job_state('news_updater', 'ok', 'Periodic cache update complete')
-        except Exception as e:
-            print(f"[WARN] News updater loop error: {e}")
-            update_background_job_state('news_updater', 'error', str(e))
+    event_title = event.get('title', event.get('event_name', 'Economic News'))
+    time_str = event_time.strftime("%H:%M UTC")
+    currency = event.get('currency', 'USD')
 
-# Start background updater
-_start_background_job('news_updater', news_updater_task, lock_ttl_seconds=3900)
+    if not push_service.claim_event_notification(event_key):
+        print(f"[INFO] Scheduled news notification already claimed: {event_title}")
+        return True
+
+    # The outbox owns delivery and per-device retries; the alert is handed off once it is durable.
+    outbox_id, created = notification_outbox.enqueue_once('news', {
+        'title': event_title,
+        'impact': impact,
+        'currency': currency,
+        'description': event.get('forecast', event.get('description', '')),
+        'event_time': time_str,
+    }, dedupe_key=f"news:{event_key}")
+
+    if outbox_id:
+        # Only the worker that created the outbox document writes the in-app copy
+        if created:
+            impact_emoji = "\U0001f534" if impact == "high" else "\U0001f7e1" if impact == "medium" else "\U0001f7e2"
+            save_in_app_notification(
+                ntype='news',
+                title=f"{impact_emoji} {currency} - News Alert",
+                body=f"\u23f0 {time_str}\n{event_title}",
+                data={'impact': impact, 'currency': currency, 'event_time': time_str}
+            )
+
+        print(f"[INFO] Scheduled news notification queued: {event_title} at {time_str} ({impact}) outbox={outbox_id}")
+        return True
+
+    push_service.release_event_notification(event_key)
+    print(f"[INFO] News notification not queued, retry later: {event_title} ({impact})")
+    return False
 
-# ==================== NEWS NOTIFICATION SCHEDULER ====================
-# Checks upcoming events every 2 minutes, sends notifications 10 min before event
 
 def news_notification_scheduler():
-    """10 минутын өмнө мэдээний мэдэгдэл илгээх scheduler"""
+    """10 минутын өмнө мэдээний мэдэгдэл илгээх scheduler.
+
+    Upcoming events are kept in a deadline heap that is rebuilt only when the news
+    snapshot changes; the loop sleeps until the next alert time or a news update.
+    """
     print("[INFO] Starting news notification scheduler (10-min advance alerts)...")
     update_background_job_state('news_scheduler', 'starting', 'Scheduler starting')
     if not _renew_worker_lock('news_scheduler', 360):
         update_background_job_state('news_scheduler', 'error', 'Worker lock unavailable at start')
         return
 
-    time.sleep(30)  # Wait for initial news cache to load
-    
+    deadlines = AlertDeadlines(lead_seconds=NEWS_ALERT_LEAD_SECONDS)
+    snapshot = None
+
     while True:
         if not _renew_worker_lock('news_scheduler', 360):
             update_background_job_state('news_scheduler', 'error', 'Worker lock lost')
@@ -807,111 +1281,176 @@ def news_notification_scheduler():
 
         try:
             upcoming = news_cache.get('upcoming')
-            if upcoming:
-                events = []
-                if isinstance(upcoming, dict):
-                    events = upcoming.get('events', upcoming.get('data', []))
-                elif isinstance(upcoming, list):
-                    events = upcoming
-                
-                now = datetime.now(timezone.utc)
-                
-                for event in events:
-                    if not isinstance(event, dict):
-                        continue
-                    
-                    # Parse event time
-                    date_str = event.get('date', '')
-                    if not date_str:
-                        continue
-                    
-                    try:
-                        # Handle raw TradingView date (before _format_event) or formatted date
-                        raw = event.get('raw', {})
-                        raw_date = raw.get('date', date_str) if raw else date_str
-                        
-                        if 'T' in str(raw_date):
-                            event_time = datetime.fromisoformat(str(raw_date).replace('Z', '+00:00'))
-                        else:
-                            # Try parsing formatted "YYYY-MM-DD HH:MM"
-                            event_time = datetime.strptime(str(raw_date), "%Y-%m-%d %H:%M")
-                            event_time = event_time.replace(tzinfo=timezone.utc)
-                    except (ValueError, TypeError):
-                        continue
-                    
-                    # Check if event is within a practical notification window.
-                    # A wider range helps recover from brief downtime/cache lag.
-                    diff_minutes = (event_time - now).total_seconds() / 60
-                    if 0 <= diff_minutes <= 20:
-                        raw_impact = str(event.get('impact', event.get('sentiment', ''))).lower()
-                        if raw_impact in ('high', 'red', '3', 'critical'):
-                            impact = 'high'
-                        elif raw_impact in ('medium', 'orange', '2', 'yellow'):
-                            impact = 'medium'
-                        else:
-                            impact = 'low'
-                        
-                        event_title = event.get('title', event.get('event_name', 'Economic News'))
-                        event_key = f"sched_{date_str}_{event_title}"
-                        
-                        if push_service.is_event_notified(event_key):
-                            continue
-
-                        time_str = event_time.strftime("%H:%M UTC")
-                        currency = event.get('currency', 'USD')
-
-                        send_result = push_service.send_news_notification({
-                            'title': event_title,
-                            'impact': impact,
-                            'currency': currency,
-                            'description': event.get('forecast', event.get('description', '')),
-                            'event_time': time_str,
-                        })
-
-                        sent_count = 0
-                        total_count = 0
-                        if isinstance(send_result, dict):
-                            try:
-                                sent_count = int(send_result.get('sent', 0))
-                            except Exception:
-                                sent_count = 0
-                            try:
-                                total_count = int(send_result.get('total', 0))
-                            except Exception:
-                                total_count = 0
-
-                        # Mark as notified only on full send success.
-                        if (
-                            isinstance(send_result, dict)
-                            and send_result.get('success')
-                            and total_count > 0
-                            and sent_count >= total_count
-                        ):
-                            push_service.mark_event_notified(event_key)
-
-                            impact_emoji = "\U0001f534" if impact == "high" else "\U0001f7e1" if impact == "medium" else "\U0001f7e2"
-                            save_in_app_notification(
-                                ntype='news',
-                                title=f"{impact_emoji} {currency} - News Alert",
-                                body=f"\u23f0 {time_str}\n{event_title}",
-                                data={'impact': impact, 'currency': currency, 'event_time': time_str}
-                            )
-
-                            print(f"[INFO] Scheduled news notification: {event_title} at {time_str} ({impact}) sent={sent_count}/{total_count}")
-                        else:
-                            print(f"[INFO] News notification skipped/retry later: {event_title} ({impact}) result={send_result}")
-
-            update_background_job_state('news_scheduler', 'ok', 'Scheduler loop complete')
-        
+            if upcoming is not None and upcoming is not snapshot:
+                snapshot = upcoming
+                count = deadlines.rebuild(_upcoming_events(upcoming), notified_keys=push_service.notified_event_keys)
+                print(f"[INFO] News alert deadlines rebuilt: {count} pending")
+
+            now = datetime.now(timezone.utc)
+            for event_time, event_key, event in deadlines.pop_due(now):
+                if not _send_scheduled_news_alert(event, event_time, event_key):
+                    deadlines.retry_later(event_time, event_key, event, now=now)
+
+            next_alert_at = deadlines.next_alert_at()
+            update_background_job_state(
+                'news_scheduler',
+                'ok',
+                f"{len(deadlines)} pending, next alert {next_alert_at.isoformat() if next_alert_at else 'none'}",
+            )
         except Exception as e:
             print(f"[WARN] News notification scheduler error: {e}")
             update_background_job_state('news_scheduler', 'error', str(e))
-        
-        time.sleep(120)  # Check every 2 minutes
+
+        # Sleep until the next alert; a local news update wakes us early. The cap bounds how
+        # long a snapshot published by another process (or a lost lease) goes unnoticed.
+        delay = deadlines.seconds_until_next()
+        news_cache.wait_for_update(min(delay, NEWS_SCHEDULER_MAX_SLEEP_SECONDS) if delay is not None else NEWS_SCHEDULER_MAX_SLEEP_SECONDS)
 
 # Start news notification scheduler
 _start_background_job('news_scheduler', news_notification_scheduler, lock_ttl_seconds=360)
 
+# ==================== NOTIFICATION FAN-OUT ====================
+
+def notification_fanout_worker():
+    """Claim outbox documents and deliver them; wakes on enqueue, backs off while idle."""
+    print('[INFO] Starting notification fan-out worker...')
+    update_background_job_state('notification_fanout', 'starting', 'Fan-out worker started')
+    idle_backoff = IdleBackoff(min_seconds=1, max_seconds=NOTIFICATION_FANOUT_IDLE_MAX_SECONDS)
+    notification_outbox.wakeup.watch(notification_outbox_collection)
+
+    while True:
+        if not _renew_worker_lock('notification_fanout', 300):
+            update_background_job_state('notification_fanout', 'error', 'Worker lock lost')
+            return
+
+        try:
+            worked = notification_outbox.run_once()
+        except Exception as e:
+            print(f"[WARN] Notification fan-out claim failed: {e}", flush=True)
+            worked = False
+
+        if worked:
+            idle_backoff.reset()
+            update_background_job_state('notification_fanout', 'ok', 'Delivering notifications')
+        else:
+            update_background_job_state('notification_fanout', 'ok', 'Outbox idle')
+            notification_outbox.wakeup.wait(idle_backoff.next_delay())
+
+
+_start_background_job('notification_fanout', notification_fanout_worker, lock_ttl_seconds=300, slots=NOTIFICATION_FANOUT_WORKERS)
+
+
+def poll_expo_receipts():
+    """Fetch Expo push receipts for sent tickets; records late failures and prunes dead tokens."""
+    result = expo_receipts.poll_once()
+    update_background_job_state(
+        'expo_receipts',
+        'ok',
+        f"checked={result['checked']} ok={result['ok']} error={result['error']} pruned={result['pruned']}",
+    )
+
+
+_schedule_background_job(
+    'expo_receipts',
+    poll_expo_receipts,
+    IntervalTrigger(EXPO_RECEIPTS_POLL_SECONDS, start_delay=60),
+    lock_ttl_seconds=600,
+)
+
+# ==================== EVENT ANALYSIS PRECOMPUTE ====================
+
+try:
+    EVENT_ANALYSIS_PRECOMPUTE_HOURS = max(1, int(os.environ.get('EVENT_ANALYSIS_PRECOMPUTE_HOURS', '48')))
+except Exception:
+    EVENT_ANALYSIS_PRECOMPUTE_HOURS = 48
+
+try:
+    EVENT_ANALYSIS_PRECOMPUTE_MAX_PER_CYCLE = max(1, int(os.environ.get('EVENT_ANALYSIS_PRECOMPUTE_MAX_PER_CYCLE', '10')))
+except Exception:
+    EVENT_ANALYSIS_PRECOMPUTE_MAX_PER_CYCLE = 10
+
+EVENT_ANALYSIS_PRECOMPUTE_INTERVAL_SECONDS = 300
+
+event_analysis_store = EventAnalysisStore(event_analyses_collection)
+
+
+def _is_valid_event_analysis(analysis):
+    return bool(analysis) and analysis not in (EVENT_ANALYSIS_AI_FAILED, EVENT_ANALYSIS_ERROR)
+
+
+def _event_impact_level(event):
+    raw = event.get('raw') if isinstance(event.get('raw'), dict) else {}
+    raw_impact = str(event.get('impact') or raw.get('impact') or event.get('sentiment', '')).lower()
+    if raw_impact in ('high', 'red', '3', 'critical'):
+        return 'high'
+    if raw_impact in ('medium', 'orange', '2', 'yellow'):
+        return 'medium'
+    return 'low'
+
+
+def _event_time_utc(event):
+    raw = event.get('raw') if isinstance(event.get('raw'), dict) else {}
+    raw_date = raw.get('date') or event.get('date')
+    if not raw_date:
+        return None
+    try:
+        if 'T' in str(raw_date):
+            return datetime.fromisoformat(str(raw_date).replace('Z', '+00:00'))
+        return datetime.strptime(str(raw_date), "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+    except (ValueError, TypeError):
+        return None
+
+
+def precompute_event_analyses():
+    """Generate analyses for upcoming high/medium events that are not stored yet. Returns count generated."""
+    upcoming = news_cache.get('upcoming')
+    events = upcoming.get('events', upcoming.get('data', [])) if isinstance(upcoming, dict) else (upcoming or [])
+
+    now = datetime.now(timezone.utc)
+    horizon = now + timedelta(hours=EVENT_ANALYSIS_PRECOMPUTE_HOURS)
+    candidates = []
+    for event in events:
+        if not isinstance(event, dict) or _event_impact_level(event) not in ('high', 'medium'):
+            continue
+        event_time = _event_time_utc(event)
+        if event_time is None or not (now <= event_time <= horizon):
+            continue
+        candidates.append((0 if _event_impact_level(event) == 'high' else 1, event_time, event))
+
+    generated = 0
+    for _priority, _event_time, event in sorted(candidates, key=lambda item: (item[0], item[1])):
+        if generated >= EVENT_ANALYSIS_PRECOMPUTE_MAX_PER_CYCLE:
+            break
+        key = event_analysis_key(event)
+        if event_analysis_store.get(key) is not None:
+            continue
+        _analysis, cached = event_analysis_store.get_or_generate(
+            key,
+            lambda event=event: market_analyst.analyze_specific_event(event),
+            event=event,
+            source='precompute',
+            is_valid=_is_valid_event_analysis,
+        )
+        if not cached:
+            generated += 1
+    return generated
+
+
+def event_analysis_precompute_task():
+    """Upcoming high/medium impact мэдээний AI шинжилгээг урьдчилан бэлдэнэ."""
+    generated = precompute_event_analyses()
+    update_background_job_state('event_analysis_precompute', 'ok', f'Generated {generated} event analyses')
+
+
+# First run waits a minute for the initial news cache to load.
+_schedule_background_job(
+    'event_analysis_precompute',
+    event_analysis_precompute_task,
+    IntervalTrigger(EVENT_ANALYSIS_PRECOMPUTE_INTERVAL_SECONDS, start_delay=60),
+    lock_ttl_seconds=900,
+    jitter_seconds=15,
+)
+
 # ==================== CONTINUOUS SIGNAL GENERATOR ====================
 # Минут тутамд таамаглал гаргаж, итгэлцэл >= 0.9 бол DB-д хадгалж,
 # хэрэглэгчийн босгоос дээш бол push notification илгээнэ.
@@ -936,164 +1475,164 @@ SIGNAL_CACHE_TTL = 60  # seconds
 
 def continuous_signal_generator():
     """
-    Background thread: минут тутамд модел ажиллуулж таамаглал гаргана.
+    Scheduled every 60s: модел ажиллуулж таамаглал гаргана.
     - Итгэлцэл >= 90% бол MongoDB-д хадгална
     - Хэрэглэгч бүрийн signal_threshold-оос дээш бол push мэдэгдэл илгээнэ
     """
-    print("[INFO] Starting continuous signal generator (every 60s)...")
-    update_background_job_state('signal_generator', 'starting', 'Waiting for model readiness')
-    if not _renew_worker_lock('signal_generator', 300):
-        update_background_job_state('signal_generator', 'error', 'Worker lock unavailable at start')
-        return
-
-    # Wait for signal generator to load
-    for _ in range(60):
-        if signal_generator is not None and signal_generator.is_loaded:
-            break
-        time.sleep(2)
-    
     if signal_generator is None or not signal_generator.is_loaded:
-        print("[ERROR] Continuous signal generator: model not loaded, stopping.")
-        update_background_job_state('signal_generator', 'error', 'Model not loaded')
+        with _background_jobs_lock:
+            loader_status = _background_jobs.get('signal_model_loader', {}).get('status')
+        if loader_status == 'starting':
+            update_background_job_state('signal_generator', 'starting', 'Waiting for model readiness')
+        else:
+            update_background_job_state('signal_generator', 'error', 'Model not loaded')
         return
-    
-    print("[OK] Continuous signal generator active.")
-    update_background_job_state('signal_generator', 'ok', 'Signal generator active')
-    
-    while True:
-        if not _renew_worker_lock('signal_generator', 300):
-            update_background_job_state('signal_generator', 'error', 'Worker lock lost')
-            return
 
-        for pair in SIGNAL_PAIRS:
-            try:
-                # Check if market is closed
-                now = datetime.now()
-                if now.weekday() >= 5 or (now.weekday() == 0 and now.hour < 8):
-                    continue  # Skip during weekends
-
-                # Fetch multi-timeframe data
-                multi_tf = get_twelvedata_multitf(symbol=pair, base_bars=5000)
-                if multi_tf is None or "1min" not in multi_tf:
-                    print(f"[WARN] Continuous signal: no data for {pair}")
-                    continue
+    # Stats rollups are derived from existing signals once, before this job starts adding to them
+    try:
+        signal_rollups.ensure_built()
+    except Exception as rollup_err:
+        print(f"[WARN] Signal rollup rebuild failed: {rollup_err}", flush=True)
 
-                df = multi_tf["1min"]
-                if len(df) < 100:
-                    print(f"[WARN] Continuous signal: insufficient data for {pair} ({len(df)} bars)")
-                    continue
+    for pair in SIGNAL_PAIRS:
+        try:
+            # Check if market is closed
+            now = datetime.now()
+            if now.weekday() >= 5 or (now.weekday() == 0 and now.hour < 8):
+                continue  # Skip during weekends
+
+            # Fetch multi-timeframe data
+            multi_tf = get_twelvedata_multitf(symbol=pair, base_bars=5000)
+            if multi_tf is None or "1min" not in multi_tf:
+                print(f"[WARN] Continuous signal: no data for {pair}")
+                continue
+
+            df = multi_tf["1min"]
+            if len(df) < 100:
+                print(f"[WARN] Continuous signal: insufficient data for {pair} ({len(df)} bars)")
+                continue
 
-                # Generate signal with NO minimum confidence filter (we filter after)
-                result = signal_generator.generate_signal(
+            # Generate signal with NO minimum confidence filter (we filter after)
+            try:
+                result = _generate_signal(
                     df_1min=df,
                     multi_tf_data=multi_tf,
                     min_confidence=0.0,  # No filter - we decide based on output
                     symbol=pair.replace('/', '')
                 )
+            except SignalExecutorBusy:
+                print(f"[WARN] Continuous signal: executor busy, skipping {pair} this cycle")
+                continue
 
-                sig_type = result.get('signal', 'HOLD').upper()
-                sig_conf = result.get('confidence', 0)  # This is 0-100 percentage
-                conf_decimal = sig_conf / 100.0 if sig_conf > 1 else sig_conf
+            sig_type = result.get('signal', 'HOLD').upper()
+            sig_conf = result.get('confidence', 0)  # This is 0-100 percentage
+            conf_decimal = sig_conf / 100.0 if sig_conf > 1 else sig_conf
 
-                # For logging: HOLD-д hold_confidence (HOLD-ийн магадлал) харуулна
-                # BUY/SELL-д тухайн signal-ийн confidence харуулна
-                if sig_type == 'HOLD':
-                    hold_conf_pct = result.get('hold_confidence', sig_conf)
-                    dir_signal = result.get('directional_signal', '')
-                    print(f"[SIGNAL] {pair}: HOLD (hold={hold_conf_pct:.1f}%, lean={dir_signal} {sig_conf:.1f}%) (threshold: {SAVE_CONFIDENCE_THRESHOLD*100}%)")
-                else:
-                    print(f"[SIGNAL] {pair}: {sig_type} @ {sig_conf:.1f}% (threshold: {SAVE_CONFIDENCE_THRESHOLD*100}%)")
-
-                # Only process BUY/SELL signals with confidence >= 0.9 (90%)
-                if sig_type in ('BUY', 'SELL') and conf_decimal >= SAVE_CONFIDENCE_THRESHOLD:
-                    model_provenance = _signal_provenance_from_result(result)
-                    # Check duplicate: skip if same signal type within last 5 minutes
-                    cache_key = pair
-                    last = _last_signal_cache.get(cache_key)
-                    if last and last['signal'] == sig_type:
-                        elapsed = (datetime.now(timezone.utc) - last['timestamp']).total_seconds()
-                        if elapsed < 300:  # 5 minutes dedup
-                            print(f"[SKIP] Duplicate {sig_type} for {pair} (last: {elapsed:.0f}s ago)")
-                            continue
-
-                    # Save to MongoDB
-                    signal_doc = {
-                        'pair': pair.replace('/', '_'),
-                        'signal': sig_type,
-                        'confidence': float(sig_conf),
-                        'entry_price': result.get('entry_price'),
+            # For logging: HOLD-д hold_confidence (HOLD-ийн магадлал) харуулна
+            # BUY/SELL-д тухайн signal-ийн confidence харуулна
+            if sig_type == 'HOLD':
+                hold_conf_pct = result.get('hold_confidence', sig_conf)
+                dir_signal = result.get('directional_signal', '')
+                print(f"[SIGNAL] {pair}: HOLD (hold={hold_conf_pct:.1f}%, lean={dir_signal} {sig_conf:.1f}%) (threshold: {SAVE_CONFIDENCE_THRESHOLD*100}%)")
+            else:
+                print(f"[SIGNAL] {pair}: {sig_type} @ {sig_conf:.1f}% (threshold: {SAVE_CONFIDENCE_THRESHOLD*100}%)")
+
+            # Every cycle goes to the time-series history, not only the saved signals
+            try:
+                model_outputs.append(output_row(
+                    pair, result, actionable=sig_type in ('BUY', 'SELL') and conf_decimal >= SAVE_CONFIDENCE_THRESHOLD,
+                ))
+            except Exception as series_err:
+                print(f"[WARN] model_outputs append failed for {pair}: {series_err}", flush=True)
+
+            # Only process BUY/SELL signals with confidence >= 0.9 (90%)
+            if sig_type in ('BUY', 'SELL') and conf_decimal >= SAVE_CONFIDENCE_THRESHOLD:
+                model_provenance = _signal_provenance_from_result(result)
+                # Check duplicate: skip if same signal type within last 5 minutes
+                cache_key = pair
+                last = _last_signal_cache.get(cache_key)
+                if last and last['signal'] == sig_type:
+                    elapsed = (datetime.now(timezone.utc) - last['timestamp']).total_seconds()
+                    if elapsed < 300:  # 5 minutes dedup
+                        print(f"[SKIP] Duplicate {sig_type} for {pair} (last: {elapsed:.0f}s ago)")
+                        continue
+
+                # Save to MongoDB
+                signal_doc = {
+                    'pair': pair.replace('/', '_'),
+                    'signal': sig_type,
+                    'confidence': float(sig_conf),
+                    'entry_price': result.get('entry_price'),
+                    'stop_loss': result.get('stop_loss'),
+                    'take_profit': result.get('take_profit'),
+                    'sl_pips': result.get('sl_pips'),
+                    'tp_pips': result.get('tp_pips'),
+                    'risk_reward': result.get('risk_reward'),
+                    'model_probabilities': result.get('model_probabilities'),
+                    'model_version': result.get('model_version'),
+                    **_signal_provenance_fields(model_provenance),
+                    'run_id': model_provenance.get('run_id'),
+                    'models_agree': result.get('models_agree'),
+                    'atr_pips': result.get('atr_pips'),
+                    'reason': result.get('reason'),
+                    'source': 'auto',  # Mark as auto-generated
+                    'created_at': datetime.now(timezone.utc),
+                    'status': 'active'
+                }
+                db_result = signals_collection.insert_one(signal_doc)
+                print(f"[DB] Signal saved: {sig_type} {pair} @ {sig_conf:.1f}% (ID: {db_result.inserted_id})")
+                try:
+                    signal_rollups.record(signal_doc)
+                except Exception as rollup_err:
+                    print(f"[WARN] Signal rollup update failed: {rollup_err}", flush=True)
+
+                # Update dedup cache
+                _last_signal_cache[cache_key] = {
+                    'signal': sig_type,
+                    'timestamp': datetime.now(timezone.utc)
+                }
+
+                # Save in-app notification (always, regardless of push permission)
+                emoji = "\U0001f4c8" if sig_type == "BUY" else "\U0001f4c9"
+                conf_pct = f"{sig_conf:.1f}%"
+                entry_price = result.get('entry_price', 'N/A')
+                save_in_app_notification(
+                    ntype='signal',
+                    title=f"{emoji} {sig_type} Signal - {pair}",
+                    body=f"Confidence: {conf_pct} | Entry: {entry_price}",
+                    data={
+                        'signal_type': sig_type,
+                        'pair': pair,
+                        'confidence': sig_conf,
+                        'entry_price': entry_price,
                         'stop_loss': result.get('stop_loss'),
                         'take_profit': result.get('take_profit'),
-                        'sl_pips': result.get('sl_pips'),
-                        'tp_pips': result.get('tp_pips'),
-                        'risk_reward': result.get('risk_reward'),
-                        'model_probabilities': result.get('model_probabilities'),
-                        'model_version': result.get('model_version'),
-                        'model_provenance': model_provenance,
-                        'run_id': model_provenance.get('run_id'),
-                        'models_agree': result.get('models_agree'),
-                        'atr_pips': result.get('atr_pips'),
-                        'reason': result.get('reason'),
-                        'source': 'auto',  # Mark as auto-generated
-                        'created_at': datetime.now(timezone.utc),
-                        'status': 'active'
-                    }
-                    db_result = signals_collection.insert_one(signal_doc)
-                    print(f"[DB] Signal saved: {sig_type} {pair} @ {sig_conf:.1f}% (ID: {db_result.inserted_id})")
-
-                    # Update dedup cache
-                    _last_signal_cache[cache_key] = {
-                        'signal': sig_type,
-                        'timestamp': datetime.now(timezone.utc)
                     }
+                )
 
-                    # Save in-app notification (always, regardless of push permission)
-                    emoji = "\U0001f4c8" if sig_type == "BUY" else "\U0001f4c9"
-                    conf_pct = f"{sig_conf:.1f}%"
-                    entry_price = result.get('entry_price', 'N/A')
-                    save_in_app_notification(
-                        ntype='signal',
-                        title=f"{emoji} {sig_type} Signal - {pair}",
-                        body=f"Confidence: {conf_pct} | Entry: {entry_price}",
-                        data={
-                            'signal_type': sig_type,
-                            'pair': pair,
-                            'confidence': sig_conf,
-                            'entry_price': entry_price,
-                            'stop_loss': result.get('stop_loss'),
-                            'take_profit': result.get('take_profit'),
-                        }
-                    )
-
-                    # Send push notification per user threshold
-                    try:
-                        threading.Thread(
-                            target=push_service.send_signal_notification,
-                            args=({
-                                'signal_type': sig_type,
-                                'pair': pair,
-                                'confidence': sig_conf,
-                                'entry_price': result.get('entry_price'),
-                                'sl': result.get('stop_loss'),
-                                'tp': result.get('take_profit'),
-                            },),
-                            daemon=True
-                        ).start()
-                    except Exception as notif_err:
-                        print(f"[WARN] Signal push notification error: {notif_err}")
+                # Push per user threshold via the outbox (fan-out workers do the Expo I/O)
+                try:
+                    notification_outbox.enqueue('signal', {
+                        'signal_type': sig_type,
+                        'pair': pair,
+                        'confidence': sig_conf,
+                        'entry_price': result.get('entry_price'),
+                        'sl': result.get('stop_loss'),
+                        'tp': result.get('take_profit'),
+                    }, dedupe_key=f"signal:{db_result.inserted_id}")
+                except Exception as notif_err:
+                    print(f"[WARN] Signal push notification error: {notif_err}")
 
-            except Exception as e:
-                print(f"[ERROR] Continuous signal error for {pair}: {e}")
-                import traceback
-                traceback.print_exc()
-                update_background_job_state('signal_generator', 'error', f'{pair}: {e}')
+        except Exception as e:
+            print(f"[ERROR] Continuous signal error for {pair}: {e}")
+            import traceback
+            traceback.print_exc()
+            update_background_job_state('signal_generator', 'error', f'{pair}: {e}')
 
-        update_background_job_state('signal_generator', 'ok', 'Signal generation loop complete')
-        # Wait 60 seconds before next cycle
-        time.sleep(60)
+    update_background_job_state('signal_generator', 'ok', 'Signal generation loop complete')
 
-# Start continuous signal generator
-_start_background_job('signal_generator', continuous_signal_generator, lock_ttl_seconds=300)
+# Start continuous signal generator (a cycle still running at the next slot is skipped, not stacked)
+_schedule_background_job('signal_generator', continuous_signal_generator, IntervalTrigger(60), lock_ttl_seconds=300)
 
 # ==================== IN-APP NOTIFICATION HELPERS ====================
 
@@ -1112,7 +1651,6 @@ def save_in_app_notification(ntype: str, title: str, body: str, data: dict = Non
             'data': data or {},
             'created_at': now,
             'expires_at': now + timedelta(minutes=ttl_minutes),
-            'read_by': [],
         }
         in_app_notifications.insert_one(doc)
     except Exception as e:
@@ -1443,6 +1981,16 @@ def _normalize_consent_payload(data):
     }, None
 
 
+def _signal_provenance_fields(provenance):
+    """provenance_ref to the model_runs entry; the provenance stays inline only if it cannot be registered."""
+    try:
+        ref = model_runs.register(provenance)
+    except Exception as e:
+        print(f"[WARN] model_runs register failed, embedding provenance: {e}", flush=True)
+        ref = None
+    return {'provenance_ref': ref} if ref else {'model_provenance': provenance}
+
+
 def _signal_provenance_from_result(result):
     provenance = result.get('model_provenance') if isinstance(result, dict) else None
     if not isinstance(provenance, dict):
@@ -1679,16 +2227,15 @@ def login():
             # Different device detected — send security alert
             client_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
             login_time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-            threading.Thread(
-                target=push_service.send_security_alert,
-                args=(user_id_str, {
+            notification_outbox.enqueue('security', {
+                'user_id': user_id_str,
+                'login_info': {
                     'ip': str(client_ip).split(',')[0].strip() if client_ip else 'Unknown',
                     'platform': platform_name,
                     'device_name': data.get('device_name', platform_name),
                     'login_time': login_time,
-                }),
-                daemon=True
-            ).start()
+                },
+            })
     except Exception as sec_err:
         print(f"[WARN] Security alert check failed: {sec_err}")
     
@@ -1973,6 +2520,7 @@ def unregister_push_token():
         return auth_error
     
     push_service.unregister_token(payload['user_id'])
+    _invalidate_notification_prefs(payload['user_id'])
     return jsonify({'success': True, 'message': 'Push token устгагдлаа'})
 
 @app.route('/notifications/preferences', methods=['GET'])
@@ -2032,6 +2580,7 @@ def update_notification_preferences():
             except Exception as cutoff_err:
                 print(f"[WARN] Failed to persist news_filter_updated_at: {cutoff_err}")
 
+        _invalidate_notification_prefs(payload['user_id'])
         return jsonify({'success': True, 'message': 'Тохиргоо хадгалагдлаа'})
     return jsonify({'error': 'Тохиргоо хадгалж чадсангүй'}), 500
 
@@ -2049,7 +2598,7 @@ def _parse_datetime_safe(value):
     return None
 
 
-def _resolve_news_visibility(user_id: str):
+def _load_news_visibility(user_id: str):
     prefs_doc = push_service.push_tokens.find_one(
         {'user_id': user_id},
         {'news_impact_filter': 1, 'news_filter_updated_at': 1}
@@ -2067,6 +2616,26 @@ def _resolve_news_visibility(user_id: str):
     return allowed_impacts, filter_updated_at
 
 
+news_visibility_cache = VersionedPreferenceCache(
+    _load_news_visibility,
+    ttl_seconds=NOTIFICATION_PREFS_CACHE_TTL_SECONDS,
+    max_entries=NOTIFICATION_PREFS_CACHE_MAX_ENTRIES,
+)
+
+
+def _resolve_news_visibility(user_id: str, read_state):
+    """Cached (allowed_impacts, filter_updated_at); read_state is loaded by the caller anyway."""
+    return news_visibility_cache.get(user_id, in_app_reads.prefs_version(read_state))
+
+
+def _invalidate_notification_prefs(user_id: str):
+    news_visibility_cache.invalidate(user_id)
+    try:
+        in_app_reads.bump_prefs_version(user_id)
+    except Exception as e:
+        print(f"[WARN] Notification prefs version bump failed: {e}", flush=True)
+
+
 def _build_news_query(allowed_impacts, filter_updated_at):
     news_clause = {'type': 'news', 'data.impact': {'$in': allowed_impacts}}
     if filter_updated_at:
@@ -2089,8 +2658,7 @@ def test_push_notification():
         return jsonify({'error': 'Push token бүртгэгдээгүй'}), 404
     
     from utils.push_notifications import EXPO_PUSH_URL
-    import requests as req
-    result = req.post(
+    result = http_client.post(
         EXPO_PUSH_URL,
         json=[{
             "to": doc['push_token'],
@@ -2100,7 +2668,8 @@ def test_push_notification():
             "data": {"type": "test"}
         }],
         headers={"Content-Type": "application/json"},
-        timeout=10
+        upstream="expo_push",
+        timeout=(3.05, 10)
     )
     
     return jsonify({
@@ -2114,7 +2683,8 @@ def get_in_app_notifications():
     """
     In-app мэдэгдлүүдийг авах (push зөвшөөрөлгүй ч ажиллана).
     Auth шаардлагатай.
-    Query params: limit (default 20), type (optional: signal/news/system)
+    Query params: limit (default 20), type (optional: signal/news/system),
+        since / before (optional: next_since / next_before cursors from a previous page)
     """
     payload, auth_error = get_auth_payload_from_request()
     if auth_error:
@@ -2123,12 +2693,17 @@ def get_in_app_notifications():
     limit, limit_error, limit_status = _parse_int_query_param('limit', 20, minimum=1, maximum=50)
     if limit_error:
         return limit_error
+    cursors, cursor_error, cursor_status = _parse_sync_cursor_params()
+    if cursor_error:
+        return cursor_error, cursor_status
+    since, before = cursors
     ntype = request.args.get('type', None)
 
     user_id = payload['user_id']
 
-    # Resolve user's news visibility (impact filter + filter update cutoff)
-    allowed_impacts, filter_updated_at = _resolve_news_visibility(user_id)
+    # Read state first: its prefs_version tells whether the cached news visibility is current
+    read_state = in_app_reads.get(user_id)
+    allowed_impacts, filter_updated_at = _resolve_news_visibility(user_id, read_state)
 
     # Build query: non-news always shown; news filtered by impact preference
     news_clause = _build_news_query(allowed_impacts, filter_updated_at)
@@ -2141,24 +2716,45 @@ def get_in_app_notifications():
             query = {'type': ntype}
 
     try:
-        docs = list(
-            in_app_notifications.find(query, {'_id': 1, 'type': 1, 'title': 1, 'body': 1, 'data': 1, 'created_at': 1, 'read_by': 1})
-            .sort('created_at', -1)
-            .limit(limit)
+        # Keyset page on (created_at, _id): a refresh with since=next_since only returns new items
+        docs, has_more = fetch_page(
+            in_app_notifications, query, limit, since=since, before=before,
+            projection={'_id': 1, 'type': 1, 'title': 1, 'body': 1, 'data': 1, 'created_at': 1},
         )
-        # Convert datetime to ISO string and compute is_read per user
-        for doc in docs:
-            if 'created_at' in doc:
-                doc['created_at'] = doc['created_at'].isoformat()
-            read_by = doc.get('read_by', [])
-            doc['is_read'] = user_id in [str(r) for r in read_by]
-            doc['_id'] = str(doc['_id'])
-        return jsonify({'success': True, 'notifications': docs, 'count': len(docs)})
+        cursors = page_cursors(docs, request.args.get('since'))
+        # Notifications never change after insert; is_read does, so the read/prefs versions are part of the ETag
+        etag = page_etag(docs, has_more, cursors, read_state.get('read_version', 0), in_app_reads.prefs_version(read_state))
+
+        def body():
+            # is_read from the user's read watermark + read set, then ISO dates
+            is_read = in_app_reads.is_read_fn(read_state)
+            for doc in docs:
+                doc['is_read'] = is_read(doc)
+                if 'created_at' in doc:
+                    doc['created_at'] = doc['created_at'].isoformat()
+                doc['_id'] = str(doc['_id'])
+            return {'success': True, 'notifications': docs, 'count': len(docs), 'has_more': has_more, **cursors}
+
+        return _conditional_json(body, etag, cache_control='private, no-cache')
     except Exception as e:
         logger.exception('In-app notifications fetch failed')
         return _public_error_response()
 
 
+def _in_app_unread_count(user_id: str, read_state) -> int:
+    """Unread in-app notifications visible to the user (cached count, topped up incrementally)."""
+    # Resolve user's news visibility (impact filter + filter update cutoff), cached per process
+    allowed_impacts, filter_updated_at = _resolve_news_visibility(user_id, read_state)
+    news_clause = _build_news_query(allowed_impacts, filter_updated_at)
+    visibility_key = f"{','.join(allowed_impacts)}|{filter_updated_at.isoformat() if filter_updated_at else ''}"
+    return in_app_reads.unread_count(
+        user_id,
+        {'$or': [{'type': {'$ne': 'news'}}, news_clause]},
+        visibility_key,
+        state=read_state,
+    )
+
+
 @app.route('/notifications/in-app/unread-count', methods=['GET'])
 def get_unread_notification_count():
     """Уншаагүй мэдэгдлийн тоо буцаах."""
@@ -2168,17 +2764,7 @@ def get_unread_notification_count():
 
     user_id = payload['user_id']
     try:
-        # Resolve user's news visibility (impact filter + filter update cutoff)
-        allowed_impacts, filter_updated_at = _resolve_news_visibility(user_id)
-        news_clause = _build_news_query(allowed_impacts, filter_updated_at)
-
-        count = in_app_notifications.count_documents({
-            'read_by': {'$nin': [user_id]},
-            '$or': [
-                {'type': {'$ne': 'news'}},
-                news_clause
-            ]
-        })
+        count = _in_app_unread_count(user_id, in_app_reads.get(user_id))
         return jsonify({'success': True, 'unread_count': count})
     except Exception as e:
         logger.exception('Unread notification count failed')
@@ -2201,16 +2787,13 @@ def mark_notifications_read():
     try:
         from bson import ObjectId
         if ids:
-            object_ids = [ObjectId(i) for i in ids if i]
-            query_filter = {'_id': {'$in': object_ids}}
+            modified = in_app_reads.mark_ids(user_id, [ObjectId(i) for i in ids if i])
         else:
-            query_filter = {}
-
-        result = in_app_notifications.update_many(
-            {**query_filter, 'read_by': {'$nin': [user_id]}},
-            {'$addToSet': {'read_by': user_id}}
-        )
-        return jsonify({'success': True, 'modified': result.modified_count})
+            # Mark-all only moves this user's watermark; no notification document is touched.
+            # modified stays the number of notifications that were unread before it moved.
+            modified = _in_app_unread_count(user_id, in_app_reads.get(user_id))
+            in_app_reads.mark_all(user_id)
+        return jsonify({'success': True, 'modified': modified})
     except Exception as e:
         logger.exception('In-app mark-read failed')
         return _public_error_response()
@@ -2284,6 +2867,34 @@ def get_specific_rate():
 
 # ==================== SIGNAL GENERATOR ENDPOINTS ====================
 
+def _latest_stored_signal_response(pair: str):
+    """Latest worker-generated signal for processes that do not load the model."""
+    pair_under = pair.replace('/', '_')
+    try:
+        doc = signals_collection.find_one(
+            _trusted_signal_filter_for_pair(pair_under),
+            sort=[('created_at', -1)],
+        )
+    except Exception as e:
+        logger.warning(f'Stored signal lookup failed for {pair}: {e}')
+        return None
+
+    if not doc:
+        return None
+
+    model_runs.attach([doc])
+    doc.pop('_id', None)
+    created_at = doc.get('created_at')
+    if isinstance(created_at, datetime):
+        doc['created_at'] = created_at.isoformat()
+    return {
+        'success': True,
+        **doc,
+        'pair': pair_under,
+        'stored': True,
+    }
+
+
 @app.route('/signal', methods=['GET'])
 def get_signal():
     """
@@ -2297,12 +2908,6 @@ def get_signal():
         if limit_result:
             return limit_result
 
-        if signal_generator is None or not signal_generator.is_loaded:
-            return jsonify({
-                'success': False,
-                'error': 'Signal Generator ачаалагдаагүй'
-            }), 500
-
         min_confidence, min_confidence_error, _min_conf_status = _parse_float_query_param('min_confidence')
         if min_confidence_error:
             return min_confidence_error
@@ -2312,6 +2917,17 @@ def get_signal():
         if pair_error:
             return pair_error
 
+        if not SIGNAL_MODEL_ENABLED:
+            stored = _latest_stored_signal_response(pair)
+            if stored is not None:
+                return jsonify(stored)
+
+        if signal_generator is None or not signal_generator.is_loaded:
+            return jsonify({
+                'success': False,
+                'error': 'Signal Generator ачаалагдаагүй'
+            }), 500
+
         # Check signal response cache (60s TTL)
         cached = _signal_response_cache.get(pair)
         if cached and (time.time() - cached['time']) < SIGNAL_CACHE_TTL:
@@ -2348,7 +2964,7 @@ def get_signal():
         market_closed = now.weekday() >= 5 or (now.weekday() == 0 and now.hour < 8)
 
         conf_threshold = min_confidence / 100.0 if min_confidence > 1 else min_confidence
-        signal = signal_generator.generate_signal(
+        signal = _generate_signal(
             df_1min=df,
             multi_tf_data=multi_tf,
             min_confidence=conf_threshold,
@@ -2378,6 +2994,8 @@ def get_signal():
 
         return jsonify(response_data)
 
+    except SignalExecutorBusy as busy:
+        return _signal_busy_response(busy)
     except Exception as e:
         print(f"Signal error: {e}")
         import traceback
@@ -2411,7 +3029,7 @@ def get_signal_demo():
         df.columns = df.columns.str.lower()
         df = df.tail(500).reset_index(drop=True)
         
-        signal = signal_generator.generate_signal(df, min_confidence)
+        signal = _generate_signal(df_1min=df, min_confidence=min_confidence)
         
         return jsonify({
             'success': True,
@@ -2420,6 +3038,8 @@ def get_signal_demo():
             **signal
         })
         
+    except SignalExecutorBusy as busy:
+        return _signal_busy_response(busy)
     except Exception as e:
         print(f"Signal V2 demo error: {e}")
         logger.exception('Signal demo failed')
@@ -2454,7 +3074,7 @@ def predict():
                 'predictions': {pair: {'signal': 'HOLD', 'confidence': 0}}
             })
 
-        signal = signal_generator.generate_signal(
+        signal = _generate_signal(
             df_1min=multi_tf["1min"],
             multi_tf_data=multi_tf,
             min_confidence=0.60,
@@ -2477,6 +3097,8 @@ def predict():
             }
         })
 
+    except SignalExecutorBusy as busy:
+        return _signal_busy_response(busy)
     except Exception as e:
         print(f"Predict error: {e}")
         logger.exception('Predict failed')
@@ -2558,7 +3180,7 @@ def _trusted_signal_filter_for_pair(pair_under: str):
     pair_slash = pair_under.replace('_', '/')
     return {
         'pair': {'$in': [pair_under, pair_slash]},
-        'source': {'$in': ['auto', None]},
+        'source': {'$in': TRUSTED_SIGNAL_SOURCES},
     }
 
 @app.route('/signal/save', methods=['POST'])
@@ -2639,7 +3261,7 @@ def save_signal(payload):
             'atr_pips': atr_pips,
             'reason': manual_note,
             'model_version': data.get('model_version') or manual_provenance.get('model_version'),
-            'model_provenance': manual_provenance,
+            **_signal_provenance_fields(manual_provenance),
             'run_id': manual_provenance.get('run_id'),
             'source': 'manual',
             'visibility': 'private',
@@ -2677,6 +3299,9 @@ def get_signals_history():
         - limit: Хэдэн signal авах (optional, default: 50)
         - signal_type: BUY/SELL/HOLD (optional)
         - min_confidence: Хамгийн бага итгэлцэл (optional)
+        - since / before: Өмнөх хуудасны next_since / next_before cursor (optional)
+        - fields: Буцаах талбарууд, таслалаар (optional; _id, created_at үргэлж)
+        - format: full (default) | compact — null талбаргүй, model_provenance-ийг run_id-аар нэг удаа
     """
     try:
         limit_result = enforce_public_rate_limit('signals_history')
@@ -2695,6 +3320,14 @@ def get_signals_history():
         min_confidence, min_confidence_error, _min_conf_status = _parse_float_query_param('min_confidence')
         if min_confidence_error:
             return min_confidence_error
+        cursors, cursor_error, cursor_status = _parse_sync_cursor_params()
+        if cursor_error:
+            return cursor_error, cursor_status
+        since, before = cursors
+        payload_params, payload_error, payload_status = _parse_signal_payload_params()
+        if payload_error:
+            return payload_error, payload_status
+        projection, compact = payload_params
         
         # Build query (trusted auto-generated signals only)
         query = _trusted_signal_filter_for_pair(pair)
@@ -2705,22 +3338,25 @@ def get_signals_history():
         if min_confidence is not None:
             query['confidence'] = {'$gte': min_confidence}
         
-        # Get signals sorted by created_at (newest first)
-        signals = list(signals_collection.find(query)
-                      .sort('created_at', -1)
-                      .limit(limit))
-        
-        # Convert ObjectId to string and datetime to ISO string
-        for sig in signals:
-            sig['_id'] = str(sig['_id'])
-            if sig.get('created_at'):
-                sig['created_at'] = sig['created_at'].isoformat()
-        
-        return jsonify({
-            'success': True,
-            'count': len(signals),
-            'signals': signals
-        })
+        # Newest first, keyset-paged on (created_at, _id) over idx_signals_pair_created
+        signals, has_more = fetch_page(signals_collection, query, limit, since=since, before=before,
+                                       projection=projection)
+        cursors = page_cursors(signals, request.args.get('since'))
+        # Saved signals are immutable, so their keys (and the requested shape) identify the page
+        etag = page_etag(signals, has_more, cursors, sorted(projection or {}), compact)
+
+        def body():
+            rows, extra = _signal_rows_payload(signals, compact)
+            return {
+                'success': True,
+                'count': len(rows),
+                'signals': rows,
+                'has_more': has_more,
+                **cursors,
+                **extra,
+            }
+
+        return _conditional_json(body, etag)
         
     except Exception as e:
         print(f"Signal history алдаа: {e}")
@@ -2732,6 +3368,10 @@ def get_signals_history():
 def get_signals_stats():
     """
     Таамгийн статистик
+    Query params:
+        - pair: Валютын хослол (optional, default: EUR_USD)
+        - days: Сүүлийн N UTC өдөр (optional, 1-366; rollup-аас уншина)
+        - from / to: ISO datetime муж (optional; signals дээр нэг $facet aggregate)
     """
     try:
         limit_result = enforce_public_rate_limit('signals_stats')
@@ -2743,33 +3383,40 @@ def get_signals_stats():
             return pair_error
 
         pair = normalized_pair.replace('/', '_')
-        
-        # Count by signal type
         trusted_pair_query = _trusted_signal_filter_for_pair(pair)
-        buy_count = signals_collection.count_documents({**trusted_pair_query, 'signal': 'BUY'})
-        sell_count = signals_collection.count_documents({**trusted_pair_query, 'signal': 'SELL'})
-        hold_count = signals_collection.count_documents({**trusted_pair_query, 'signal': 'HOLD'})
-        total_count = buy_count + sell_count + hold_count
-        
-        # Average confidence
-        pipeline = [
-            {'$match': trusted_pair_query},
-            {'$group': {
-                '_id': None,
-                'avg_confidence': {'$avg': '$confidence'},
-                'max_confidence': {'$max': '$confidence'},
-                'min_confidence': {'$min': '$confidence'}
-            }}
-        ]
-        
-        stats_result = list(signals_collection.aggregate(pipeline))
-        avg_stats = stats_result[0] if stats_result else {}
-        
-        # Last signal
-        last_signal = signals_collection.find_one(
-            trusted_pair_query,
-            sort=[('created_at', -1)]
-        )
+
+        range_start = _parse_datetime_safe(request.args.get('from'))
+        range_end = _parse_datetime_safe(request.args.get('to'))
+        if (request.args.get('from') and range_start is None) or (request.args.get('to') and range_end is None):
+            return jsonify({'success': False, 'error': 'from/to must be ISO datetimes'}), 400
+        days = None
+        if request.args.get('days'):
+            days, days_error, days_status = _parse_int_query_param('days', 1, minimum=1, maximum=366)
+            if days_error:
+                return days_error, days_status
+
+        summary = None
+        if range_start is None and range_end is None:
+            # One read of the pair's rollup document(s)
+            summary = signal_rollups.summary(pair, days=days)
+        if summary is None:
+            # Ad-hoc range, or rollups not built yet: a single $facet over the trusted signals
+            match = dict(trusted_pair_query)
+            created_range = {}
+            if range_start is not None:
+                created_range['$gte'] = range_start
+            if range_end is not None:
+                created_range['$lte'] = range_end
+            if days:
+                created_range.setdefault(
+                    '$gte',
+                    datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1),
+                )
+            if created_range:
+                match['created_at'] = created_range
+            summary = signal_rollups.range_stats(match)
+        stats, last_signal = summary
+        last_signal = model_runs.attach([dict(last_signal)])[0] if last_signal else None
         
         if last_signal:
             last_signal['_id'] = str(last_signal['_id'])
@@ -2779,15 +3426,7 @@ def get_signals_stats():
         return jsonify({
             'success': True,
             'pair': pair,
-            'stats': {
-                'total_signals': total_count,
-                'buy_count': buy_count,
-                'sell_count': sell_count,
-                'hold_count': hold_count,
-                'avg_confidence': round(avg_stats.get('avg_confidence', 0), 2),
-                'max_confidence': round(avg_stats.get('max_confidence', 0), 2),
-                'min_confidence': round(avg_stats.get('min_confidence', 0), 2)
-            },
+            'stats': stats,
             'last_signal': last_signal
         })
         
@@ -2804,6 +3443,7 @@ def get_latest_signal():
     Query params:
         - pair: Валютын хослол (default: EUR_USD)
         - limit: Хэдэн сигнал авах (default: 1, max: 20)
+        - fields / format: /signals/history-тай адил
     """
     try:
         limit_result = enforce_public_rate_limit('signals_latest')
@@ -2818,6 +3458,10 @@ def get_latest_signal():
         limit, limit_error, _limit_status = _parse_int_query_param('limit', 1, minimum=1, maximum=20)
         if limit_error:
             return limit_error
+        payload_params, payload_error, payload_status = _parse_signal_payload_params()
+        if payload_error:
+            return payload_error, payload_status
+        projection, compact = payload_params
 
         trusted_pair_query = _trusted_signal_filter_for_pair(pair)
         query = {**trusted_pair_query, 'signal': {'$in': ['BUY', 'SELL']}}
@@ -2825,26 +3469,25 @@ def get_latest_signal():
         # Return BUY/SELL signals from trusted auto pipeline only.
         results = list(signals_collection.find(
             query,
+            projection,
             sort=[('created_at', -1)]
         ).limit(limit))
-
-        for s in results:
-            s['_id'] = str(s['_id'])
-            if s.get('created_at'):
-                s['created_at'] = s['created_at'].isoformat()
+        results, extra = _signal_rows_payload(results, compact)
 
         if limit == 1:
             # Backward-compatible: return single signal object
-            return jsonify({
+            return _fast_json_response({
                 'success': True,
                 'signal': results[0] if results else None,
-                'message': 'Одоогоор сигнал байхгүй байна' if not results else None
+                'message': 'Одоогоор сигнал байхгүй байна' if not results else None,
+                **extra,
             })
         else:
-            return jsonify({
+            return _fast_json_response({
                 'success': True,
                 'signals': results,
-                'count': len(results)
+                'count': len(results),
+                **extra,
             })
 
     except Exception as e:
@@ -2853,6 +3496,52 @@ def get_latest_signal():
         return _public_error_response()
 
 
+@app.route('/signals/outputs', methods=['GET'])
+def get_signal_outputs():
+    """
+    Минут тутмын моделийн гаралт (BUY/SELL/HOLD магадлал, lean, ATR), bucket тутамд min/max/last
+    Query params:
+        - pair: Валютын хослол (default: EUR_USD)
+        - hours: Сүүлийн хэдэн цаг (default: 24, max: 2160)
+        - from / to: ISO datetime муж (optional; hours-ийг орлоно)
+        - points: Хамгийн ихдээ хэдэн цэг (default: 300, 10-1000)
+    """
+    try:
+        limit_result = enforce_public_rate_limit('signals_outputs')
+        if limit_result:
+            return limit_result
+
+        normalized_pair, pair_error = enforce_trading_scope(request.args.get('pair', 'EUR_USD'))
+        if pair_error:
+            return pair_error
+        pair = normalized_pair.replace('/', '_')
+
+        hours, hours_error, hours_status = _parse_int_query_param('hours', 24, minimum=1, maximum=2160)
+        if hours_error:
+            return hours_error, hours_status
+        points, points_error, points_status = _parse_int_query_param('points', 300, minimum=10, maximum=1000)
+        if points_error:
+            return points_error, points_status
+
+        try:
+            range_start, range_end = query_range(request.args.get('from'), request.args.get('to'), hours)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'from/to must be ISO datetimes with from < to'}), 400
+
+        result = model_outputs.downsample(pair, range_start, range_end, max_points=points)
+        return _fast_json_response({
+            'success': True,
+            'pair': pair,
+            'from': range_start.isoformat(),
+            'to': range_end.isoformat(),
+            **result,
+        })
+
+    except Exception as e:
+        logger.exception('Signal outputs failed')
+        return _public_error_response()
+
+
 # ==================== NEWS & AI ANALYSIS ====================
 
 ANALYSIS_TTL_SECONDS = 6 * 60 * 60
@@ -2861,6 +3550,45 @@ ANALYSIS_REFRESH_CHECK_SECONDS = 60
 ANALYSIS_JOB_TTL_SECONDS = 15 * 60
 ANALYSIS_POLL_AFTER_SECONDS = 2
 
+# SSE job streams: one batched job watcher per process replaces per-client status polling
+try:
+    ANALYSIS_STREAM_MAX_SECONDS = max(10, int(os.environ.get('ANALYSIS_STREAM_MAX_SECONDS', '120')))
+except Exception:
+    ANALYSIS_STREAM_MAX_SECONDS = 120
+
+try:
+    ANALYSIS_STREAM_MAX_SUBSCRIBERS = max(0, int(os.environ.get('ANALYSIS_STREAM_MAX_SUBSCRIBERS', '100')))
+except Exception:
+    ANALYSIS_STREAM_MAX_SUBSCRIBERS = 100
+
+# Request threads per worker process (gunicorn.conf.py `threads`, waitress `threads`)
+try:
+    WORKER_THREADS = max(1, int(os.environ.get('GUNICORN_THREADS', '4')))
+except Exception:
+    WORKER_THREADS = 4
+
+# Stream бүр нэг request thread-ийг ANALYSIS_STREAM_MAX_SECONDS хүртэл эзэлнэ: /health болон бусад
+# route-д дор хаяж энэ тооны thread үлдээнэ. Үлдэх thread байхгүй бол stream-ийн оронд poll хариу өгнө.
+ANALYSIS_STREAM_RESERVED_THREADS = 2
+ANALYSIS_STREAM_MAX_SUBSCRIBERS = min(
+    ANALYSIS_STREAM_MAX_SUBSCRIBERS, max(0, WORKER_THREADS - ANALYSIS_STREAM_RESERVED_THREADS),
+)
+
+ANALYSIS_STREAM_KEEPALIVE_SECONDS = 15
+
+# Concurrent analysis consumers across all worker processes (lease slots pair_analysis_worker#0..N-1)
+try:
+    ANALYSIS_WORKER_SLOTS = max(1, int(os.environ.get('ANALYSIS_WORKER_SLOTS', '2')))
+except Exception:
+    ANALYSIS_WORKER_SLOTS = 2
+
+# Idle analysis worker: woken by enqueue (in-process or change stream), otherwise backs off to this cap
+try:
+    ANALYSIS_WORKER_IDLE_MAX_SECONDS = max(1, int(os.environ.get('ANALYSIS_WORKER_IDLE_MAX_SECONDS', '30')))
+except Exception:
+    ANALYSIS_WORKER_IDLE_MAX_SECONDS = 30
+ANALYSIS_STREAM_WATCH_SECONDS = 1.0
+
 try:
     ANALYSIS_CIRCUIT_FAIL_THRESHOLD = int(os.environ.get('ANALYSIS_CIRCUIT_FAIL_THRESHOLD', '3'))
 except Exception:
@@ -3159,6 +3887,27 @@ def _load_analysis_job_from_db(job_id: str):
         return None
 
 
+def _load_analysis_jobs_batch(job_ids):
+    """Current state of several jobs in one query (used by the SSE job watcher)."""
+    if not _analysis_jobs_persistence_available():
+        with _analysis_lock:
+            return [dict(_analysis_jobs[job_id]) for job_id in job_ids if job_id in _analysis_jobs]
+
+    docs = analysis_jobs_collection.find(
+        {'_id': {'$in': [str(job_id) for job_id in job_ids]}},
+        {'status': 1, 'pair': 1, 'updated_ts': 1, 'updated_at': 1, 'error': 1, 'retry_after': 1, 'result_created_at': 1},
+    )
+    return [job for job in (_normalize_analysis_job_doc(doc) for doc in docs) if job]
+
+
+analysis_job_events = JobEventHub(
+    _load_analysis_jobs_batch,
+    poll_seconds=ANALYSIS_STREAM_WATCH_SECONDS,
+    max_subscribers=max(1, ANALYSIS_STREAM_MAX_SUBSCRIBERS),
+)
+analysis_job_wakeup = JobWakeup('analysis_jobs')
+
+
 def _persist_analysis_job(job):
     if not _analysis_jobs_persistence_available() or not isinstance(job, dict):
         return
@@ -3297,6 +4046,8 @@ def _enqueue_pair_analysis_job(pair, force=False):
     with _analysis_lock:
         _analysis_pending_pairs.add(normalized_pair)
 
+    analysis_job_wakeup.notify()
+
     # In memory-only mode, wake up local worker queue immediately.
     if not _analysis_jobs_persistence_available() and BACKGROUND_WORKERS_ENABLED:
         try:
@@ -3353,6 +4104,7 @@ def _set_analysis_job_state(job_id: str, status: str, **extra):
         snapshot = dict(job)
 
     _persist_analysis_job(snapshot)
+    analysis_job_events.publish(snapshot)
     return snapshot
 
 
@@ -3401,6 +4153,9 @@ def _claim_next_analysis_job_from_db():
 def _analysis_worker_task():
     print('[INFO] Starting pair analysis queue worker...')
     update_background_job_state('pair_analysis_worker', 'starting', 'Analysis queue worker started')
+    idle_backoff = IdleBackoff(min_seconds=1, max_seconds=ANALYSIS_WORKER_IDLE_MAX_SECONDS)
+    if _analysis_jobs_persistence_available():
+        analysis_job_wakeup.watch(analysis_jobs_collection)
 
     while True:
         if not _renew_worker_lock('pair_analysis_worker', 900):
@@ -3413,8 +4168,9 @@ def _analysis_worker_task():
         if _analysis_jobs_persistence_available():
             claimed_job = _claim_next_analysis_job_from_db()
             if not claimed_job:
-                time.sleep(1)
+                analysis_job_wakeup.wait(idle_backoff.next_delay())
                 continue
+            idle_backoff.reset()
             job_id = claimed_job.get('job_id')
             pair = claimed_job.get('pair')
         else:
@@ -3503,43 +4259,22 @@ def _schedule_pair_refresh(pair, force=False, return_job_id=False):
 
 
 def pair_analysis_preloader_task():
-    """Top 3 pair анализыг startup дээр бэлэн болгоод 6 цаг тутам шинэчилнэ."""
-    print("[INFO] Starting pair analysis preloader (6h TTL)...")
-    update_background_job_state('pair_analysis_preloader', 'starting', 'Preloading top pairs')
-    if not _renew_worker_lock('pair_analysis_preloader', 900):
-        update_background_job_state('pair_analysis_preloader', 'error', 'Worker lock unavailable at start')
-        return
-
+    """Top pair анализыг бэлэн байлгана: байхгүй эсвэл 6 цагийн TTL хэтэрсэн бол шинэчлэлт товлоно."""
     for pair in PRELOADED_ANALYSIS_PAIRS:
         cached = _get_cached_analysis(pair)
-        if cached:
-            age = int(time.time() - cached['created_ts'])
-            print(f"[OK] Preloaded {pair} analysis from cache/DB (age={age}s)")
-        else:
-            print(f"[INFO] No existing analysis for {pair}; scheduling initial generation")
+        if not cached or not _is_analysis_fresh(cached):
             _schedule_pair_refresh(pair, force=True)
 
-    while True:
-        if not _renew_worker_lock('pair_analysis_preloader', 900):
-            update_background_job_state('pair_analysis_preloader', 'error', 'Worker lock lost')
-            return
-
-        try:
-            for pair in PRELOADED_ANALYSIS_PAIRS:
-                cached = _get_cached_analysis(pair)
-                if not cached or not _is_analysis_fresh(cached):
-                    _schedule_pair_refresh(pair, force=True)
-
-            update_background_job_state('pair_analysis_preloader', 'ok', 'Preloader refresh check complete')
-        except Exception as e:
-            print(f"[WARN] pair_analysis_preloader_task error: {e}")
-            update_background_job_state('pair_analysis_preloader', 'error', str(e))
-
-        time.sleep(ANALYSIS_REFRESH_CHECK_SECONDS)
+    update_background_job_state('pair_analysis_preloader', 'ok', 'Preloader refresh check complete')
 
 
-_start_background_job('pair_analysis_worker', _analysis_worker_task, lock_ttl_seconds=900)
-_start_background_job('pair_analysis_preloader', pair_analysis_preloader_task, lock_ttl_seconds=900)
+_start_background_job('pair_analysis_worker', _analysis_worker_task, lock_ttl_seconds=900, slots=ANALYSIS_WORKER_SLOTS)
+_schedule_background_job(
+    'pair_analysis_preloader',
+    pair_analysis_preloader_task,
+    IntervalTrigger(ANALYSIS_REFRESH_CHECK_SECONDS),
+    lock_ttl_seconds=900,
+)
 
 @app.route('/api/news', methods=['GET'])
 def get_news():
@@ -3556,17 +4291,18 @@ def get_news():
         if news_type in ['history', 'upcoming', 'outlook']:
             cache_key = news_type
             
-        # Try to get from cache
+        # Try to get from cache (shared snapshot published by the worker)
         cached_data = news_cache.get(cache_key)
         
         if cached_data:
             return jsonify({
                 "status": "success",
                 "data": cached_data,
-                "cached": True
+                "cached": True,
+                "cache": news_cache.metadata()
             }), 200
             
-        # Fallback to direct fetch if cache is empty
+        # Fallback to direct fetch if cache is empty (no snapshot published yet)
         if news_type == 'history':
             data = market_analyst.get_news_history()
         elif news_type == 'upcoming':
@@ -3596,15 +4332,22 @@ def analyze_news_event():
             return limit_result
 
         event_data = request.json
-        if not event_data:
+        if not event_data or not isinstance(event_data, dict):
             return jsonify({"status": "error", "message": "No data provided"}), 400
-            
-        analysis = market_analyst.analyze_specific_event(event_data)
+
+        # Precomputed by event_analysis_precompute; on a miss only one caller generates.
+        analysis, cached = event_analysis_store.get_or_generate(
+            event_analysis_key(event_data),
+            lambda: market_analyst.analyze_specific_event(event_data),
+            event=event_data,
+            is_valid=_is_valid_event_analysis,
+        )
         analysis = _attach_analysis_guardrails(analysis)
         
         return jsonify({
             "status": "success",
-            "analysis": analysis
+            "analysis": analysis,
+            "cached": cached
         }), 200
     except Exception as e:
         print(f"Error in news analysis: {e}")
@@ -3686,6 +4429,7 @@ def get_market_analysis():
                 "pair": pair,
                 "analysis_source": "queued",
                 "poll_after_seconds": ANALYSIS_POLL_AFTER_SECONDS,
+                **({"stream_url": f"/api/market-analysis/stream/{job_id}"} if ANALYSIS_STREAM_MAX_SUBSCRIBERS > 0 else {}),
                 "message": "Analysis queued",
             }), 202
 
@@ -3714,6 +4458,59 @@ def get_market_analysis():
         return _public_error_response('Market analysis failed')
 
 
+def _analysis_job_payload(job_id, job):
+    """Response body and HTTP status for a job, shared by the polling and SSE endpoints."""
+    pair = normalize_analysis_pair(job.get('pair'))
+    job_status = str(job.get('status', '')).lower()
+
+    if job_status in ('queued', 'running'):
+        return {
+            "status": "pending",
+            "job_id": job_id,
+            "pair": pair,
+            "job_status": job_status,
+            "analysis_source": "queued",
+            "poll_after_seconds": int(job.get('retry_after') or ANALYSIS_POLL_AFTER_SECONDS),
+        }, 202
+
+    if job_status == 'completed':
+        cached = _get_cached_analysis(pair)
+        if cached:
+            return {
+                "status": "success",
+                "data": cached['data'],
+                "cached": False,
+                "analysis_source": "fresh-generated",
+                "generated_at": cached.get('created_at') or job.get('result_created_at'),
+                "job_id": job_id,
+            }, 200
+
+        return {
+            "status": "error",
+            "message": "Analysis completed but cached result is unavailable",
+            "job_id": job_id,
+        }, 503
+
+    fallback = _get_cached_analysis(pair)
+    if fallback:
+        return {
+            "status": "success",
+            "data": fallback['data'],
+            "cached": True,
+            "stale": True,
+            "analysis_source": "cache-fallback",
+            "generated_at": fallback.get('created_at'),
+            "job_id": job_id,
+        }, 200
+
+    return {
+        "status": "error",
+        "message": job.get('error') or 'Analysis job failed',
+        "job_id": job_id,
+        "retry_after": int(job.get('retry_after') or ANALYSIS_POLL_AFTER_SECONDS),
+    }, 503
+
+
 @app.route('/api/market-analysis/status/<job_id>', methods=['GET'])
 def get_market_analysis_status(job_id):
     """Async market analysis job polling endpoint."""
@@ -3726,62 +4523,128 @@ def get_market_analysis_status(job_id):
         if not job:
             return jsonify({"status": "error", "message": "Analysis job not found"}), 404
 
-        pair = normalize_analysis_pair(job.get('pair'))
-        job_status = str(job.get('status', '')).lower()
+        payload, status_code = _analysis_job_payload(job_id, job)
+        return jsonify(payload), status_code
+    except Exception as e:
+        print(f"Error in analysis status: {e}")
+        traceback.print_exc()
+        return _public_error_response('Analysis status lookup failed')
+
+
+@app.route('/api/market-analysis/stream/<job_id>', methods=['GET'])
+def stream_market_analysis(job_id):
+    """Async market analysis job as Server-Sent Events: status transitions, then the final result."""
+    try:
+        limit_result = enforce_public_rate_limit('api_market_analysis', max_requests=40, window_seconds=60)
+        if limit_result:
+            return limit_result
+
+        job = _get_analysis_job(job_id)
+        if not job:
+            return jsonify({"status": "error", "message": "Analysis job not found"}), 404
+
+        if ANALYSIS_STREAM_MAX_SUBSCRIBERS <= 0:
+            # Too few request threads to park one on a stream: answer like the status endpoint
+            payload, status_code = _analysis_job_payload(job_id, job)
+            return jsonify(payload), status_code
 
-        if job_status in ('queued', 'running'):
+        subscription = analysis_job_events.subscribe(job_id, current=job)
+        if subscription is None:
             return jsonify({
-                "status": "pending",
-                "job_id": job_id,
-                "pair": pair,
-                "job_status": job_status,
-                "analysis_source": "queued",
-                "poll_after_seconds": int(job.get('retry_after') or ANALYSIS_POLL_AFTER_SECONDS),
-            }), 202
+                "status": "error",
+                "message": "Too many open analysis streams, poll the status endpoint instead",
+                "poll_after_seconds": ANALYSIS_POLL_AFTER_SECONDS,
+            }), 429
+    except Exception as e:
+        print(f"Error in analysis stream: {e}")
+        traceback.print_exc()
+        return _public_error_response('Analysis stream failed')
+
+    def generate():
+        try:
+            yield f"retry: {ANALYSIS_POLL_AFTER_SECONDS * 1000}\n\n"
+            deadline = time.monotonic() + ANALYSIS_STREAM_MAX_SECONDS
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    yield sse_event('timeout', {
+                        "job_id": job_id,
+                        "poll_after_seconds": ANALYSIS_POLL_AFTER_SECONDS,
+                    })
+                    return
+
+                current = subscription.get(timeout=min(ANALYSIS_STREAM_KEEPALIVE_SECONDS, remaining))
+                if current is None:
+                    yield ": keepalive\n\n"
+                    continue
 
-        if job_status == 'completed':
-            cached = _get_cached_analysis(pair)
-            if cached:
-                return jsonify({
-                    "status": "success",
-                    "data": cached['data'],
-                    "cached": False,
-                    "analysis_source": "fresh-generated",
-                    "generated_at": cached.get('created_at') or job.get('result_created_at'),
+                job_status = str(current.get('status', '')).lower()
+                yield sse_event('status', {
                     "job_id": job_id,
-                }), 200
+                    "pair": normalize_analysis_pair(current.get('pair')),
+                    "job_status": job_status,
+                    "updated_at": current.get('updated_at'),
+                }, event_id=str(current.get('updated_ts') or ''))
+
+                if job_status in TERMINAL_JOB_STATUSES:
+                    payload, status_code = _analysis_job_payload(job_id, current)
+                    yield sse_event('result' if status_code == 200 else 'error', payload)
+                    return
+        finally:
+            analysis_job_events.unsubscribe(subscription)
 
-            return jsonify({
-                "status": "error",
-                "message": "Analysis completed but cached result is unavailable",
-                "job_id": job_id,
-            }), 503
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+    # Also release the slot if the client disconnects before the first chunk.
+    response.call_on_close(lambda: analysis_job_events.unsubscribe(subscription))
+    return response
 
-        fallback = _get_cached_analysis(pair)
-        if fallback:
-            return jsonify({
-                "status": "success",
-                "data": fallback['data'],
-                "cached": True,
-                "stale": True,
-                "analysis_source": "cache-fallback",
-                "generated_at": fallback.get('created_at'),
-                "job_id": job_id,
-            }), 200
 
-        return jsonify({
-            "status": "error",
-            "message": job.get('error') or 'Analysis job failed',
-            "job_id": job_id,
-            "retry_after": int(job.get('retry_after') or ANALYSIS_POLL_AFTER_SECONDS),
-        }), 503
+# ==================== HEALTH CHECK ====================
+
+RUNTIME_REPORT_TTL_SECONDS = 300
+
+
+def publish_runtime_report():
+    """Record this process's import timings and memory so per-role footprint is visible."""
+    report = runtime_report(APP_PROCESS_ROLE, {
+        'instance_id': WORKER_INSTANCE_ID,
+        'signal_model_enabled': SIGNAL_MODEL_ENABLED,
+        'preload_mode': PRELOAD_MODE,
+        'signal_model_loaded': bool(signal_generator and signal_generator.is_loaded),
+    })
+    now = datetime.now(timezone.utc)
+    try:
+        runtime_reports_collection.replace_one(
+            {'_id': WORKER_INSTANCE_ID},
+            {
+                **report,
+                'updated_at': now,
+                'expires_at': now + timedelta(seconds=RUNTIME_REPORT_TTL_SECONDS),
+            },
+            upsert=True,
+        )
     except Exception as e:
-        print(f"Error in analysis status: {e}")
-        traceback.print_exc()
-        return _public_error_response('Analysis status lookup failed')
+        logger.warning(f'Runtime report publish failed: {e}')
+    return report
 
 
-# ==================== HEALTH CHECK ====================
+def _runtime_reports_by_role():
+    reports = {}
+    try:
+        for doc in runtime_reports_collection.find({}, {'expires_at': 0}).sort('updated_at', -1).limit(20):
+            instance_id = doc.pop('_id', None)
+            updated_at = doc.get('updated_at')
+            if isinstance(updated_at, datetime):
+                doc['updated_at'] = updated_at.isoformat()
+            reports.setdefault(doc.get('role', 'unknown'), []).append({'instance_id': instance_id, **doc})
+    except Exception as e:
+        logger.warning(f'Runtime report lookup failed: {e}')
+    return reports
+
 
 @app.route('/health', methods=['GET'])
 def health():
@@ -3810,7 +4673,21 @@ def health_details(payload):
             'background_jobs_status': jobs_status,
             'background_jobs': jobs_snapshot,
             'rate_limit_backend': _rate_limit_backend,
+            'signal_executor': signal_executor.stats(),
+            'upstreams': http_client.stats(),
+            'llm_cache': market_analyst.llm_cache.stats(),
+            'ai_providers': market_analyst.ai_provider_stats(),
+            'analysis_streams': analysis_job_events.stats(),
+            'analysis_dispatch': analysis_job_wakeup.stats(),
+            'leases': worker_leases.stats(),
+            'notification_outbox': notification_outbox.stats(),
+            'news_visibility_cache': news_visibility_cache.stats(),
+            'model_runs': model_runs.stats(),
+            'model_outputs': model_outputs.stats(),
+            'expo_push': {'sender': push_service.sender.stats(), 'receipts': expo_receipts.stats()},
             'role': APP_PROCESS_ROLE,
+            'runtime': publish_runtime_report(),
+            'runtime_by_role': _runtime_reports_by_role(),
             'timestamp': datetime.now(timezone.utc).isoformat()
         })
     except Exception as e:
@@ -3833,6 +4710,9 @@ def index():
         }
     })
 
+record_import_timing('app', time.perf_counter() - _APP_IMPORT_STARTED)
+publish_runtime_report()
+
 # ==================== MAIN ====================
 
 if __name__ == '__main__':
@@ -3857,4 +4737,4 @@ if __name__ == '__main__':
     # Use waitress for production-ready server (more stable on Windows)
     from waitress import serve
     print(f"\n[+] Server starting with Waitress on http://0.0.0.0:{PORT}")
-    serve(app, host='0.0.0.0', port=PORT, threads=4)
+    serve(app, host='0.0.0.0', port=PORT, threads=WORKER_THREADS)
@@ -0,0 +1,51 @@
+"""Gunicorn settings for the API process group.
+
+With GUNICORN_PRELOAD_APP=true the app (and, when SIGNAL_MODEL_ENABLED, the warmed
+GBDT ensemble) is imported once in the master and shared copy-on-write by the
+forked workers; app.start_post_fork_services() then opens per-worker Mongo clients
+and starts deferred threads.
+"""
+
+import gc
+import os
+
+
+def _env_int(name, default, minimum=1):
+    try:
+        return max(minimum, int(os.environ.get(name, default)))
+    except Exception:
+        return default
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+preload_app = str(os.environ.get("GUNICORN_PRELOAD_APP", "false")).strip().lower() in ("1", "true", "yes", "on")
+workers = _env_int("WEB_CONCURRENCY", 1)
+threads = _env_int("GUNICORN_THREADS", 4)
+timeout = _env_int("GUNICORN_TIMEOUT", 180, minimum=30)
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    # Move everything allocated during import (model included) out of the GC's
+    # generations so collections in workers do not touch, and un-share, those pages.
+    gc.collect()
+    gc.freeze()
+    server.log.info("Preloaded app; gc frozen before forking %s worker(s)", workers)
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    import app as backend_app
+
+    backend_app.start_post_fork_services()
+    memory = backend_app.runtime_report(backend_app.APP_PROCESS_ROLE).get("memory", {})
+    server.log.info(
+        "Worker %s ready: rss=%sMB pss=%sMB shared=%sMB private=%sMB",
+        worker.pid,
+        memory.get("rss_mb"),
+        memory.get("pss_mb"),
+        memory.get("shared_mb"),
+        memory.get("private_mb"),
+    )
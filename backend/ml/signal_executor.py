@@ -0,0 +1,244 @@
+"""Bounded process pool for CPU-heavy signal generation, with backpressure and timings."""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from utils.metrics import LatencyHistogram
+
+
+class SignalExecutorBusy(Exception):
+    """Raised when the pool already holds max_pending jobs; callers should answer 429."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f'signal executor busy, retry after {retry_after}s')
+        self.retry_after = retry_after
+
+
+def _timed_call(func: Callable, kwargs: Dict[str, Any]):
+    # Wall-clock timestamps so queue wait can be measured across the process boundary.
+    started = time.time()
+    result = func(**kwargs)
+    return result, started, time.time()
+
+
+def generate_signal_task(**kwargs) -> Dict[str, Any]:
+    """Pool entry point. A pool forked by prefork() inherits the parent's loaded model."""
+    from ml.signal_generator_gbdt import get_signal_generator_gbdt
+
+    return get_signal_generator_gbdt().generate_signal(**kwargs)
+
+
+def warm_signal_worker():
+    """Pool initializer: make sure the model is in memory before the first job arrives."""
+    try:
+        from ml.signal_generator_gbdt import get_signal_generator_gbdt
+
+        get_signal_generator_gbdt()
+    except Exception as e:
+        print(f"[WARN] Signal executor worker warmup failed: {e}", flush=True)
+
+
+class SignalExecutor:
+    """Runs jobs in a small process pool so request threads do not hold the GIL.
+
+    workers=0 runs jobs inline on the calling thread (same limits and metrics).
+    At most max_pending jobs may be queued or running; extra callers are rejected
+    immediately with SignalExecutorBusy instead of piling up behind the pool.
+
+    The lazily created pool uses forkserver (spawn where unavailable): by then
+    the process runs request, heartbeat and scheduler threads, and forking it
+    could copy their held locks into the children. prefork() is the one place
+    that uses fork, for a process that has not started any threads yet.
+
+    A job that outlives timeout_seconds is cancelled if it has not started;
+    otherwise its worker may be hung, so the pool is terminated and recreated
+    on the next run. Either way the caller's slot is released at the timeout.
+    """
+
+    def __init__(self, workers: int = 1, max_pending: int = 4, timeout_seconds: float = 60.0,
+                 start_method: Optional[str] = None, initializer: Optional[Callable] = warm_signal_worker):
+        self.workers = max(0, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self.timeout_seconds = max(1.0, float(timeout_seconds))
+        self.start_method = start_method or (
+            'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        )
+        self.initializer = initializer
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.queue_wait = LatencyHistogram()
+        self.exec_time = LatencyHistogram()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.pool_restarts = 0
+
+    def _create_pool(self, start_method: str) -> ProcessPoolExecutor:
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=self.initializer,
+        )
+        self._pool_pid = os.getpid()
+        return self._pool
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            # A pool inherited across fork (gunicorn preload) belongs to the parent.
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._create_pool(self.start_method)
+            return self._pool
+
+    def prefork(self) -> bool:
+        """Fork the pool's workers now so they share the already loaded model copy-on-write.
+
+        Only safe while the calling process is single-threaded (a gunicorn worker
+        in post_fork, before it starts its threads). ProcessPoolExecutor forks
+        lazily, so the first submit starts them here.
+        """
+        if self.workers == 0 or 'fork' not in multiprocessing.get_all_start_methods():
+            return False
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                return False
+            pool = self._create_pool('fork')
+        # With fork, the first submit launches every worker before the pool's manager thread starts.
+        pool.submit(os.getpid).result()
+        return True
+
+    def _reset_pool(self, broken_pool, terminate: bool = False) -> None:
+        with self._pool_lock:
+            if self._pool is broken_pool:
+                self._pool = None
+                self.pool_restarts += 1
+        # shutdown() never stops a running job; a hung worker has to be killed.
+        processes = list((getattr(broken_pool, '_processes', None) or {}).values()) if terminate else []
+        try:
+            broken_pool.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            pass
+        for process in processes:
+            try:
+                process.terminate()
+            except Exception:
+                pass
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up: queued work divided across workers."""
+        typical = self.exec_time.percentile(50) or 1.0
+        lanes = max(1, self.workers)
+        return max(1, int(math.ceil(typical * max(1, self.in_flight) / lanes)))
+
+    def _release(self, _future=None) -> None:
+        with self._stats_lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _release_once(self) -> Callable:
+        """A per-job release: the timeout path and the future's done callback may both call it."""
+        released = threading.Event()
+        lock = threading.Lock()
+
+        def release(_future=None):
+            with lock:
+                if released.is_set():
+                    return
+                released.set()
+            self._release()
+
+        return release
+
+    def run(self, func: Callable = generate_signal_task, **kwargs) -> Any:
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise SignalExecutorBusy(self.retry_after())
+
+        with self._stats_lock:
+            self.in_flight += 1
+
+        if self.workers == 0:
+            started = time.time()
+            try:
+                result = func(**kwargs)
+            except Exception:
+                with self._stats_lock:
+                    self.failed += 1
+                raise
+            finally:
+                self.exec_time.observe(time.time() - started)
+                self._release()
+            self.queue_wait.observe(0.0)
+            with self._stats_lock:
+                self.completed += 1
+            return result
+
+        enqueued = time.time()
+        release = self._release_once()
+        try:
+            pool = self._get_pool()
+            future = pool.submit(_timed_call, func, kwargs)
+        except Exception:
+            release()
+            raise
+        # The slot is held until the job finishes or times out.
+        future.add_done_callback(release)
+
+        try:
+            result, started, finished = future.result(timeout=self.timeout_seconds)
+        except BrokenProcessPool:
+            with self._stats_lock:
+                self.failed += 1
+            self._reset_pool(pool)
+            raise
+        except TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            if not future.cancel():
+                self._reset_pool(pool, terminate=True)
+            release()
+            raise
+        except Exception:
+            with self._stats_lock:
+                self.failed += 1
+            raise
+
+        self.queue_wait.observe(started - enqueued)
+        self.exec_time.observe(finished - started)
+        with self._stats_lock:
+            self.completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            counters = {
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'pool_restarts': self.pool_restarts,
+            }
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'start_method': self.start_method if self.workers else 'inline',
+            **counters,
+            'queue_wait': self.queue_wait.snapshot(),
+            'exec_time': self.exec_time.snapshot(),
+        }
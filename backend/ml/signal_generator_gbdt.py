@@ -380,6 +380,18 @@ class GBDTSignalGenerator:
 
         return pred_class, pred_conf, ensemble_proba
 
+    def warmup(self) -> bool:
+        """Run one dummy prediction so booster lazy initialisation happens now (e.g. before fork)."""
+        if not self.is_loaded:
+            return False
+        try:
+            X = np.zeros((1, len(self.feature_cols)), dtype=np.float64)
+            self._predict_ensemble(X)
+            return True
+        except Exception as e:
+            print(f"[GBDT] Warmup prediction failed: {e}")
+            return False
+
     def _calculate_sl_tp(self, atr_value: float, direction: str, entry_price: float, symbol: str = "EURUSD") -> Dict[str, float]:
         """Calculate SL/TP based on ATR (matches training config)"""
         pips = pip_size(symbol)
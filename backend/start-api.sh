@@ -6,4 +6,5 @@ export BACKGROUND_WORKERS_ENABLED="false"
 export STRICT_RUNTIME_SECRETS="${STRICT_RUNTIME_SECRETS:-true}"
 export ALLOW_LOCAL_DOTENV="false"
 
-exec gunicorn app:app --bind 0.0.0.0:8080 --workers 1 --threads 4 --timeout 180
+# Worker count / preload come from gunicorn.conf.py (WEB_CONCURRENCY, GUNICORN_PRELOAD_APP).
+exec gunicorn app:app --config gunicorn.conf.py
@@ -1,7 +1,8 @@
-import requests
 import os
 from datetime import datetime
 
+from utils.http_client import http_client
+
 class AlphaVantageHandler:
     def __init__(self, api_key=None):
         self.api_key = api_key or os.getenv('ALPHAVANTAGE_API_KEY')
@@ -28,7 +29,13 @@ class AlphaVantageHandler:
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
+            response = http_client.get(
+                self.base_url,
+                params=params,
+                upstream="alphavantage",
+                timeout=(3.05, 15),
+                retries=2,
+            )
             data = response.json()
             
             if "feed" not in data:
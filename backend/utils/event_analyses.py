@@ -0,0 +1,194 @@
+"""Precomputed per-event AI analyses: stable event keys, Mongo store and single-flight generation."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+_DUPLICATE_KEY_CODE = 11000
+# Stored event fields are for inspection only; the key already covers the full values.
+_STORED_FIELD_CHARS = 200
+
+
+def _norm(value) -> str:
+    return ' '.join(str(value if value is not None else '').split()).lower()
+
+
+def event_analysis_fields(event: Dict[str, Any]) -> Dict[str, str]:
+    """The normalized inputs analyze_specific_event depends on.
+
+    Accepts either the raw TradingView event or the formatted /api/news item
+    (title "USD - CPI", original fields under "raw"). actual/forecast are
+    included because the analysis changes once the number is released.
+    """
+    raw = event.get('raw') if isinstance(event.get('raw'), dict) else {}
+    return {
+        'title': _norm(event.get('title') or raw.get('event_name') or event.get('event_name') or ''),
+        'currency': _norm(event.get('currency') or raw.get('currency') or ''),
+        'date': _norm(raw.get('date') or event.get('date') or ''),
+        'actual': _norm(event.get('actual', raw.get('actual'))),
+        'forecast': _norm(event.get('forecast', raw.get('forecast'))),
+    }
+
+
+def event_analysis_key(event: Dict[str, Any]) -> str:
+    """Stable key over event_analysis_fields()."""
+    material = '|'.join(event_analysis_fields(event).values())
+    return hashlib.sha1(material.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """Concurrent callers for the same key share one in-flight computation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Dict[str, Any]] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'event': threading.Event(), 'result': None, 'error': None}
+
+        if not leader:
+            call['event'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = fn()
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call['event'].set()
+
+
+class EventAnalysisStore:
+    """event_analyses collection: {_id: key, status: pending|ready, analysis, lease_until, expires_at}.
+
+    A pending doc acts as a cross-process claim so only one process calls the
+    LLM for an event; others wait briefly for it to become ready.
+    """
+
+    def __init__(self, collection, ttl_seconds: int = 3 * 86400, lease_seconds: int = 90):
+        self.collection = collection
+        self.ttl_seconds = max(60, int(ttl_seconds))
+        self.lease_seconds = max(5, int(lease_seconds))
+        self.single_flight = SingleFlight()
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.collection is None:
+            return None
+        try:
+            doc = self.collection.find_one({'_id': key, 'status': 'ready'}, {'analysis': 1})
+        except Exception as e:
+            print(f"[WARN] event analysis lookup failed: {e}", flush=True)
+            return None
+        return doc.get('analysis') if doc else None
+
+    def _claim(self, key: str) -> bool:
+        if self.collection is None:
+            return True
+        now = datetime.now(timezone.utc)
+        lease_until = now + timedelta(seconds=self.lease_seconds)
+        try:
+            self.collection.insert_one({
+                '_id': key,
+                'status': 'pending',
+                'lease_until': lease_until,
+                'created_at': now,
+                'expires_at': now + timedelta(seconds=self.ttl_seconds),
+            })
+            return True
+        except Exception as e:
+            if getattr(e, 'code', None) != _DUPLICATE_KEY_CODE:
+                print(f"[WARN] event analysis claim failed: {e}", flush=True)
+                return True
+        try:
+            # Take over a pending claim whose owner died before finishing.
+            result = self.collection.update_one(
+                {'_id': key, 'status': 'pending', 'lease_until': {'$lte': now}},
+                {'$set': {'lease_until': lease_until}},
+            )
+            return result.modified_count > 0
+        except Exception as e:
+            print(f"[WARN] event analysis claim takeover failed: {e}", flush=True)
+            return True
+
+    def put(self, key: str, analysis: Any, event: Optional[Dict[str, Any]] = None, source: str = '') -> None:
+        """Store a ready analysis. Only the keyed event fields are kept, never the caller's raw payload."""
+        if self.collection is None:
+            return
+        now = datetime.now(timezone.utc)
+        if event:
+            event = {name: value[:_STORED_FIELD_CHARS] for name, value in event_analysis_fields(event).items()}
+        try:
+            self.collection.update_one(
+                {'_id': key},
+                {
+                    '$set': {
+                        'status': 'ready',
+                        'analysis': analysis,
+                        'event': event or None,
+                        'source': source,
+                        'updated_at': now,
+                        'expires_at': now + timedelta(seconds=self.ttl_seconds),
+                    },
+                    '$unset': {'lease_until': ''},
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"[WARN] event analysis store failed: {e}", flush=True)
+
+    def release(self, key: str) -> None:
+        if self.collection is None:
+            return
+        try:
+            self.collection.delete_one({'_id': key, 'status': 'pending'})
+        except Exception:
+            pass
+
+    def get_or_generate(self, key: str, generate: Callable[[], Any], event: Optional[Dict[str, Any]] = None,
+                        source: str = 'on_demand', wait_seconds: float = 30.0, poll_seconds: float = 0.5,
+                        is_valid: Callable[[Any], bool] = bool):
+        """Return (analysis, cached). Generates at most once per key across threads and processes."""
+        existing = self.get(key)
+        if existing is not None:
+            return existing, True
+
+        def _leader():
+            ready = self.get(key)
+            if ready is not None:
+                return ready, True
+
+            if not self._claim(key):
+                deadline = time.monotonic() + wait_seconds
+                while time.monotonic() < deadline:
+                    time.sleep(poll_seconds)
+                    ready = self.get(key)
+                    if ready is not None:
+                        return ready, True
+                # Claim owner is slow or gone; generate locally rather than fail the request.
+
+            try:
+                analysis = generate()
+            except Exception:
+                self.release(key)
+                raise
+            if is_valid(analysis):
+                self.put(key, analysis, event=event, source=source)
+            else:
+                self.release(key)
+            return analysis, False
+
+        return self.single_flight.do(key, _leader)
@@ -0,0 +1,249 @@
+"""Expo push transport: concurrent 100-message batches over the pooled HTTP client, plus receipt polling."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from utils.http_client import _retry_after_seconds, backoff_delay, http_client
+
+EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+EXPO_RECEIPTS_URL = "https://exp.host/--/api/v2/push/getReceipts"
+EXPO_SEND_BATCH = 100
+EXPO_RECEIPTS_BATCH = 1000
+EXPO_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Content-Type": "application/json",
+}
+# Per-message errors worth retrying later; everything else is permanent for that token.
+TRANSIENT_TICKET_ERRORS = ("MessageRateExceeded", "missing ticket")
+
+
+def _outcome(status: str, error: Optional[str] = None, ticket_id: Optional[str] = None) -> Dict[str, Any]:
+    return {"status": status, "error": error, "ticket_id": ticket_id}
+
+
+class ExpoPushSender:
+    """Sends any number of messages as concurrent Expo batches.
+
+    Batches share the process-wide pooled client (one keep-alive pool per
+    host) and at most max_in_flight requests are outstanding, fleet-wide for
+    this process. A 429 pauses every batch until Retry-After (or a jittered
+    backoff) has passed, so the sender slows down as a whole instead of each
+    batch hammering Expo independently.
+    """
+
+    def __init__(self, client=None, push_url: str = EXPO_PUSH_URL, receipts_url: str = EXPO_RECEIPTS_URL,
+                 max_in_flight: int = 4, max_retries: int = 3, backoff_seconds: float = 1.0,
+                 timeout=(3.05, 10)):
+        self.client = client or http_client
+        self.push_url = push_url
+        self.receipts_url = receipts_url
+        pool_limit = int(getattr(self.client, 'pool_maxsize', max_in_flight) or max_in_flight)
+        self.max_in_flight = max(1, min(int(max_in_flight), pool_limit))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_seconds = max(0.01, float(backoff_seconds))
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='expo-push')
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._counters = {'batches': 0, 'messages': 0, 'ok': 0, 'failed': 0, 'retry': 0, 'rate_limited': 0}
+
+    def _count(self, **amounts) -> None:
+        with self._lock:
+            for name, amount in amounts.items():
+                self._counters[name] = self._counters.get(name, 0) + amount
+
+    def _wait_for_rate_limit(self) -> None:
+        while True:
+            with self._lock:
+                delay = self._paused_until - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def _pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _post(self, url: str, payload: Any, upstream: str, idempotent: bool = True):
+        """POST with shared 429 pause and retries; returns parsed JSON, or (None, error) on give-up.
+
+        A non-idempotent POST (push send) is retried only when Expo cannot have
+        accepted the batch: a connect timeout or a 429. After a read timeout,
+        reset or 5xx it may already have been delivered, so it gives up at once
+        and the outbox retries the rows on its own backoff.
+        """
+        attempt = 0
+        while True:
+            self._wait_for_rate_limit()
+            try:
+                response = self.client.post(url, json=payload, headers=EXPO_HEADERS, upstream=upstream,
+                                            timeout=self.timeout, retries=0)
+            except requests.RequestException as e:
+                retryable = idempotent or isinstance(e, requests.ConnectTimeout)
+                if not retryable or attempt >= self.max_retries:
+                    return None, str(e)
+                time.sleep(backoff_delay(attempt, base=self.backoff_seconds))
+                attempt += 1
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if response.status_code == 429:
+                    self._count(rate_limited=1)
+                    delay = _retry_after_seconds(response)
+                    self._pause(delay if delay is not None else backoff_delay(attempt, base=self.backoff_seconds))
+                if attempt >= self.max_retries or (response.status_code >= 500 and not idempotent):
+                    return None, f"HTTP {response.status_code}"
+                if response.status_code >= 500:
+                    time.sleep(backoff_delay(attempt, base=self.backoff_seconds))
+                attempt += 1
+                continue
+
+            if response.status_code != 200:
+                print(f"[ERROR] Expo API error: {response.status_code} - {response.text[:200]}", flush=True)
+                return None, f"HTTP {response.status_code}"
+            try:
+                return response.json(), None
+            except ValueError:
+                return None, "invalid response"
+
+    def _send_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        data, error = self._post(self.push_url, batch, upstream='expo_push', idempotent=False)
+        if data is None:
+            # A 4xx other than 429 means the request itself was rejected; retrying will not help.
+            status = 'failed' if error and error.startswith('HTTP 4') and error != 'HTTP 429' else 'retry'
+            return [_outcome(status, error) for _ in batch]
+
+        tickets = data.get('data') if isinstance(data, dict) else None
+        tickets = tickets if isinstance(tickets, list) else []
+        outcomes = []
+        for index in range(len(batch)):
+            ticket = tickets[index] if index < len(tickets) and isinstance(tickets[index], dict) else {}
+            if ticket.get('status') == 'ok':
+                outcomes.append(_outcome('ok', ticket_id=ticket.get('id')))
+                continue
+            error = (ticket.get('details') or {}).get('error') or ticket.get('message') or 'missing ticket'
+            outcomes.append(_outcome('retry' if error in TRANSIENT_TICKET_ERRORS else 'failed', error))
+        return outcomes
+
+    def send(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Per-message outcomes ({status: ok|retry|failed, error, ticket_id}) in input order."""
+        if not messages:
+            return []
+        batches = [messages[i:i + EXPO_SEND_BATCH] for i in range(0, len(messages), EXPO_SEND_BATCH)]
+        if len(batches) == 1:
+            results = [self._send_batch(batches[0])]
+        else:
+            results = list(self._pool.map(self._send_batch, batches))
+
+        outcomes = [outcome for batch_outcomes in results for outcome in batch_outcomes]
+        self._count(
+            batches=len(batches),
+            messages=len(messages),
+            ok=sum(1 for o in outcomes if o['status'] == 'ok'),
+            failed=sum(1 for o in outcomes if o['status'] == 'failed'),
+            retry=sum(1 for o in outcomes if o['status'] == 'retry'),
+        )
+        return outcomes
+
+    def get_receipts(self, ticket_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Receipts by ticket id; ids Expo has no receipt for yet are simply absent."""
+        receipts: Dict[str, Dict[str, Any]] = {}
+        chunks = [ticket_ids[i:i + EXPO_RECEIPTS_BATCH] for i in range(0, len(ticket_ids), EXPO_RECEIPTS_BATCH)]
+        for data, error in self._pool.map(
+            lambda ids: self._post(self.receipts_url, {'ids': ids}, upstream='expo_receipts'), chunks
+        ):
+            if data is None:
+                print(f"[WARN] Expo receipts fetch failed: {error}", flush=True)
+                continue
+            found = data.get('data') if isinstance(data, dict) else None
+            if isinstance(found, dict):
+                receipts.update(found)
+        return receipts
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, 'max_in_flight': self.max_in_flight}
+
+
+class ExpoReceiptPoller:
+    """Checks push receipts for sent tickets and prunes tokens Expo reports as unregistered.
+
+    Tickets are recorded by the notification outbox at send time. Expo keeps
+    receipts for about a day and recommends fetching them some minutes after
+    sending, so only tickets older than delay_seconds are polled. Receipt
+    errors are written back onto the delivery row, and all dead tokens found
+    in one poll are removed with a single bulk delete.
+    """
+
+    def __init__(self, sender: ExpoPushSender, tickets=None, deliveries=None,
+                 prune_tokens: Optional[Callable[[List[str]], int]] = None,
+                 delay_seconds: int = 900, max_tickets: int = 5000):
+        self.sender = sender
+        self.tickets = tickets
+        self.deliveries = deliveries
+        self.prune_tokens = prune_tokens
+        self.delay = timedelta(seconds=max(0, int(delay_seconds)))
+        self.max_tickets = max(1, int(max_tickets))
+        self._lock = threading.Lock()
+        self._counters = {'polls': 0, 'receipts_ok': 0, 'receipts_error': 0, 'tokens_pruned': 0}
+
+    def poll_once(self) -> Dict[str, int]:
+        if self.tickets is None:
+            return {'checked': 0, 'ok': 0, 'error': 0, 'pruned': 0}
+        cutoff = datetime.now(timezone.utc) - self.delay
+        rows = list(
+            self.tickets.find({'sent_at': {'$lte': cutoff}}, {'token': 1, 'delivery_id': 1})
+            .sort('sent_at', 1)
+            .limit(self.max_tickets)
+        )
+        receipts = self.sender.get_receipts([row['_id'] for row in rows]) if rows else {}
+
+        done_ids, dead_tokens = [], []
+        errors: Dict[str, List[str]] = {}
+        ok_count = 0
+        for row in rows:
+            receipt = receipts.get(row['_id'])
+            if not isinstance(receipt, dict):
+                continue
+            done_ids.append(row['_id'])
+            if receipt.get('status') == 'ok':
+                ok_count += 1
+                continue
+            error = (receipt.get('details') or {}).get('error') or receipt.get('message') or 'receipt error'
+            if row.get('delivery_id'):
+                errors.setdefault(error, []).append(row['delivery_id'])
+            if error == 'DeviceNotRegistered' and row.get('token'):
+                dead_tokens.append(row['token'])
+
+        if self.deliveries is not None:
+            now = datetime.now(timezone.utc)
+            for error, delivery_ids in errors.items():
+                self.deliveries.update_many(
+                    {'_id': {'$in': delivery_ids}},
+                    {'$set': {'status': 'failed', 'receipt_error': error, 'updated_at': now}},
+                )
+        pruned = 0
+        if dead_tokens and self.prune_tokens is not None:
+            pruned = int(self.prune_tokens(sorted(set(dead_tokens))) or 0)
+        if done_ids:
+            self.tickets.delete_many({'_id': {'$in': done_ids}})
+
+        error_count = sum(len(ids) for ids in errors.values())
+        with self._lock:
+            self._counters['polls'] += 1
+            self._counters['receipts_ok'] += ok_count
+            self._counters['receipts_error'] += error_count
+            self._counters['tokens_pruned'] += pruned
+        return {'checked': len(rows), 'ok': ok_count, 'error': error_count, 'pruned': pruned}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,54 @@
+"""Fast JSON encoding (orjson when installed, stdlib json otherwise) and gzip for large API responses."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import date, datetime
+from typing import Any, Optional, Tuple
+
+try:
+    import orjson
+except Exception:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+
+
+def _default(value: Any) -> Any:
+    """ObjectId and friends as strings, dates as ISO, the same as the endpoints' manual conversions."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def encoder_name() -> str:
+    return 'orjson' if orjson is not None else 'json'
+
+
+def dumps(payload: Any) -> bytes:
+    """Compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; stdlib json handles them
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for part in str(accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '').lower() not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def maybe_gzip(body: bytes, accept_encoding: Optional[str], min_bytes: int = GZIP_MIN_BYTES) -> Tuple[bytes, bool]:
+    """(body, gzipped): compress only bodies big enough to be worth it, for clients that accept gzip."""
+    if len(body) < min_bytes or not accepts_gzip(accept_encoding):
+        return body, False
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), True
@@ -0,0 +1,179 @@
+"""Shared outbound HTTP client: pooled keep-alive sessions per host, timeouts, jittered
+retries, conditional GET (ETag / Last-Modified) and per-upstream latency histograms."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import LatencyHistogram
+
+# (connect, read) seconds. Connect is short so a dead upstream fails fast.
+DEFAULT_TIMEOUT = (3.05, 10)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** max(0, attempt))))
+
+
+def _retry_after_seconds(response, cap: float = 30.0) -> Optional[float]:
+    raw = response.headers.get('Retry-After') if response is not None else None
+    try:
+        return min(cap, max(0.0, float(raw))) if raw is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 16,
+                 default_timeout: Tuple[float, float] = DEFAULT_TIMEOUT, validator_cache_size: int = 256):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.default_timeout = default_timeout
+        self._sessions: Dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+
+        # url -> last 200 response carrying an ETag/Last-Modified validator
+        self._validated: "OrderedDict[str, requests.Response]" = OrderedDict()
+        self._validated_lock = threading.Lock()
+        self._validator_cache_size = max(1, int(validator_cache_size))
+
+        self._stats_lock = threading.Lock()
+        self._latency: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _session(self, url: str) -> requests.Session:
+        host = urlsplit(url).netloc
+        with self._sessions_lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=0,  # retries are handled here, with jitter and metrics
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def _count(self, upstream: str, key: str) -> None:
+        with self._stats_lock:
+            counters = self._counters.setdefault(
+                upstream, {'requests': 0, 'errors': 0, 'retries': 0, 'not_modified': 0}
+            )
+            counters[key] = counters.get(key, 0) + 1
+
+    def _observe(self, upstream: str, seconds: float) -> None:
+        with self._stats_lock:
+            histogram = self._latency.get(upstream)
+            if histogram is None:
+                histogram = self._latency[upstream] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def request(self, method: str, url: str, upstream: Optional[str] = None, retries: int = 0,
+                backoff: float = 0.5, **kwargs) -> requests.Response:
+        """Send a request through the host's pooled session.
+
+        Failures are retried with jittered backoff. Idempotent methods retry any
+        connection error, timeout or RETRY_STATUSES response. Other methods (POST)
+        retry only when the upstream cannot have processed the request: a connect
+        timeout or a 429. After a reset, read timeout or 5xx it may already have.
+        """
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        upstream = upstream or urlsplit(url).netloc
+        kwargs.setdefault('timeout', self.default_timeout)
+        session = self._session(url)
+
+        attempt = 0
+        while True:
+            self._count(upstream, 'requests')
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except requests.RequestException as exc:
+                self._observe(upstream, time.perf_counter() - started)
+                self._count(upstream, 'errors')
+                if idempotent:
+                    retryable = isinstance(exc, (requests.ConnectionError, requests.Timeout))
+                else:
+                    retryable = isinstance(exc, requests.ConnectTimeout)
+                if not retryable or attempt >= retries:
+                    raise
+                self._count(upstream, 'retries')
+                time.sleep(backoff_delay(attempt, base=backoff))
+                attempt += 1
+                continue
+
+            self._observe(upstream, time.perf_counter() - started)
+            if response.status_code >= 500:
+                self._count(upstream, 'errors')
+            retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+            if retryable and attempt < retries:
+                self._count(upstream, 'retries')
+                delay = _retry_after_seconds(response)
+                response.close()
+                time.sleep(delay if delay is not None else backoff_delay(attempt, base=backoff))
+                attempt += 1
+                continue
+            return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def conditional_get(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                        upstream: Optional[str] = None, **kwargs) -> requests.Response:
+        """GET with If-None-Match / If-Modified-Since; a 304 returns the previously cached 200 response."""
+        cache_key = requests.Request('GET', url, params=params).prepare().url
+        with self._validated_lock:
+            cached = self._validated.get(cache_key)
+
+        request_headers = dict(headers or {})
+        if cached is not None:
+            if cached.headers.get('ETag'):
+                request_headers['If-None-Match'] = cached.headers['ETag']
+            if cached.headers.get('Last-Modified'):
+                request_headers['If-Modified-Since'] = cached.headers['Last-Modified']
+
+        response = self.get(url, params=params, headers=request_headers, upstream=upstream, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            self._count(upstream or urlsplit(url).netloc, 'not_modified')
+            return cached
+
+        if response.status_code == 200 and (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            _ = response.content  # read the body now so the cached object stays usable
+            with self._validated_lock:
+                self._validated[cache_key] = response
+                self._validated.move_to_end(cache_key)
+                while len(self._validated) > self._validator_cache_size:
+                    self._validated.popitem(last=False)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            upstreams = set(self._counters) | set(self._latency)
+            counters = {name: dict(self._counters.get(name, {})) for name in upstreams}
+            histograms = dict(self._latency)
+        return {
+            name: {**counters[name], 'latency': histograms[name].snapshot() if name in histograms else None}
+            for name in sorted(upstreams)
+        }
+
+
+# Process-wide client shared by all external integrations
+http_client = HttpClient()
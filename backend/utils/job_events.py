@@ -0,0 +1,134 @@
+"""Job state fan-out for Server-Sent Event streams: one batched watcher per process instead of per-client polling."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+TERMINAL_JOB_STATUSES = ('completed', 'failed')
+
+
+def sse_event(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    """Encode one Server-Sent Event frame."""
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    lines.extend(f'data: {line}' for line in payload.split('\n'))
+    return '\n'.join(lines) + '\n\n'
+
+
+def _job_signature(job: Dict[str, Any]):
+    return (str(job.get('status') or '').lower(), job.get('updated_ts'))
+
+
+class JobSubscription:
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._queue: "Queue[Dict[str, Any]]" = Queue()
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def offer(self, job: Dict[str, Any]) -> bool:
+        """Queue the job snapshot if its status/updated_ts moved since the last delivery."""
+        signature = _job_signature(job)
+        with self._lock:
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            self._queue.put(dict(job))
+        return True
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return self._queue.get(timeout=max(0.0, timeout))
+        except Empty:
+            return None
+
+
+class JobEventHub:
+    """Delivers job state changes to open streams.
+
+    Changes made in this process are pushed immediately through publish(). Jobs
+    run by another process (the worker role) are picked up by a single watcher
+    thread that loads every subscribed job with one batched query per poll
+    interval, so N open streams cost one read per tick rather than N polls.
+    The watcher only runs while there are subscribers.
+    """
+
+    def __init__(self, loader: Callable[[List[str]], Iterable[Dict[str, Any]]],
+                 poll_seconds: float = 1.0, max_subscribers: int = 200):
+        self.loader = loader
+        self.poll_seconds = max(0.1, float(poll_seconds))
+        self.max_subscribers = max(1, int(max_subscribers))
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, List[JobSubscription]] = {}
+        self._count = 0
+        self._watcher: Optional[threading.Thread] = None
+        self._loads = 0
+
+    def subscribe(self, job_id: str, current: Optional[Dict[str, Any]] = None) -> Optional[JobSubscription]:
+        """Returns None when the process is already serving max_subscribers streams."""
+        subscription = JobSubscription(str(job_id))
+        if current:
+            subscription.offer(current)
+
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            self._subscriptions.setdefault(subscription.job_id, []).append(subscription)
+            self._count += 1
+            if self._watcher is None or not self._watcher.is_alive():
+                self._watcher = threading.Thread(target=self._watch, name='job-events-watcher', daemon=True)
+                self._watcher.start()
+        return subscription
+
+    def unsubscribe(self, subscription: JobSubscription) -> None:
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.job_id)
+            if not subscribers or subscription not in subscribers:
+                return
+            subscribers.remove(subscription)
+            self._count -= 1
+            if not subscribers:
+                self._subscriptions.pop(subscription.job_id, None)
+
+    def publish(self, job: Optional[Dict[str, Any]]) -> None:
+        if not job or not job.get('job_id'):
+            return
+        with self._lock:
+            subscribers = list(self._subscriptions.get(str(job['job_id']), ()))
+        for subscription in subscribers:
+            subscription.offer(job)
+
+    def _watch(self) -> None:
+        while True:
+            with self._lock:
+                job_ids = list(self._subscriptions)
+                if not job_ids:
+                    self._watcher = None
+                    return
+
+            try:
+                jobs = list(self.loader(job_ids) or [])
+                self._loads += 1
+            except Exception as e:
+                print(f"[WARN] job events load failed: {e}", flush=True)
+                jobs = []
+
+            for job in jobs:
+                self.publish(job)
+            time.sleep(self.poll_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'subscribers': self._count,
+                'jobs_watched': len(self._subscriptions),
+                'batched_loads': self._loads,
+                'max_subscribers': self.max_subscribers,
+            }
@@ -0,0 +1,268 @@
+"""In-process job scheduler: drift-free interval and cron triggers, jitter, overrun protection and leased singleton runs."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.metrics import LatencyHistogram
+
+
+class IntervalTrigger:
+    """Every `seconds`, anchored to the first run: slot k fires at first + k*seconds, so runs never drift."""
+
+    def __init__(self, seconds: float, start_delay: float = 0.0):
+        self.seconds = max(1.0, float(seconds))
+        self.start_delay = max(0.0, float(start_delay))
+
+    def describe(self) -> str:
+        return f'every {self.seconds:g}s'
+
+    def first_run(self, now: float) -> float:
+        return now + self.start_delay
+
+    def next_run(self, previous: float, now: float) -> Tuple[Optional[float], int]:
+        """Next slot after now and the number of whole slots that were missed."""
+        missed = max(0, int((now - previous) // self.seconds))
+        return previous + (missed + 1) * self.seconds, missed
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> List[int]:
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_raw = part.split('/', 1)
+            step = max(1, int(step_raw))
+        if part in ('*', ''):
+            start, end = low, high
+        elif '-' in part:
+            start_raw, end_raw = part.split('-', 1)
+            start, end = int(start_raw), int(end_raw)
+        else:
+            start = end = int(part)
+        if start < low or end > high or start > end:
+            raise ValueError(f'cron field out of range: {field}')
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+class CronTrigger:
+    """Five-field cron expression in UTC ("minute hour day month weekday"; weekday 0=Monday).
+
+    Day-of-month and month must be "*"; the backend only needs minute/hour/weekday schedules.
+    """
+
+    def __init__(self, expression: str, run_at_start: bool = False):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f'cron expression needs 5 fields: {expression!r}')
+        minute, hour, day, month, weekday = fields
+        if day != '*' or month != '*':
+            raise ValueError('cron day-of-month and month fields are not supported')
+        self.expression = expression
+        self.minutes = set(_parse_cron_field(minute, 0, 59))
+        self.hours = set(_parse_cron_field(hour, 0, 23))
+        self.weekdays = set(_parse_cron_field(weekday, 0, 6))
+        self.run_at_start = run_at_start
+
+    def _next_after(self, ts: float) -> float:
+        moment = datetime.fromtimestamp(ts, timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(8 * 24 * 60):
+            if moment.minute in self.minutes and moment.hour in self.hours and moment.weekday() in self.weekdays:
+                return moment.timestamp()
+            moment += timedelta(minutes=1)
+        raise ValueError(f'cron expression never fires: {self.expression!r}')
+
+    def describe(self) -> str:
+        return f'cron {self.expression}'
+
+    def first_run(self, now: float) -> float:
+        return now if self.run_at_start else self._next_after(now)
+
+    def next_run(self, previous: float, now: float) -> Tuple[Optional[float], int]:
+        upcoming = self._next_after(previous)
+        missed = 0
+        while upcoming <= now:
+            missed += 1
+            upcoming = self._next_after(upcoming)
+        return upcoming, missed
+
+
+class OnceTrigger:
+    def __init__(self, start_delay: float = 0.0):
+        self.start_delay = max(0.0, float(start_delay))
+
+    def describe(self) -> str:
+        return 'once'
+
+    def first_run(self, now: float) -> float:
+        return now + self.start_delay
+
+    def next_run(self, previous: float, now: float) -> Tuple[Optional[float], int]:
+        return None, 0
+
+
+class _Job:
+    def __init__(self, name, func, trigger, jitter_seconds, lease_ttl_seconds):
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.jitter_seconds = max(0.0, float(jitter_seconds))
+        self.lease_ttl_seconds = lease_ttl_seconds
+        self.lease_id: Optional[str] = None
+        self.running = False
+        self.next_slot: Optional[float] = None
+        self.next_run_at: Optional[float] = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped_overrun = 0
+        self.skipped_missed = 0
+        self.skipped_not_leader = 0
+        self.last_started_at: Optional[float] = None
+        self.last_success_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.durations = LatencyHistogram(max_samples=256)
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+class JobScheduler:
+    """One dispatcher thread for all periodic background jobs.
+
+    Each due run is handed to a small pool. A run that is still in progress when
+    its next slot comes up is skipped (overrun protection), and slots missed
+    while the process was busy are counted rather than replayed. Jobs with a
+    lease TTL only run while this process holds their singleton lease in the
+    shared LeaseManager, whose single heartbeat renews every lease.
+    """
+
+    def __init__(self, leases=None, max_workers: int = 8,
+                 on_error: Optional[Callable[[str, str], None]] = None,
+                 on_standby: Optional[Callable[[str, str], None]] = None):
+        self.leases = leases
+        self.on_error = on_error
+        self.on_standby = on_standby
+        self._jobs: Dict[str, _Job] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix='job-scheduler')
+        self._stopped = False
+
+    def add_job(self, name: str, func: Callable[[], Any], trigger, jitter_seconds: float = 0.0,
+                lease_ttl_seconds: Optional[int] = None) -> None:
+        job = _Job(name, func, trigger, jitter_seconds, lease_ttl_seconds)
+        now = time.time()
+        job.next_slot = trigger.first_run(now)
+        with self._cond:
+            self._jobs[name] = job
+            self._push(job)
+            self._cond.notify()
+
+    def _push(self, job: _Job) -> None:
+        jitter = random.uniform(0, job.jitter_seconds) if job.jitter_seconds else 0.0
+        job.next_run_at = job.next_slot + jitter
+        heapq.heappush(self._heap, (job.next_run_at, next(self._seq), job.name))
+
+    def run(self) -> None:
+        """Dispatcher loop; call from a (post-fork) daemon thread."""
+        while True:
+            with self._cond:
+                while not self._stopped and (not self._heap or self._heap[0][0] > time.time()):
+                    timeout = self._heap[0][0] - time.time() if self._heap else None
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+                _due, _seq, name = heapq.heappop(self._heap)
+                job = self._jobs.get(name)
+            if job is not None:
+                self._dispatch(job)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _holds_lease(self, job: _Job) -> bool:
+        if self.leases is None or job.lease_ttl_seconds is None:
+            return True
+        if job.lease_id and self.leases.renew(job.lease_id):
+            return True
+        if job.lease_id:
+            self.leases.release(job.lease_id)
+        job.lease_id = self.leases.acquire(job.name, job.lease_ttl_seconds)
+        return job.lease_id is not None
+
+    def _dispatch(self, job: _Job) -> None:
+        now = time.time()
+        if job.running:
+            job.skipped_overrun += 1
+        elif not self._holds_lease(job):
+            job.skipped_not_leader += 1
+            if self.on_standby:
+                self.on_standby(job.name, 'lease held by another worker')
+        else:
+            job.running = True
+            job.last_started_at = now
+            self._pool.submit(self._run_job, job)
+
+        next_slot, missed = job.trigger.next_run(job.next_slot, now)
+        job.skipped_missed += missed
+        with self._cond:
+            if next_slot is None:
+                job.next_slot = job.next_run_at = None
+                return
+            job.next_slot = next_slot
+            self._push(job)
+
+    def _run_job(self, job: _Job) -> None:
+        started = time.perf_counter()
+        try:
+            job.func()
+            job.last_success_at = time.time()
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            print(f"[WARN] Scheduled job {job.name} failed: {e}", flush=True)
+            if self.on_error:
+                self.on_error(job.name, str(e))
+        finally:
+            job.durations.observe(time.perf_counter() - started)
+            job.runs += 1
+            job.running = False
+            if isinstance(job.trigger, OnceTrigger) and job.lease_id and self.leases is not None:
+                # One-shot jobs give their lease back when done.
+                self.leases.release(job.lease_id)
+                job.lease_id = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            jobs = list(self._jobs.values())
+        return {
+            job.name: {
+                'trigger': job.trigger.describe(),
+                'running': job.running,
+                'runs': job.runs,
+                'failures': job.failures,
+                'skipped_runs': {
+                    'overrun': job.skipped_overrun,
+                    'missed': job.skipped_missed,
+                    'not_leader': job.skipped_not_leader,
+                },
+                'last_success_at': _iso(job.last_success_at),
+                'last_error': job.last_error,
+                'next_run_at': _iso(job.next_run_at),
+                'duration': job.durations.snapshot(),
+            }
+            for job in jobs
+        }
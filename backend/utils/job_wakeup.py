@@ -0,0 +1,106 @@
+"""Queue worker wake-ups: Mongo change-stream notifications on enqueue plus adaptive idle backoff."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Change streams need a replica set / Atlas; standalone servers reject them with these codes.
+_CHANGE_STREAM_UNSUPPORTED_CODES = (40573, 40415, 136)
+
+
+class IdleBackoff:
+    """Exponential idle delay: min_seconds after work, doubling up to max_seconds while the queue stays empty."""
+
+    def __init__(self, min_seconds: float = 1.0, max_seconds: float = 30.0, factor: float = 2.0):
+        self.min_seconds = max(0.05, float(min_seconds))
+        self.max_seconds = max(self.min_seconds, float(max_seconds))
+        self.factor = max(1.0, float(factor))
+        self._current = self.min_seconds
+
+    def reset(self) -> None:
+        self._current = self.min_seconds
+
+    def next_delay(self) -> float:
+        delay = self._current
+        self._current = min(self.max_seconds, self._current * self.factor)
+        return delay
+
+
+class JobWakeup:
+    """Wakes an idle queue worker as soon as a job is enqueued.
+
+    Enqueues from this process call notify() directly. Enqueues from other
+    processes are seen through a change stream on inserts into the jobs
+    collection. When change streams are unavailable the worker simply sleeps
+    its idle backoff, so claim latency degrades to at most the backoff cap.
+    """
+
+    def __init__(self, name: str = 'jobs', reconnect_seconds: float = 30.0):
+        self.name = name
+        self.reconnect_seconds = max(1.0, float(reconnect_seconds))
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._collection = None
+        self._stream_supported = True
+        self._stream_active = False
+        self._wakeups = 0
+        self._timeouts = 0
+
+    def notify(self) -> None:
+        self._event.set()
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to timeout seconds; True when woken by an enqueue."""
+        woken = self._event.wait(max(0.0, timeout))
+        self._event.clear()
+        with self._lock:
+            if woken:
+                self._wakeups += 1
+            else:
+                self._timeouts += 1
+        return woken
+
+    @property
+    def stream_active(self) -> bool:
+        return self._stream_active
+
+    def watch(self, collection) -> None:
+        """Start the change-stream watcher for inserts into collection (idempotent)."""
+        if collection is None:
+            return
+        with self._lock:
+            self._collection = collection
+            if not self._stream_supported or (self._watcher is not None and self._watcher.is_alive()):
+                return
+            self._watcher = threading.Thread(target=self._watch_loop, name=f'{self.name}-wakeup', daemon=True)
+            self._watcher.start()
+
+    def _watch_loop(self) -> None:
+        while self._stream_supported:
+            collection = self._collection
+            try:
+                with collection.watch([{'$match': {'operationType': 'insert'}}], max_await_time_ms=30000) as stream:
+                    self._stream_active = True
+                    for _change in stream:
+                        self.notify()
+            except Exception as e:
+                self._stream_active = False
+                if getattr(e, 'code', None) in _CHANGE_STREAM_UNSUPPORTED_CODES:
+                    self._stream_supported = False
+                    print(f"[INFO] {self.name} change stream unsupported, using idle backoff only: {e}", flush=True)
+                    return
+                print(f"[WARN] {self.name} change stream error, retrying in {int(self.reconnect_seconds)}s: {e}", flush=True)
+                time.sleep(self.reconnect_seconds)
+            finally:
+                self._stream_active = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'change_stream': 'active' if self._stream_active else ('unsupported' if not self._stream_supported else 'inactive'),
+                'wakeups': self._wakeups,
+                'idle_timeouts': self._timeouts,
+            }
@@ -0,0 +1,148 @@
+"""Content-addressed LLM response cache: sha256(model, normalized prompt, safety) -> response."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so cosmetic template changes still hit the same entry."""
+    return _WHITESPACE_RE.sub(' ', str(prompt or '')).strip()
+
+
+def llm_cache_key(model: str, prompt: str, safety: Any = None, force_json: bool = False) -> str:
+    material = json.dumps(
+        [str(model or ''), normalize_prompt(prompt), safety, bool(force_json)],
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """Mongo-backed cache with an in-process LRU in front.
+
+    Entries expire through a TTL index on expires_at; the collection is also
+    trimmed to max_entries (oldest first) so it cannot grow without bound.
+    """
+
+    TRIM_EVERY_PUTS = 50
+
+    def __init__(self, collection=None, ttl_seconds: int = 21600, max_entries: int = 5000,
+                 max_response_chars: int = 20000, local_entries: int = 256):
+        self.collection = collection
+        self.ttl_seconds = max(60, int(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self.max_response_chars = max(1, int(max_response_chars))
+        self._local: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._local_entries = max(1, int(local_entries))
+        self._lock = threading.Lock()
+        self._indexes_ready = False
+        self._puts_since_trim = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, prompt_type: str, outcome: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(prompt_type, {'hits': 0, 'misses': 0, 'stores': 0})
+            counters[outcome] += 1
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._local[key] = entry
+            self._local.move_to_end(key)
+            while len(self._local) > self._local_entries:
+                self._local.popitem(last=False)
+
+    def get(self, key: str, prompt_type: str = 'generic') -> Optional[str]:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._local.get(key)
+        if entry is not None and entry['expires_at'] > now:
+            self._record(prompt_type, 'hits')
+            return entry['response']
+
+        if self.collection is not None:
+            try:
+                doc = self.collection.find_one({'_id': key, 'expires_at': {'$gt': now}}, {'response': 1, 'expires_at': 1})
+            except Exception as e:
+                print(f"[WARN] LLM cache lookup failed: {e}", flush=True)
+                doc = None
+            if doc and doc.get('response'):
+                expires_at = doc.get('expires_at')
+                if isinstance(expires_at, datetime) and expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                self._remember(key, {'response': doc['response'], 'expires_at': expires_at or now})
+                self._record(prompt_type, 'hits')
+                return doc['response']
+
+        self._record(prompt_type, 'misses')
+        return None
+
+    def put(self, key: str, response: str, prompt_type: str = 'generic', model: str = '') -> bool:
+        if not response or len(response) > self.max_response_chars:
+            return False
+
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        self._remember(key, {'response': response, 'expires_at': expires_at})
+        self._record(prompt_type, 'stores')
+
+        if self.collection is None:
+            return True
+
+        try:
+            self._ensure_indexes()
+            self.collection.replace_one(
+                {'_id': key},
+                {
+                    'response': response,
+                    'prompt_type': prompt_type,
+                    'model': model,
+                    'created_at': now,
+                    'expires_at': expires_at,
+                },
+                upsert=True,
+            )
+            self._maybe_trim()
+        except Exception as e:
+            print(f"[WARN] LLM cache store failed: {e}", flush=True)
+            return False
+        return True
+
+    def _ensure_indexes(self) -> None:
+        if self._indexes_ready:
+            return
+        self.collection.create_index('expires_at', name='ttl_llm_cache_expires', expireAfterSeconds=0)
+        self.collection.create_index('created_at', name='idx_llm_cache_created')
+        self._indexes_ready = True
+
+    def _maybe_trim(self) -> None:
+        with self._lock:
+            self._puts_since_trim += 1
+            if self._puts_since_trim < self.TRIM_EVERY_PUTS:
+                return
+            self._puts_since_trim = 0
+
+        overflow = self.collection.find({}, {'_id': 1}).sort('created_at', -1).skip(self.max_entries).limit(1000)
+        stale_ids = [doc['_id'] for doc in overflow]
+        if stale_ids:
+            self.collection.delete_many({'_id': {'$in': stale_ids}})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_type = {name: dict(counters) for name, counters in self._stats.items()}
+            local_entries = len(self._local)
+
+        for counters in by_type.values():
+            lookups = counters['hits'] + counters['misses']
+            counters['hit_rate'] = round(counters['hits'] / lookups, 3) if lookups else None
+        return {'local_entries': local_entries, 'by_prompt_type': by_type}
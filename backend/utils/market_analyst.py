@@ -4,22 +4,14 @@ import random
 import json
 import ast
 import time
-import requests
 import urllib.parse
 import re
 import os
 
-# google-genai import (failsafe)
-try:
-    from google import genai
-    from google.genai import types as genai_types
-    GENAI_AVAILABLE = True
-    print("[OK] google-genai imported successfully", flush=True)
-except Exception as e:
-    print(f"[ERROR] google-genai import failed: {e}", flush=True)
-    GENAI_AVAILABLE = False
-    genai = None
-    genai_types = None
+import importlib.util
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
 
 from datetime import datetime, timedelta, timezone
 from pymongo import MongoClient
@@ -32,6 +24,45 @@ from config.settings import (
 )
 from utils.tradingview_handler import tradingview_handler
 from utils.alphavantage_handler import alphavantage_handler
+from utils.runtime_profile import lazy_import
+from utils.news_ingest import fetch_calendar_ingest
+from utils.http_client import backoff_delay, http_client
+from utils.llm_cache import LLMResponseCache, llm_cache_key
+from utils.metrics import LatencyHistogram
+
+# google-genai is imported on the first AI call, not at module load: the API role
+# mostly serves cached analyses and should not pay its import time/RSS at startup.
+try:
+    GENAI_AVAILABLE = importlib.util.find_spec("google.genai") is not None
+except Exception:
+    GENAI_AVAILABLE = False
+genai = None
+genai_types = None
+
+
+def _load_genai():
+    """Import google-genai once (failsafe). Returns True when the SDK is usable."""
+    global genai, genai_types, GENAI_AVAILABLE
+    if genai is not None:
+        return True
+    if not GENAI_AVAILABLE:
+        return False
+
+    try:
+        loaded_types = lazy_import("google.genai.types")
+        genai = lazy_import("google.genai")
+        genai_types = loaded_types
+        print("[OK] google-genai imported successfully", flush=True)
+        return True
+    except Exception as e:
+        print(f"[ERROR] google-genai import failed: {e}", flush=True)
+        GENAI_AVAILABLE = False
+        return False
+
+# analyze_specific_event failure texts (shown to users, never cached as analyses)
+EVENT_ANALYSIS_AI_FAILED = "AI холболт амжилтгүй боллоо."
+EVENT_ANALYSIS_ERROR = "Дэлгэрэнгүй мэдээлэл авахад алдаа гарлаа."
+
 
 class MarketAnalyst:
     """
@@ -54,7 +85,7 @@ class MarketAnalyst:
         self.allow_external_fallback = bool(ALLOW_EXTERNAL_LLM_FALLBACK)
 
         if self.api_keys and GENAI_AVAILABLE:
-            self._configure_gemini()
+            # Client is created lazily by _ensure_gemini() on the first AI call.
             print(f"[INFO] {len(self.api_keys)} Gemini API key бэлэн байна.", flush=True)
         else:
             if not GENAI_AVAILABLE:
@@ -75,26 +106,16 @@ class MarketAnalyst:
         self._mongo_available = False
 
         try:
-            self.client = MongoClient(
-                MONGO_URI,
-                serverSelectionTimeoutMS=1500,
-                connectTimeoutMS=1500,
-                socketTimeoutMS=5000,
-                maxPoolSize=20,
-                minPoolSize=0,
-                retryWrites=True,
-                retryReads=True,
-                appname="predictrix-market-analyst",
-                connect=False,
-            )
-            self.db = self.client.get_database()
-            self.news_collection = self.db.news_analysis
-            self.insights_collection = self.db.ai_insights
-            self._mongo_available = True
-            print("[INFO] MarketAnalyst Mongo client initialized (lazy mode)", flush=True)
-        except Exception as e:
-            print(f"[WARN] MongoDB client init failed, offline горимд ажиллана: {e}", flush=True)
-            self._disable_mongo()
+            llm_cache_ttl = int(os.environ.get('LLM_CACHE_TTL_SECONDS', '21600'))
+        except Exception:
+            llm_cache_ttl = 21600
+        try:
+            llm_cache_max_entries = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', '5000'))
+        except Exception:
+            llm_cache_max_entries = 5000
+        self.llm_cache = LLMResponseCache(ttl_seconds=llm_cache_ttl, max_entries=llm_cache_max_entries)
+
+        self._connect_mongo()
 
         # Cache settings (per-pair)
         self._insight_cache = {}  # { pair: { "data": ..., "time": ... } }
@@ -127,6 +148,27 @@ class MarketAnalyst:
         self._fallback_fail_count = 0
         self._fallback_circuit_open_until = 0.0
 
+        # ─── Hedged requests: Gemini удаан бол Pollinations-ийг зэрэг ажиллуулна ───
+        self.HEDGE_ENABLED = os.environ.get('AI_HEDGE_ENABLED', 'true').strip().lower() in ('1', 'true', 'yes', 'on')
+        try:
+            self.HEDGE_PERCENTILE = min(99.0, max(50.0, float(os.environ.get('AI_HEDGE_PERCENTILE', '90'))))
+        except Exception:
+            self.HEDGE_PERCENTILE = 90.0
+        try:
+            self.HEDGE_MIN_SECONDS = max(0.5, float(os.environ.get('AI_HEDGE_MIN_SECONDS', '2')))
+        except Exception:
+            self.HEDGE_MIN_SECONDS = 2.0
+        try:
+            self.HEDGE_MAX_SECONDS = max(self.HEDGE_MIN_SECONDS, float(os.environ.get('AI_HEDGE_MAX_SECONDS', '20')))
+        except Exception:
+            self.HEDGE_MAX_SECONDS = max(self.HEDGE_MIN_SECONDS, 20.0)
+        self.HEDGE_DEFAULT_SECONDS = min(self.HEDGE_MAX_SECONDS, max(self.HEDGE_MIN_SECONDS, 8.0))
+        self.HEDGE_MIN_SAMPLES = 5
+        self._provider_latency = {'gemini': LatencyHistogram(), 'pollinations': LatencyHistogram()}
+        self._hedge_stats = {}
+        self._hedge_lock = threading.Lock()
+        self._hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='ai-hedge')
+
         try:
             self.MAX_PROMPT_CHARS = max(2000, int(os.environ.get('AI_PROMPT_MAX_CHARS', '12000')))
         except Exception:
@@ -139,12 +181,43 @@ class MarketAnalyst:
             re.compile(r"\b(all\s+in|bet\s+everything)\b", re.IGNORECASE),
         ]
 
+    def _connect_mongo(self):
+        # MongoDB connection (lazy mode to avoid blocking app startup on network/DNS issues)
+        try:
+            self.client = MongoClient(
+                MONGO_URI,
+                serverSelectionTimeoutMS=1500,
+                connectTimeoutMS=1500,
+                socketTimeoutMS=5000,
+                maxPoolSize=20,
+                minPoolSize=0,
+                retryWrites=True,
+                retryReads=True,
+                appname="predictrix-market-analyst",
+                connect=False,
+            )
+            self.db = self.client.get_database()
+            self.news_collection = self.db.news_analysis
+            self.insights_collection = self.db.ai_insights
+            self.llm_cache.collection = self.db.llm_cache
+            self._mongo_available = True
+            print("[INFO] MarketAnalyst Mongo client initialized (lazy mode)", flush=True)
+        except Exception as e:
+            print(f"[WARN] MongoDB client init failed, offline горимд ажиллана: {e}", flush=True)
+            self._disable_mongo()
+
+    def reconnect(self):
+        """Replace the Mongo client after fork (pymongo clients are not fork-safe)."""
+        self._disable_mongo()
+        self._connect_mongo()
+
     def _disable_mongo(self):
         """Disable Mongo usage for the current process after connectivity failure."""
         self._mongo_available = False
         self.db = None
         self.news_collection = None
         self.insights_collection = None
+        self.llm_cache.collection = None
         try:
             if self.client is not None:
                 self.client.close()
@@ -214,11 +287,17 @@ class MarketAnalyst:
         except Exception as e:
             print(f"[ERROR] Gemini Configuration Error: {e}", flush=True)
 
+    def _ensure_gemini(self):
+        """Import google-genai and build the client on first use."""
+        if self.gemini is None and self.api_keys and _load_genai():
+            self._configure_gemini()
+        return self.gemini is not None
+
     def _probe_flash(self):
         """Key#1-ээр Flash-г туршиж сэргэсэн эсэхийг шалгана.
         Returns True хэрэв Flash ажилласан бол, False бол.
         """
-        if not self.gemini or not GENAI_AVAILABLE:
+        if not self._ensure_gemini():
             return False
         saved_index = self.current_key_index
         try:
@@ -363,8 +442,142 @@ class MarketAnalyst:
             genai_types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold=threshold),
         ]
 
-    def _call_ai(self, prompt, force_json=False, model=None, retries=3):
-        """Unified AI caller: Gemini (key circular rotation) -> optional Pollinations fallback.
+    def _call_ai(self, prompt, force_json=False, model=None, retries=3, prompt_type='generic', use_cache=True):
+        """_call_ai_uncached with a content-addressed response cache in front.
+
+        Key = sha256(model, normalized prompt, safety mode, json flag), so a
+        byte-identical prompt rebuilt after an in-memory TTL expiry skips the LLM round trip.
+        Responses are stored under the Gemini model that actually answered (Flash may
+        fall back to Lite); Pollinations answers are not cached.
+        """
+        use_model = model or self.LITE_MODEL
+        sanitized_prompt = self._sanitize_prompt(prompt)
+        key = llm_cache_key(use_model, sanitized_prompt, self.safety_mode, force_json)
+        if use_cache:
+            cached = self.llm_cache.get(key, prompt_type)
+            if cached is not None:
+                print(f"[LLM CACHE HIT] {prompt_type} ({key[:12]})", flush=True)
+                return cached
+
+        served = {}
+        text = self._call_ai_uncached(prompt, force_json=force_json, model=use_model, retries=retries, served=served)
+        served_model = served.get('model')
+        if text and served_model and (not force_json or self._is_valid_json(text)):
+            if served_model != use_model:
+                key = llm_cache_key(served_model, sanitized_prompt, self.safety_mode, force_json)
+            self.llm_cache.put(key, text, prompt_type=prompt_type, model=served_model)
+        return text
+
+    @staticmethod
+    def _is_valid_json(text):
+        try:
+            json.loads(text)
+            return True
+        except (TypeError, ValueError):
+            return False
+
+    def _call_ai_uncached(self, prompt, force_json=False, model=None, retries=3, served=None):
+        """Unified AI caller: Gemini -> optional Pollinations fallback, hedged on slow primaries.
+
+        Gemini-д hedge delay (сүүлийн latency-ийн percentile) дотор хариу ирээгүй бол
+        Pollinations-ийг зэрэг ажиллуулж, эхэлж ирсэн хүчинтэй хариуг авна; нөгөөг үл тооно.
+        When Gemini's answer is returned, served['model'] is set to the model that produced it.
+        """
+        use_model = model or self.LITE_MODEL
+        sanitized_prompt = self._sanitize_prompt(prompt)
+        # Only copied into `served` once the primary's text is the one returned: a losing
+        # hedged primary may still finish and fill its own dict afterwards.
+        gemini_served = {}
+
+        if not self._ensure_gemini():
+            return self._call_pollinations(sanitized_prompt, force_json=force_json, retries=retries)
+
+        if not self._can_hedge():
+            text = self._call_gemini(prompt, force_json=force_json, model=use_model, served=gemini_served)
+            if text:
+                if served is not None:
+                    served.update(gemini_served)
+                return text
+            return self._call_pollinations(sanitized_prompt, force_json=force_json, retries=retries)
+
+        hedge_delay = self._hedge_delay_seconds()
+        primary = self._hedge_executor.submit(
+            self._call_gemini, prompt, force_json=force_json, model=use_model, served=gemini_served,
+        )
+        try:
+            text = primary.result(timeout=hedge_delay)
+        except FutureTimeoutError:
+            pass
+        except Exception as e:
+            print(f"[WARN] Gemini call failed: {e}", flush=True)
+            return self._call_pollinations(sanitized_prompt, force_json=force_json, retries=retries)
+        else:
+            if text:
+                self._count_hedge('primary_only')
+                if served is not None:
+                    served.update(gemini_served)
+                return text
+            # Gemini failed fast (keys exhausted / model error): plain sequential fallback.
+            return self._call_pollinations(sanitized_prompt, force_json=force_json, retries=retries)
+
+        print(f"[INFO] Gemini [{use_model}] > {hedge_delay:.1f}s → Pollinations hedge зэрэг ажиллуулна.", flush=True)
+        self._count_hedge('hedged')
+        fallback = self._hedge_executor.submit(self._call_pollinations, sanitized_prompt, force_json, retries)
+        unparsed = None
+        for future in as_completed((primary, fallback)):
+            try:
+                text = future.result()
+            except Exception as e:
+                print(f"[WARN] Hedged AI call failed: {e}", flush=True)
+                continue
+            if text and force_json and not self._is_valid_json(text):
+                # A fast reply that will not parse must not beat a valid one from the other leg.
+                unparsed = unparsed or text
+                continue
+            if text:
+                # The slower call keeps running in the pool; its result is ignored.
+                self._count_hedge('primary_wins' if future is primary else 'fallback_wins')
+                if future is primary and served is not None:
+                    served.update(gemini_served)
+                return text
+        self._count_hedge('both_failed')
+        return unparsed
+
+    def _can_hedge(self):
+        if not self.HEDGE_ENABLED or not self.allow_external_fallback:
+            return False
+        circuit_open, _ = self._is_fallback_circuit_open()
+        return not circuit_open
+
+    def _hedge_delay_seconds(self):
+        """Hedge after the primary's recent latency percentile, clamped; fixed default until enough samples."""
+        histogram = self._provider_latency['gemini']
+        if histogram.count < self.HEDGE_MIN_SAMPLES:
+            return self.HEDGE_DEFAULT_SECONDS
+        delay = histogram.percentile(self.HEDGE_PERCENTILE)
+        return min(self.HEDGE_MAX_SECONDS, max(self.HEDGE_MIN_SECONDS, delay))
+
+    def _count_hedge(self, outcome):
+        with self._hedge_lock:
+            self._hedge_stats[outcome] = self._hedge_stats.get(outcome, 0) + 1
+
+    def ai_provider_stats(self):
+        with self._hedge_lock:
+            hedge = dict(self._hedge_stats)
+        return {
+            'hedge': {
+                'enabled': self.HEDGE_ENABLED,
+                'delay_seconds': round(self._hedge_delay_seconds(), 3),
+                'percentile': self.HEDGE_PERCENTILE,
+                **hedge,
+            },
+            'latency': {name: histogram.snapshot() for name, histogram in self._provider_latency.items()},
+        }
+
+    def _call_gemini(self, prompt, force_json=False, model=None, served=None):
+        """Gemini (key circular rotation). Returns guarded text, or None when every key/model failed.
+
+        served['model'] is set to the model that answered, which is Lite once Flash is exhausted.
 
         Flash логик:
           • Key#1→Key#21→Key#1 тойрог хэлбэрээр ажиллана
@@ -373,7 +586,6 @@ class MarketAnalyst:
           • 2 цаг тутамд key#1-ээр probe → сэргэсэн бол Flash тойрогт буцна
         """
         use_model = model or self.LITE_MODEL
-        sanitized_prompt = self._sanitize_prompt(prompt)
 
         # ─── Flash exhausted үед: 2ц probe эсвэл Lite руу шилжих ───
         if use_model == self.FLASH_MODEL and self._flash_exhausted:
@@ -395,99 +607,105 @@ class MarketAnalyst:
                     self._flash_last_probe_at = now
                     remaining_min = int(self.FLASH_PROBE_INTERVAL / 60)
                     print(f"[INFO] Flash probe амжилтгүй → {remaining_min}мин-д дахин туршина. Lite ашиглана.", flush=True)
-                    return self._call_ai(prompt, force_json=force_json, model=self.LITE_MODEL, retries=retries)
+                    return self._call_gemini(prompt, force_json=force_json, model=self.LITE_MODEL, served=served)
             else:
                 remaining_min = int((self.FLASH_PROBE_INTERVAL - elapsed) / 60)
                 print(f"[INFO] Flash exhausted (probe-д үлдсэн: {remaining_min}мин) → Lite ашиглана.", flush=True)
-                return self._call_ai(prompt, force_json=force_json, model=self.LITE_MODEL, retries=retries)
+                return self._call_gemini(prompt, force_json=force_json, model=self.LITE_MODEL, served=served)
 
-        # 1. Try Gemini — тойрог: key#1→key#21→key#1
-        if self.gemini:
-            keys_tried = 0
-            total_keys = len(self.api_keys)
+        # Gemini — тойрог: key#1→key#21→key#1
+        sanitized_prompt = self._sanitize_prompt(prompt)
+        started = time.monotonic()
+        keys_tried = 0
+        total_keys = len(self.api_keys)
+
+        while keys_tried < total_keys:
+            try:
+                final_prompt = (
+                    "IMPORTANT: This analysis is for EDUCATIONAL PURPOSES ONLY. "
+                    "Do not provide financial advice.\n\n" + sanitized_prompt
+                )
+                if force_json:
+                    final_prompt += "\n\nReturn JSON only."
+
+                safety_settings = self._gemini_safety_settings()
+                config_kwargs = {"safety_settings": safety_settings}
+                if force_json:
+                    config_kwargs["response_mime_type"] = "application/json"
+
+                response = self.gemini.models.generate_content(
+                    model=use_model,
+                    contents=final_prompt,
+                    config=genai_types.GenerateContentConfig(**config_kwargs)
+                )
 
-            while keys_tried < total_keys:
                 try:
-                    final_prompt = (
-                        "IMPORTANT: This analysis is for EDUCATIONAL PURPOSES ONLY. "
-                        "Do not provide financial advice.\n\n" + sanitized_prompt
-                    )
-                    if force_json:
-                        final_prompt += "\n\nReturn JSON only."
-
-                    safety_settings = self._gemini_safety_settings()
-                    config_kwargs = {"safety_settings": safety_settings}
-                    if force_json:
-                        config_kwargs["response_mime_type"] = "application/json"
-
-                    response = self.gemini.models.generate_content(
-                        model=use_model,
-                        contents=final_prompt,
-                        config=genai_types.GenerateContentConfig(**config_kwargs)
-                    )
+                    text = response.text.strip()
+                except (ValueError, AttributeError):
+                    raise Exception("Gemini Safety Block - Empty Response")
 
-                    try:
-                        text = response.text.strip()
-                    except (ValueError, AttributeError):
-                        raise Exception("Gemini Safety Block - Empty Response")
+                if not text:
+                    raise Exception("Gemini returned empty text string")
 
-                    if not text:
-                        raise Exception("Gemini returned empty text string")
+                text = self._guard_ai_text_output(text, force_json=force_json)
+                if not text:
+                    raise Exception("Gemini output blocked by safety guardrail")
 
-                    text = self._guard_ai_text_output(text, force_json=force_json)
-                    if not text:
-                        raise Exception("Gemini output blocked by safety guardrail")
-
-                    print(f"[DEBUG] Gemini [{use_model}] Key#{self.current_key_index+1} OK: {text[:80]}...", flush=True)
-                    return text
-
-                except Exception as e:
-                    error_str = str(e).lower()
-                    is_rate_limit = any(x in error_str for x in ["429", "quota", "resource_exhausted", "exhausted"])
-                    is_auth_error = any(x in error_str for x in ["403", "leaked", "permission", "invalid", "unauthenticated"])
-
-                    print(f"[WARN] Gemini [{use_model}] Key#{self.current_key_index+1}: {e}", flush=True)
-
-                    if is_rate_limit or is_auth_error:
-                        was_last_key = (self.current_key_index == total_keys - 1)
-
-                        # ─── Key#21 sentinel: Flash exhaustion шалгах ───
-                        if use_model == self.FLASH_MODEL and is_rate_limit and was_last_key:
-                            now = time.time()
-                            self._flash_key21_fail_times.append(now)
-                            # 5 минут хуучирсан fail-уудыг арилга
-                            self._flash_key21_fail_times = [
-                                t for t in self._flash_key21_fail_times
-                                if now - t <= self.FLASH_EXHAUSTION_WINDOW
-                            ]
-                            fail_count = len(self._flash_key21_fail_times)
-                            print(f"[WARN] Key#21 Flash 429: {fail_count}/{self.FLASH_EXHAUSTION_COUNT} (5мин дотор)", flush=True)
-
-                            if fail_count >= self.FLASH_EXHAUSTION_COUNT:
-                                # Flash exhausted — Lite тойрогт шилж
-                                self._flash_exhausted        = True
-                                self._flash_last_probe_at    = now
-                                self._flash_key21_fail_times = []
-                                self.current_key_index       = 0
-                                self._configure_gemini()
-                                print(f"[WARN] Flash exhausted (key#21 5мин дотор {self.FLASH_EXHAUSTION_COUNT}x 429) → 2ц-д probe. Lite ашиглана.", flush=True)
-                                return self._call_ai(prompt, force_json=force_json, model=self.LITE_MODEL, retries=retries)
-
-                        # Тойрог: дараагийн key рүү шилж (circular)
-                        self.current_key_index = (self.current_key_index + 1) % total_keys
-                        self._configure_gemini()
-                        keys_tried += 1
-                        print(f"[INFO] Key#{self.current_key_index+1}-рүү шилжлээ ({keys_tried}/{total_keys})", flush=True)
-                        continue
+                self._provider_latency['gemini'].observe(time.monotonic() - started)
+                if served is not None:
+                    served['model'] = use_model
+                print(f"[DEBUG] Gemini [{use_model}] Key#{self.current_key_index+1} OK: {text[:80]}...", flush=True)
+                return text
+
+            except Exception as e:
+                error_str = str(e).lower()
+                is_rate_limit = any(x in error_str for x in ["429", "quota", "resource_exhausted", "exhausted"])
+                is_auth_error = any(x in error_str for x in ["403", "leaked", "permission", "invalid", "unauthenticated"])
+
+                print(f"[WARN] Gemini [{use_model}] Key#{self.current_key_index+1}: {e}", flush=True)
+
+                if is_rate_limit or is_auth_error:
+                    was_last_key = (self.current_key_index == total_keys - 1)
+
+                    # ─── Key#21 sentinel: Flash exhaustion шалгах ───
+                    if use_model == self.FLASH_MODEL and is_rate_limit and was_last_key:
+                        now = time.time()
+                        self._flash_key21_fail_times.append(now)
+                        # 5 минут хуучирсан fail-уудыг арилга
+                        self._flash_key21_fail_times = [
+                            t for t in self._flash_key21_fail_times
+                            if now - t <= self.FLASH_EXHAUSTION_WINDOW
+                        ]
+                        fail_count = len(self._flash_key21_fail_times)
+                        print(f"[WARN] Key#21 Flash 429: {fail_count}/{self.FLASH_EXHAUSTION_COUNT} (5мин дотор)", flush=True)
+
+                        if fail_count >= self.FLASH_EXHAUSTION_COUNT:
+                            # Flash exhausted — Lite тойрогт шилж
+                            self._flash_exhausted        = True
+                            self._flash_last_probe_at    = now
+                            self._flash_key21_fail_times = []
+                            self.current_key_index       = 0
+                            self._configure_gemini()
+                            print(f"[WARN] Flash exhausted (key#21 5мин дотор {self.FLASH_EXHAUSTION_COUNT}x 429) → 2ц-д probe. Lite ашиглана.", flush=True)
+                            return self._call_gemini(prompt, force_json=force_json, model=self.LITE_MODEL, served=served)
+
+                    # Тойрог: дараагийн key рүү шилж (circular)
+                    self.current_key_index = (self.current_key_index + 1) % total_keys
+                    self._configure_gemini()
+                    keys_tried += 1
+                    print(f"[INFO] Key#{self.current_key_index+1}-рүү шилжлээ ({keys_tried}/{total_keys})", flush=True)
+                    continue
 
-                    # Загвар/safety алдаа → Pollinations руу
-                    print(f"[WARN] Model/Safety error → Pollinations fallback.", flush=True)
-                    break
+                # Загвар/safety алдаа → Pollinations руу
+                print(f"[WARN] Model/Safety error → Pollinations fallback.", flush=True)
+                break
 
-            if keys_tried >= total_keys:
-                print(f"[WARN] [{use_model}] Бүх {total_keys} key хязгаар тулсан → Pollinations fallback.", flush=True)
+        if keys_tried >= total_keys:
+            print(f"[WARN] [{use_model}] Бүх {total_keys} key хязгаар тулсан → Pollinations fallback.", flush=True)
+        return None
 
-        # 2. Fallback to Pollinations
+    def _call_pollinations(self, sanitized_prompt, force_json=False, retries=3):
+        """Pollinations fallback behind the circuit breaker. Returns guarded text or None."""
         if not self.allow_external_fallback:
             print("[WARN] External fallback disabled by policy.", flush=True)
             return None
@@ -506,13 +724,19 @@ class MarketAnalyst:
             final_prompt += "\n\nCRITICAL: RESPONSE MUST BE VALID JSON ONLY. NO OTHER TEXT."
 
         for attempt in range(retries):
+            started = time.monotonic()
             try:
-                response = requests.post(url, data=final_prompt.encode('utf-8'), timeout=60)
+                response = http_client.post(
+                    url,
+                    data=final_prompt.encode('utf-8'),
+                    upstream="pollinations",
+                    timeout=(3.05, 60),
+                )
                 if response.status_code == 200:
                     text = response.text.strip()
                     if not text:
                         self._record_fallback_failure('empty response body')
-                        time.sleep(1)
+                        time.sleep(backoff_delay(attempt))
                         continue
                     for marker in ["**Support Pollinations.AI:**", "**Ad**", "---"]:
                         if marker in text:
@@ -522,29 +746,40 @@ class MarketAnalyst:
                         self._record_fallback_failure('fallback output blocked by safety guardrail')
                         continue
                     self._record_fallback_success()
+                    self._provider_latency['pollinations'].observe(time.monotonic() - started)
                     return text.strip()
 
                 self._record_fallback_failure(f'HTTP {response.status_code}')
-                time.sleep(1)
+                time.sleep(backoff_delay(attempt))
             except Exception as e:
                 print(f"Pollinations API Error (Attempt {attempt+1}/{retries}): {e}")
                 self._record_fallback_failure(str(e))
-                time.sleep(1)
+                time.sleep(backoff_delay(attempt))
         return None
 
-    def get_latest_news(self, limit=10):
+    def build_calendar_ingest(self):
+        """Fetch calendar + news once so every consumer in a refresh cycle shares one event set."""
+        return fetch_calendar_ingest(tradingview_handler, alphavantage_handler)
+
+    def get_latest_news(self, limit=10, ingest=None):
         """Get latest news from Alpha Vantage (Priority) or TradingView (Fallback)"""
         try:
             # 1. Try Alpha Vantage for News + Sentiment
-            print("[INFO] Fetching Alpha Vantage News...")
-            av_news = alphavantage_handler.get_forex_news(limit=limit)
+            if ingest is not None:
+                av_news = ingest.latest_news(limit)
+            else:
+                print("[INFO] Fetching Alpha Vantage News...")
+                av_news = alphavantage_handler.get_forex_news(limit=limit)
             if av_news:
                 print(f"[OK] Loaded {len(av_news)} news items from Alpha Vantage")
                 return av_news
 
             # 2. Fallback to TradingView if AV fails or empty
             print("[WARN] Alpha Vantage empty/failed, falling back to TradingView")
-            events = tradingview_handler.get_events(days_back=1, days_forward=1)
+            if ingest is not None:
+                events = ingest.window(days_back=1, days_forward=1)
+            else:
+                events = tradingview_handler.get_events(days_back=1, days_forward=1)
             if not events: return []
             
             formatted_news = []
@@ -555,10 +790,13 @@ class MarketAnalyst:
             print(f"Error fetching news: {e}")
             return []
 
-    def get_news_history(self, limit=20):
+    def get_news_history(self, limit=20, ingest=None):
         """Get past news events"""
         try:
-            events = tradingview_handler.get_events(days_back=3, days_forward=0)
+            if ingest is not None:
+                events = ingest.window(days_back=3, days_forward=0)
+            else:
+                events = tradingview_handler.get_events(days_back=3, days_forward=0)
             if not events: return []
             
             past_events = []
@@ -570,10 +808,13 @@ class MarketAnalyst:
             print(f"Error getting news history: {e}")
             return []
 
-    def get_upcoming_news(self, limit=20):
+    def get_upcoming_news(self, limit=20, ingest=None):
         """Get upcoming news events"""
         try:
-            events = tradingview_handler.get_events(days_back=0, days_forward=7)
+            if ingest is not None:
+                events = ingest.window(days_back=0, days_forward=7)
+            else:
+                events = tradingview_handler.get_events(days_back=0, days_forward=7)
             if not events: return []
             
             upcoming_events = []
@@ -585,11 +826,11 @@ class MarketAnalyst:
             print(f"Error getting upcoming news: {e}")
             return []
 
-    def get_market_outlook(self):
+    def get_market_outlook(self, ingest=None):
         """Get general market outlook"""
         # Dummy signal for general market
         dummy_signal = {'signal': 'NEUTRAL', 'confidence': 50}
-        return self.generate_ai_insight(dummy_signal, pair="MARKET")
+        return self.generate_ai_insight(dummy_signal, pair="MARKET", ingest=ingest)
 
     def _generate_simple_analysis(self, event):
         """Generate simple rule-based analysis (Mongolian)"""
@@ -654,11 +895,11 @@ You must output EXACTLY three sections using the exact headers below. Do not add
 
 TONE: Institutional, analytical, objective. No financial advice.
 """
-            response = self._call_ai(prompt, model=self.LITE_MODEL)
-            return response if response else "AI холболт амжилтгүй боллоо."
+            response = self._call_ai(prompt, model=self.LITE_MODEL, prompt_type='event_analysis')
+            return response if response else EVENT_ANALYSIS_AI_FAILED
         except Exception as e:
             print(f"Detailed analysis error: {e}")
-            return "Дэлгэрэнгүй мэдээлэл авахад алдаа гарлаа."
+            return EVENT_ANALYSIS_ERROR
 
     def _format_event(self, event):
         """Helper to format TradingView event for UI"""
@@ -718,7 +959,7 @@ Analyze the Actual vs Forecast deviation. State the logical macroeconomic conseq
 Use advanced financial terminology.
 CRITICAL: Output ONLY the single Mongolian sentence. No markdown, no bullet points, no intro/outro.
 """
-            analysis_text = self._call_ai(prompt, model=self.LITE_MODEL)
+            analysis_text = self._call_ai(prompt, model=self.LITE_MODEL, prompt_type='news_impact')
             if not analysis_text: return "Analysis failed."
             
             self.news_collection.insert_one({
@@ -736,10 +977,13 @@ CRITICAL: Output ONLY the single Mongolian sentence. No markdown, no bullet poin
             print(f"Error analyzing news impact: {e}")
             return "Analysis failed."
 
-    def get_weekly_analysis(self):
+    def get_weekly_analysis(self, ingest=None):
         """Get major news from the last 7 days"""
         try:
-            events = tradingview_handler.get_events(days_back=7, days_forward=0)
+            if ingest is not None:
+                events = ingest.window(days_back=7, days_forward=0)
+            else:
+                events = tradingview_handler.get_events(days_back=7, days_forward=0)
             if not events: return []
 
             major_news = []
@@ -760,7 +1004,7 @@ CRITICAL: Output ONLY the single Mongolian sentence. No markdown, no bullet poin
             print(f"Error in weekly analysis: {e}")
             return []
 
-    def generate_ai_insight(self, technical_signal, pair="EUR/USD"):
+    def generate_ai_insight(self, technical_signal, pair="EUR/USD", ingest=None):
         """Generate AI insight with per-pair caching (30 min pair / 1h market)"""
         current_time = time.time()
         cache_ttl = self.cache_duration_market if pair == "MARKET" else self.cache_duration_pair
@@ -773,7 +1017,7 @@ CRITICAL: Output ONLY the single Mongolian sentence. No markdown, no bullet poin
             return cached["data"]
         
         try:
-            news_list = self.get_latest_news(limit=6)
+            news_list = self.get_latest_news(limit=6, ingest=ingest)
             if news_list:
                 news_lines = []
                 for n in news_list:
@@ -878,7 +1122,14 @@ CRITICAL CONSTRAINTS:
             insight = None
             
             for attempt in range(max_retries):
-                response_text = self._call_ai(prompt, force_json=True, model=self.FLASH_MODEL)
+                # Retries bypass the cache so a response that failed parsing is regenerated.
+                response_text = self._call_ai(
+                    prompt,
+                    force_json=True,
+                    model=self.FLASH_MODEL,
+                    prompt_type='market_insight' if pair == "MARKET" else 'pair_insight',
+                    use_cache=(attempt == 0),
+                )
                 
                 if not response_text:
                     print(f"[WARN] Attempt {attempt+1}: Empty response from AI")
@@ -949,7 +1200,7 @@ CRITICAL CONSTRAINTS:
             insight = normalized_insight
 
             if pair == "MARKET":
-                insight['weekly_analysis'] = self.get_weekly_analysis()
+                insight['weekly_analysis'] = self.get_weekly_analysis(ingest=ingest)
             
             insight['created_at'] = datetime.now(timezone.utc).isoformat()
             self._save_to_db(insight, pair)
@@ -0,0 +1,55 @@
+"""Small thread-safe latency histograms for health/metrics payloads."""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+class LatencyHistogram:
+    """Keeps the most recent samples (seconds) and reports percentiles in milliseconds."""
+
+    def __init__(self, max_samples: int = 512):
+        self._samples = deque(maxlen=max(1, int(max_samples)))
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        value = max(0.0, float(seconds))
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.total_seconds += value
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile in seconds over the retained window, or None if empty."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        rank = max(1, int(math.ceil(float(pct) / 100.0 * len(ordered))))
+        return ordered[min(rank, len(ordered)) - 1]
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            ordered = sorted(self._samples)
+            count = self.count
+            total = self.total_seconds
+
+        def _pct_ms(pct):
+            if not ordered:
+                return None
+            rank = max(1, int(math.ceil(pct / 100.0 * len(ordered))))
+            return round(ordered[min(rank, len(ordered)) - 1] * 1000.0, 1)
+
+        return {
+            'count': count,
+            'mean_ms': round(total / count * 1000.0, 1) if count else None,
+            'p50_ms': _pct_ms(50),
+            'p90_ms': _pct_ms(90),
+            'p99_ms': _pct_ms(99),
+            'max_ms': round(ordered[-1] * 1000.0, 1) if ordered else None,
+        }
@@ -0,0 +1,178 @@
+"""Per-minute model outputs in a MongoDB time-series collection, with server-side downsampling."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+SERIES_FIELDS = ('buy', 'sell', 'hold', 'confidence', 'atr_pips')
+BUCKET_STEPS_SECONDS = (60, 120, 300, 600, 900, 1800, 3600, 7200, 14400, 21600, 43200, 86400)
+MAX_BUFFERED_ROWS = 1000
+
+
+def choose_bucket_seconds(span_seconds: float, max_points: int) -> int:
+    """Smallest round bucket that keeps the series at or under max_points."""
+    for step in BUCKET_STEPS_SECONDS:
+        if span_seconds / step <= max_points:
+            return step
+    return BUCKET_STEPS_SECONDS[-1]
+
+
+def _utc_datetime(raw: str) -> datetime:
+    parsed = datetime.fromisoformat(str(raw).strip().replace('Z', '+00:00'))
+    # Naive query values are UTC, like the ts field they are compared with.
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def query_range(raw_from: Optional[str], raw_to: Optional[str], hours: int,
+                now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """(start, end) for ?from=&to=, defaulting to the last `hours`; ValueError when invalid."""
+    end = _utc_datetime(raw_to) if raw_to else (now or datetime.now(timezone.utc))
+    start = _utc_datetime(raw_from) if raw_from else end - timedelta(hours=hours)
+    if start >= end:
+        raise ValueError('from must be before to')
+    return start, end
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return round(float(value), 2)
+    except (TypeError, ValueError):
+        return None
+
+
+def output_row(pair: str, result: Dict[str, Any], actionable: bool, ts: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """One time-series measurement from a signal generator result; None for failed predictions."""
+    if not isinstance(result, dict) or result.get('error'):
+        return None
+    probabilities = result.get('probabilities') or {}
+    signal = str(result.get('signal', 'HOLD')).upper()
+    return {
+        'ts': ts or datetime.now(timezone.utc),
+        'meta': {'pair': pair.replace('/', '_'), 'model_version': result.get('model_version')},
+        'buy': _number(probabilities.get('BUY')),
+        'sell': _number(probabilities.get('SELL')),
+        'hold': _number(probabilities.get('HOLD')),
+        'signal': signal,
+        # Direction the model leans to even when the final call is HOLD
+        'lean': str(result.get('directional_signal') or signal).upper(),
+        'confidence': _number(result.get('confidence')),
+        'atr_pips': _number(result.get('atr_pips')),
+        # BUY/SELL at or above the save threshold (duplicates skipped by the generator still count)
+        'actionable': bool(actionable),
+    }
+
+
+class ModelOutputSeries:
+    """Buffers generator cycles and writes them with insert_many every flush_rows rows or flush_seconds.
+
+    The time-series collection groups measurements into buckets per meta (pair,
+    model_version) on the server; batching keeps it at one write per few
+    minutes. Rows still buffered when the process stops are lost, which the
+    retention-bounded, best-effort history accepts.
+    """
+
+    def __init__(self, collection=None, flush_rows: int = 5, flush_seconds: float = 300):
+        self.collection = collection
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_seconds = max(1.0, float(flush_seconds))
+        self.timeseries = False
+        self._buffer: List[Dict[str, Any]] = []
+        self._oldest_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stats = {'written': 0, 'flushes': 0, 'errors': 0, 'dropped': 0}
+
+    def ensure_collection(self, db, name: str = 'model_outputs', retention_days: int = 90) -> None:
+        """Create the time-series collection once; servers without time-series support get a plain one."""
+        retention_seconds = max(1, int(retention_days)) * 86400
+        if name not in db.list_collection_names():
+            try:
+                db.create_collection(
+                    name,
+                    timeseries={'timeField': 'ts', 'metaField': 'meta', 'granularity': 'minutes'},
+                    expireAfterSeconds=retention_seconds,
+                )
+            except Exception as e:
+                if name not in db.list_collection_names():  # not just another process creating it first
+                    print(f"[WARN] model_outputs time-series unavailable, using a plain collection: {e}", flush=True)
+                    db[name].create_index([('meta.pair', 1), ('ts', 1)], name='idx_model_outputs_pair_ts')
+                    db[name].create_index('ts', name='ttl_model_outputs_ts', expireAfterSeconds=retention_seconds)
+        self.timeseries = bool((db[name].options() or {}).get('timeseries'))
+
+    def append(self, row: Optional[Dict[str, Any]]) -> None:
+        if row is None:
+            return
+        with self._lock:
+            self._buffer.append(row)
+            if self._oldest_at is None:
+                self._oldest_at = time.monotonic()
+            if len(self._buffer) > MAX_BUFFERED_ROWS:
+                del self._buffer[0]
+                self._stats['dropped'] += 1
+            due = (len(self._buffer) >= self.flush_rows
+                   or time.monotonic() - self._oldest_at >= self.flush_seconds)
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        with self._lock:
+            rows, self._buffer, self._oldest_at = self._buffer, [], None
+        if not rows:
+            return 0
+        try:
+            self.collection.insert_many(rows, ordered=False)
+        except Exception as e:
+            with self._lock:
+                # Keep them for the next flush; append() caps the buffer.
+                self._buffer = rows + self._buffer
+                self._oldest_at = time.monotonic()
+                self._stats['errors'] += 1
+            print(f"[WARN] model_outputs flush failed ({len(rows)} rows kept): {e}", flush=True)
+            return 0
+        with self._lock:
+            self._stats['written'] += len(rows)
+            self._stats['flushes'] += 1
+        return len(rows)
+
+    def downsample(self, pair: str, start: datetime, end: datetime, max_points: int = 300) -> Dict[str, Any]:
+        """min/max/last per bucket as parallel arrays: a few KB for days of minute data."""
+        bucket_seconds = choose_bucket_seconds((end - start).total_seconds(), max_points)
+        bucket_ms = bucket_seconds * 1000
+        ts_ms = {'$toLong': '$ts'}
+        group: Dict[str, Any] = {
+            '_id': {'$subtract': [ts_ms, {'$mod': [ts_ms, bucket_ms]}]},
+            'n': {'$sum': 1},
+            'lean': {'$last': '$lean'},
+            'actionable': {'$sum': {'$cond': ['$actionable', 1, 0]}},
+        }
+        for field in SERIES_FIELDS:
+            group[f'{field}_min'] = {'$min': f'${field}'}
+            group[f'{field}_max'] = {'$max': f'${field}'}
+            group[f'{field}_last'] = {'$last': f'${field}'}
+        pipeline = [
+            {'$match': {'meta.pair': pair.replace('/', '_'), 'ts': {'$gte': start, '$lt': end}}},
+            {'$sort': {'ts': 1}},
+            {'$group': group},
+            {'$sort': {'_id': 1}},
+        ]
+        series: Dict[str, Any] = {'t': [], 'n': [], 'lean': [], 'actionable': []}
+        for field in SERIES_FIELDS:
+            series[field] = {'min': [], 'max': [], 'last': []}
+        for bucket in self.collection.aggregate(pipeline):
+            series['t'].append(int(bucket['_id'] // 1000))
+            series['n'].append(bucket['n'])
+            series['lean'].append(bucket.get('lean'))
+            series['actionable'].append(bucket.get('actionable', 0))
+            for field in SERIES_FIELDS:
+                for stat in ('min', 'max', 'last'):
+                    series[field][stat].append(_number(bucket.get(f'{field}_{stat}')))
+        return {'bucket_seconds': bucket_seconds, 'points': len(series['t']), 'series': series}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._stats)
+            counters['buffered'] = len(self._buffer)
+        counters['timeseries'] = self.timeseries
+        return counters
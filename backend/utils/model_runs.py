@@ -0,0 +1,133 @@
+"""model_runs reference table: model provenance stored once, signals keep a provenance_ref."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def provenance_ref(provenance: Dict[str, Any]) -> str:
+    """Content address of a provenance dict.
+
+    Not the run_id itself: manual signals carry client-supplied provenance, and a
+    content key means nobody can register a different body under a real run's id.
+    """
+    material = json.dumps(provenance, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+
+class ModelRunRegistry:
+    """Writes each distinct provenance to model_runs once and joins it back onto signal rows.
+
+    Entries are immutable (the key is their content), so the in-process LRU
+    never needs invalidation; a page of signals costs at most one $in query for
+    the runs this process has not seen yet.
+    """
+
+    def __init__(self, collection=None, max_entries: int = 256):
+        self.collection = collection
+        self.max_entries = max(1, int(max_entries))
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'registered': 0}
+
+    def _remember(self, ref: str, provenance: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[ref] = provenance
+            self._cache.move_to_end(ref)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def register(self, provenance: Optional[Dict[str, Any]]) -> Optional[str]:
+        """provenance_ref for a signal document; None when there is no provenance to store."""
+        if not isinstance(provenance, dict) or not provenance:
+            return None
+        ref = provenance_ref(provenance)
+        with self._lock:
+            known = ref in self._cache
+        if not known:
+            self.collection.update_one(
+                {'_id': ref},
+                {'$setOnInsert': {
+                    'provenance': provenance,
+                    'run_id': provenance.get('run_id'),
+                    'model_version': provenance.get('model_version'),
+                    'created_at': datetime.now(timezone.utc),
+                }},
+                upsert=True,
+            )
+            self._remember(ref, dict(provenance))
+            with self._lock:
+                self._stats['registered'] += 1
+        return ref
+
+    def get_many(self, refs: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for ref in set(refs):
+                if ref in self._cache:
+                    self._cache.move_to_end(ref)
+                    found[ref] = self._cache[ref]
+                    self._stats['hits'] += 1
+                else:
+                    missing.append(ref)
+                    self._stats['misses'] += 1
+        if missing:
+            for doc in self.collection.find({'_id': {'$in': missing}}, {'provenance': 1}):
+                provenance = doc.get('provenance') or {}
+                found[doc['_id']] = provenance
+                self._remember(doc['_id'], provenance)
+        return found
+
+    def attach(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Put model_provenance back on rows that only carry provenance_ref (response shape is unchanged)."""
+        refs = [row['provenance_ref'] for row in rows if row.get('provenance_ref') and 'model_provenance' not in row]
+        runs = self.get_many(refs) if refs else {}
+        for row in rows:
+            ref = row.pop('provenance_ref', None)
+            if ref and 'model_provenance' not in row:
+                row['model_provenance'] = dict(runs.get(ref) or {})
+        return rows
+
+    def migrate(self, signals, batch_size: int = 500) -> Dict[str, int]:
+        """Move embedded model_provenance on existing signals into model_runs; safe to re-run."""
+        batch_size = max(1, int(batch_size))
+        migrated = 0
+        pending: Dict[str, List[Any]] = {}
+        seen_refs = set()
+
+        def flush():
+            nonlocal migrated
+            for ref, ids in pending.items():
+                result = signals.update_many(
+                    {'_id': {'$in': ids}},
+                    {'$set': {'provenance_ref': ref}, '$unset': {'model_provenance': ''}},
+                )
+                migrated += getattr(result, 'modified_count', len(ids))
+            pending.clear()
+
+        queued = 0
+        cursor = signals.find({'model_provenance': {'$type': 'object'}}, {'model_provenance': 1}).batch_size(batch_size)
+        for doc in cursor:
+            ref = self.register(doc['model_provenance'])
+            if ref is None:
+                continue
+            seen_refs.add(ref)
+            pending.setdefault(ref, []).append(doc['_id'])
+            queued += 1
+            if queued >= batch_size:
+                flush()
+                queued = 0
+        flush()
+        return {'migrated': migrated, 'runs': len(seen_refs)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._stats)
+            counters['cached'] = len(self._cache)
+        return counters
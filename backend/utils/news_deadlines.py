@@ -0,0 +1,102 @@
+"""Min-heap of upcoming news alert deadlines, rebuilt only when the news snapshot changes."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+ALERT_LEAD_SECONDS = 600
+
+
+def parse_alert_event_time(event: Dict[str, Any]) -> Optional[datetime]:
+    """Event time from the raw TradingView date (ISO) or the formatted "YYYY-MM-DD HH:MM" date."""
+    date_str = event.get('date', '')
+    if not date_str:
+        return None
+    raw = event.get('raw', {})
+    raw_date = raw.get('date', date_str) if raw else date_str
+    try:
+        if 'T' in str(raw_date):
+            event_time = datetime.fromisoformat(str(raw_date).replace('Z', '+00:00'))
+        else:
+            event_time = datetime.strptime(str(raw_date), "%Y-%m-%d %H:%M")
+    except (ValueError, TypeError):
+        return None
+    return event_time if event_time.tzinfo else event_time.replace(tzinfo=timezone.utc)
+
+
+def news_alert_key(event: Dict[str, Any]) -> str:
+    event_title = event.get('title', event.get('event_name', 'Economic News'))
+    return f"sched_{event.get('date', '')}_{event_title}"
+
+
+class AlertDeadlines:
+    """(alert_at, event_time, key, event) entries ordered by alert_at = event_time - lead.
+
+    Events learned about after their alert time (but before they start) are due
+    immediately; events that already started are dropped.
+    """
+
+    def __init__(self, lead_seconds: int = ALERT_LEAD_SECONDS, retry_seconds: int = 60):
+        self.lead = timedelta(seconds=max(0, int(lead_seconds)))
+        self.retry = timedelta(seconds=max(1, int(retry_seconds)))
+        self._heap: List[Tuple[datetime, int, datetime, str, Dict[str, Any]]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def rebuild(self, events: Iterable[Dict[str, Any]],
+                notified_keys: Optional[Callable[[List[str]], Set[str]]] = None,
+                now: Optional[datetime] = None) -> int:
+        """Replace the heap from a new snapshot; notified_keys filters already-sent alerts in one lookup."""
+        now = now or datetime.now(timezone.utc)
+        pending = {}
+        for event in events or []:
+            if not isinstance(event, dict):
+                continue
+            event_time = parse_alert_event_time(event)
+            if event_time is None or event_time < now:
+                continue
+            pending.setdefault(news_alert_key(event), (event_time, event))
+
+        if pending and notified_keys is not None:
+            for key in notified_keys(list(pending)):
+                pending.pop(key, None)
+
+        self._heap = [
+            (event_time - self.lead, next(self._seq), event_time, key, event)
+            for key, (event_time, event) in pending.items()
+        ]
+        heapq.heapify(self._heap)
+        return len(self._heap)
+
+    def pop_due(self, now: Optional[datetime] = None) -> List[Tuple[datetime, str, Dict[str, Any]]]:
+        now = now or datetime.now(timezone.utc)
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _alert_at, _seq, event_time, key, event = heapq.heappop(self._heap)
+            if event_time >= now:
+                due.append((event_time, key, event))
+        return due
+
+    def retry_later(self, event_time: datetime, key: str, event: Dict[str, Any],
+                    now: Optional[datetime] = None) -> bool:
+        """Re-queue a failed send while the event has not started yet."""
+        now = now or datetime.now(timezone.utc)
+        retry_at = now + self.retry
+        if retry_at > event_time:
+            return False
+        heapq.heappush(self._heap, (retry_at, next(self._seq), event_time, key, event))
+        return True
+
+    def seconds_until_next(self, now: Optional[datetime] = None) -> Optional[float]:
+        if not self._heap:
+            return None
+        now = now or datetime.now(timezone.utc)
+        return max(0.0, (self._heap[0][0] - now).total_seconds())
+
+    def next_alert_at(self) -> Optional[datetime]:
+        return self._heap[0][0] if self._heap else None
@@ -0,0 +1,57 @@
+"""One economic-calendar/news fetch per refresh cycle, partitioned locally per consumer window."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# Union of the windows used by history (-3d), upcoming (+7d), latest (±1d) and weekly (-7d).
+INGEST_DAYS_BACK = 7
+INGEST_DAYS_FORWARD = 7
+INGEST_NEWS_LIMIT = 10
+
+
+def _parse_event_time(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class CalendarIngest:
+    """Events and news fetched once; window() reproduces what a per-window provider call returned."""
+
+    def __init__(self, events: List[Dict[str, Any]], news: List[Dict[str, Any]],
+                 fetched_at: Optional[datetime] = None):
+        self.events = list(events or [])
+        self.news = list(news or [])
+        self.fetched_at = fetched_at or datetime.now(timezone.utc)
+        self._event_times = [_parse_event_time(event.get('date')) for event in self.events]
+
+    def window(self, days_back: int, days_forward: int) -> List[Dict[str, Any]]:
+        start = self.fetched_at - timedelta(days=days_back)
+        end = self.fetched_at + timedelta(days=days_forward)
+        selected = []
+        for event, event_time in zip(self.events, self._event_times):
+            # Undated events were returned by every provider window, keep that behaviour.
+            if event_time is None or start <= event_time <= end:
+                selected.append(event)
+        return selected
+
+    def latest_news(self, limit: int) -> List[Dict[str, Any]]:
+        return self.news[:limit]
+
+
+def fetch_calendar_ingest(tradingview, alphavantage, days_back: int = INGEST_DAYS_BACK,
+                          days_forward: int = INGEST_DAYS_FORWARD,
+                          news_limit: int = INGEST_NEWS_LIMIT) -> CalendarIngest:
+    """Fetch the union calendar window and the news feed once (one call per provider)."""
+    fetched_at = datetime.now(timezone.utc)
+    events = tradingview.get_events(days_back=days_back, days_forward=days_forward)
+    news = alphavantage.get_forex_news(limit=news_limit)
+    return CalendarIngest(events, news, fetched_at=fetched_at)
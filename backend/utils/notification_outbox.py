@@ -0,0 +1,362 @@
+"""Durable push notification outbox: one document per alert, fanned out to recipients by leased workers."""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.job_wakeup import JobWakeup
+from utils.metrics import LatencyHistogram
+
+OUTBOX_ACTIVE_STATUSES = ('pending', 'sending')
+EXPO_MAX_BATCH = 100
+MAX_SEND_ROUND = 1000
+# Delivery rows written per insert_many while streaming recipients from the token cursor
+RESOLVE_CHUNK = 1000
+# Expo keeps push receipts for about a day.
+TICKET_RETENTION = timedelta(hours=24)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class NotificationOutbox:
+    """Producer/consumer outbox for push notifications.
+
+    enqueue() writes a single outbox document and returns immediately, so the
+    signal loop and request handlers never wait on Expo. A fan-out worker
+    claims the document, resolves its recipients once into per-recipient
+    delivery documents, and sends them in rounds of Expo batches. Each recipient
+    is marked sent, failed, or rescheduled with exponential backoff; the
+    outbox document is released between retries and completed when no
+    recipient is pending. A crashed worker's claim simply expires. Every write
+    to a claimed document is conditioned on that claim's lease_owner, and a
+    worker whose claim was taken over stops before its next batch.
+    """
+
+    def __init__(self, outbox=None, deliveries=None, tickets=None,
+                 resolve_recipients: Optional[Callable[[str, Dict[str, Any]], List[str]]] = None,
+                 build_messages: Optional[Callable[[str, Dict[str, Any], List[str]], List[Dict[str, Any]]]] = None,
+                 send_batch: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+                 owner_id: Any = 'local', batch_size: int = EXPO_MAX_BATCH, max_attempts: int = 5,
+                 backoff_seconds: float = 5.0, max_backoff_seconds: float = 300.0,
+                 claim_ttl_seconds: int = 120, retention_hours: int = 72):
+        self.outbox = outbox
+        self.deliveries = deliveries
+        self.tickets = tickets
+        self.resolve_recipients = resolve_recipients
+        self.build_messages = build_messages
+        self.send_batch = send_batch
+        self._owner_id = owner_id
+        # Recipients per send round; the sender splits a round into concurrent Expo batches.
+        self.batch_size = max(1, min(MAX_SEND_ROUND, int(batch_size)))
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_seconds = max(0.1, float(backoff_seconds))
+        self.max_backoff_seconds = max(self.backoff_seconds, float(max_backoff_seconds))
+        self.claim_ttl = timedelta(seconds=max(10, int(claim_ttl_seconds)))
+        self.retention = timedelta(hours=max(1, int(retention_hours)))
+        self.wakeup = JobWakeup('notification_outbox')
+        self._lock = threading.Lock()
+        self._counters = {
+            'enqueued': 0, 'enqueue_errors': 0, 'completed': 0, 'failed': 0,
+            'sent': 0, 'delivery_failed': 0, 'retried': 0, 'claims_lost': 0,
+        }
+        self._sent_window = deque()
+        self._batch_latency = LatencyHistogram(max_samples=256)
+        self._delivery_latency = LatencyHistogram(max_samples=256)
+
+    @property
+    def owner_id(self) -> str:
+        return str(self._owner_id() if callable(self._owner_id) else self._owner_id)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def backoff(self, attempt: int) -> float:
+        return min(self.max_backoff_seconds, self.backoff_seconds * (2 ** max(0, int(attempt) - 1)))
+
+    # ---- producer ----
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], dedupe_key: Optional[str] = None) -> Optional[str]:
+        """Persist one notification; returns its outbox id (existing id for a duplicate key) or None."""
+        return self.enqueue_once(kind, payload, dedupe_key)[0]
+
+    def enqueue_once(self, kind: str, payload: Dict[str, Any],
+                     dedupe_key: Optional[str] = None) -> Tuple[Optional[str], bool]:
+        """enqueue() plus whether this call created the document (False for a duplicate key or an error)."""
+        if self.outbox is None:
+            self._count('enqueue_errors')
+            print(f"[WARN] Notification outbox unavailable, dropping {kind} notification", flush=True)
+            return None, False
+
+        now = _utcnow()
+        outbox_id = str(dedupe_key) if dedupe_key else uuid.uuid4().hex
+        try:
+            self.outbox.insert_one({
+                '_id': outbox_id,
+                'kind': kind,
+                'payload': payload,
+                'status': 'pending',
+                'attempts': 0,
+                'created_at': now,
+                'available_at': now,
+                'lease_expires_at': now,
+                'expires_at': now + self.retention,
+            })
+        except Exception as e:
+            if getattr(e, 'code', None) == 11000:
+                return outbox_id, False
+            self._count('enqueue_errors')
+            print(f"[WARN] Notification outbox enqueue failed ({kind}): {e}", flush=True)
+            return None, False
+        self._count('enqueued')
+        self.wakeup.notify()
+        return outbox_id, True
+
+    # ---- fan-out worker ----
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        if self.outbox is None:
+            return None
+        now = _utcnow()
+        return self.outbox.find_one_and_update(
+            {
+                'status': {'$in': list(OUTBOX_ACTIVE_STATUSES)},
+                'available_at': {'$lte': now},
+                'lease_expires_at': {'$lte': now},
+            },
+            # Unique per claim: several fan-out threads in one process share owner_id.
+            {'$set': {'lease_owner': f"{self.owner_id}/{uuid.uuid4().hex[:8]}", 'lease_expires_at': now + self.claim_ttl}},
+            sort=[('available_at', 1)],
+            return_document=True,  # ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def _claimed(doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Filter matching the outbox document only while this claim still holds it."""
+        return {'_id': doc['_id'], 'lease_owner': doc.get('lease_owner')}
+
+    def _still_claimed(self, result, doc: Dict[str, Any]) -> bool:
+        if getattr(result, 'matched_count', 1):
+            return True
+        self._count('claims_lost')
+        print(f"[WARN] Notification outbox claim on {doc['_id']} was taken over, stopping", flush=True)
+        return False
+
+    def run_once(self) -> bool:
+        """Claim and fan out one outbox document; False when nothing was due."""
+        doc = self.claim()
+        if not doc:
+            return False
+        try:
+            self._process(doc)
+        except Exception as e:
+            self._release_after_error(doc, e)
+        return True
+
+    def _process(self, doc: Dict[str, Any]) -> None:
+        outbox_id = doc['_id']
+        if doc.get('status') == 'pending':
+            if not self._resolve(doc):
+                return
+
+        while True:
+            now = _utcnow()
+            pending = list(
+                self.deliveries.find(
+                    {'outbox_id': outbox_id, 'status': 'pending', 'next_attempt_at': {'$lte': now}},
+                    {'token': 1, 'attempts': 1},
+                ).limit(self.batch_size)
+            )
+            if not pending:
+                break
+            # Extend the claim before each batch; if it expired and was re-claimed, the new owner sends.
+            renewed = self.outbox.update_one(
+                self._claimed(doc),
+                {'$set': {'lease_expires_at': _utcnow() + self.claim_ttl}},
+            )
+            if not self._still_claimed(renewed, doc):
+                return
+            self._send(doc, pending)
+
+        self._finish_or_release(doc)
+
+    def _resolve(self, doc: Dict[str, Any]) -> bool:
+        """Stream recipients into delivery documents; False when the notification had nobody to reach."""
+        outbox_id = doc['_id']
+        now = _utcnow()
+        seen = set()
+        chunk: List[Dict[str, Any]] = []
+        for token in self.resolve_recipients(doc['kind'], doc.get('payload') or {}) or []:
+            if not token or token in seen:
+                continue
+            seen.add(token)
+            chunk.append({
+                '_id': f"{outbox_id}:{token}",
+                'outbox_id': outbox_id,
+                'token': token,
+                'status': 'pending',
+                'attempts': 0,
+                'next_attempt_at': now,
+                'expires_at': now + self.retention,
+            })
+            if len(chunk) >= RESOLVE_CHUNK:
+                self._insert_deliveries(chunk)
+                chunk = []
+        if chunk:
+            self._insert_deliveries(chunk)
+
+        update = {'status': 'sending', 'recipients_total': len(seen), 'resolved_at': now}
+        if not seen:
+            update.update({'status': 'done', 'completed_at': now, 'sent': 0, 'failed': 0})
+        result = self.outbox.update_one(self._claimed(doc), {'$set': update})
+        if not self._still_claimed(result, doc):
+            return False
+        if not seen:
+            self._count('completed')
+            return False
+        return True
+
+    def _insert_deliveries(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            self.deliveries.insert_many(rows, ordered=False)
+        except Exception as e:
+            # A previous claim may have inserted some rows before crashing; duplicates are fine.
+            write_errors = (getattr(e, 'details', None) or {}).get('writeErrors', [])
+            if not write_errors or any(err.get('code') != 11000 for err in write_errors):
+                raise
+
+    def _send(self, doc: Dict[str, Any], pending: List[Dict[str, Any]]) -> None:
+        tokens = [row['token'] for row in pending]
+        messages = self.build_messages(doc['kind'], doc.get('payload') or {}, tokens)
+        started = time.perf_counter()
+        outcomes = self.send_batch(messages) or []
+        self._batch_latency.observe(time.perf_counter() - started)
+
+        now = _utcnow()
+        groups: Dict[tuple, List[str]] = {}
+        for index, row in enumerate(pending):
+            outcome = outcomes[index] if index < len(outcomes) else {'status': 'retry', 'error': 'missing outcome'}
+            attempts = int(row.get('attempts', 0)) + 1
+            status = outcome.get('status')
+            if status == 'ok':
+                key = ('sent', None, attempts)
+            elif status == 'retry' and attempts < self.max_attempts:
+                key = ('pending', outcome.get('error'), attempts)
+            else:
+                key = ('failed', outcome.get('error'), attempts)
+            groups.setdefault(key, []).append(row['_id'])
+
+        tickets = [
+            {
+                '_id': outcome['ticket_id'],
+                'token': row['token'],
+                'delivery_id': row['_id'],
+                'outbox_id': doc['_id'],
+                'sent_at': now,
+                'expires_at': now + TICKET_RETENTION,
+            }
+            for row, outcome in zip(pending, outcomes)
+            if outcome.get('status') == 'ok' and outcome.get('ticket_id')
+        ]
+        if tickets and self.tickets is not None:
+            try:
+                self.tickets.insert_many(tickets, ordered=False)
+            except Exception as e:
+                print(f"[WARN] Push ticket record failed: {e}", flush=True)
+
+        for (status, error, attempts), ids in groups.items():
+            fields = {'status': status, 'attempts': attempts, 'updated_at': now}
+            if status == 'sent':
+                fields['sent_at'] = now
+                self._count('sent', len(ids))
+                self._record_sent(len(ids))
+            else:
+                fields['last_error'] = error
+                if status == 'pending':
+                    fields['next_attempt_at'] = now + timedelta(seconds=self.backoff(attempts))
+                    self._count('retried', len(ids))
+                else:
+                    self._count('delivery_failed', len(ids))
+            self.deliveries.update_many({'_id': {'$in': ids}}, {'$set': fields})
+
+        created_at = doc.get('created_at')
+        if isinstance(created_at, datetime) and groups:
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            self._delivery_latency.observe((now - created_at).total_seconds())
+
+    def _finish_or_release(self, doc: Dict[str, Any]) -> None:
+        outbox_id = doc['_id']
+        now = _utcnow()
+        waiting = self.deliveries.find_one(
+            {'outbox_id': outbox_id, 'status': 'pending'},
+            {'next_attempt_at': 1},
+            sort=[('next_attempt_at', 1)],
+        )
+        if waiting:
+            # Retries are due later: release the claim and come back at the earliest one.
+            self.outbox.update_one(
+                self._claimed(doc),
+                {'$set': {'available_at': waiting.get('next_attempt_at', now), 'lease_expires_at': now}},
+            )
+            return
+
+        sent = self.deliveries.count_documents({'outbox_id': outbox_id, 'status': 'sent'})
+        failed = self.deliveries.count_documents({'outbox_id': outbox_id, 'status': 'failed'})
+        result = self.outbox.update_one(
+            self._claimed(doc),
+            {'$set': {'status': 'done', 'completed_at': now, 'lease_expires_at': now, 'sent': sent, 'failed': failed}},
+        )
+        if self._still_claimed(result, doc):
+            self._count('completed')
+
+    def _release_after_error(self, doc: Dict[str, Any], error: Exception) -> None:
+        attempts = int(doc.get('attempts', 0)) + 1
+        now = _utcnow()
+        fields = {'attempts': attempts, 'last_error': str(error), 'lease_expires_at': now}
+        if attempts >= self.max_attempts:
+            fields.update({'status': 'failed', 'completed_at': now})
+            self._count('failed')
+        else:
+            fields['available_at'] = now + timedelta(seconds=self.backoff(attempts))
+        print(f"[WARN] Notification fan-out failed for {doc.get('_id')} (attempt {attempts}): {error}", flush=True)
+        try:
+            self.outbox.update_one(self._claimed(doc), {'$set': fields})
+        except Exception as update_err:
+            print(f"[WARN] Notification outbox release failed: {update_err}", flush=True)
+
+    # ---- metrics ----
+
+    def _record_sent(self, count: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._sent_window.append((now, count))
+            while self._sent_window and now - self._sent_window[0][0] > 60:
+                self._sent_window.popleft()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            counters = dict(self._counters)
+            sent_last_minute = sum(n for ts, n in self._sent_window if now - ts <= 60)
+        backlog = None
+        if self.outbox is not None:
+            try:
+                backlog = self.outbox.count_documents({'status': {'$in': list(OUTBOX_ACTIVE_STATUSES)}})
+            except Exception:
+                backlog = None
+        return {
+            **counters,
+            'backlog': backlog,
+            'sent_per_minute': sent_last_minute,
+            'batch_latency': self._batch_latency.snapshot(),
+            'enqueue_to_delivery': self._delivery_latency.snapshot(),
+            'dispatch': self.wakeup.stats(),
+        }
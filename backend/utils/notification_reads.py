@@ -0,0 +1,156 @@
+"""Per-user read state for broadcast in-app notifications: read watermark, sparse read set, cached unread count."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Optional
+
+READ_SET_LIMIT = 500
+UNREAD_CACHE_MAX_AGE = timedelta(minutes=10)
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class NotificationReadState:
+    """One notification_read_state document per user instead of read_by arrays on every notification.
+
+    Everything created at or before last_read_at is read; newer items the user
+    opened individually are kept in a capped read_ids set. The unread count is
+    cached on the same document and topped up with only the notifications
+    created since it was computed. It is recounted from the watermark when a
+    counted item expires, when the user's news visibility changes, or after
+    UNREAD_CACHE_MAX_AGE. read_version guards the cache against a concurrent
+    mark-read. prefs_version is bumped whenever the user's notification
+    preferences change so per-process preference caches can tell they are stale.
+    """
+
+    def __init__(self, collection=None, notifications=None, read_set_limit: int = READ_SET_LIMIT):
+        self.collection = collection
+        self.notifications = notifications
+        self.read_set_limit = max(1, int(read_set_limit))
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        state = self.collection.find_one({'_id': user_id})
+        if state is not None:
+            return state
+
+        # First access: carry over this user's marks from the legacy read_by arrays once.
+        legacy = [
+            str(doc['_id'])
+            for doc in self.notifications.find({'read_by': user_id}, {'_id': 1}).limit(self.read_set_limit)
+        ]
+        state = {'_id': user_id, 'last_read_at': None, 'read_ids': legacy, 'read_version': 0}
+        try:
+            self.collection.insert_one(state)
+        except Exception as e:
+            if getattr(e, 'code', None) != 11000:
+                raise
+            state = self.collection.find_one({'_id': user_id}) or state
+        return state
+
+    @staticmethod
+    def is_read_fn(state: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+        watermark = _aware(state.get('last_read_at'))
+        read_ids = set(state.get('read_ids') or [])
+
+        def is_read(doc: Dict[str, Any]) -> bool:
+            created_at = _aware(doc.get('created_at'))
+            if watermark is not None and isinstance(created_at, datetime) and created_at <= watermark:
+                return True
+            return str(doc.get('_id')) in read_ids
+
+        return is_read
+
+    def unread_count(self, user_id: str, visibility: Dict[str, Any], visibility_key: str,
+                     state: Optional[Dict[str, Any]] = None) -> int:
+        """Unread notifications matching visibility; work is proportional to items since the cache, not to users."""
+        if state is None:
+            state = self.get(user_id)
+        now = datetime.now(timezone.utc)
+        cache = state.get('unread_cache') or {}
+        counted_at = _aware(cache.get('counted_at'))
+        valid_until = _aware(cache.get('valid_until'))
+
+        incremental = (
+            counted_at is not None
+            and cache.get('visibility') == visibility_key
+            and now - counted_at < UNREAD_CACHE_MAX_AGE
+            and (valid_until is None or now < valid_until)
+        )
+        if incremental:
+            since, count = counted_at, int(cache.get('count', 0))
+        else:
+            since, count, valid_until = _aware(state.get('last_read_at')), 0, None
+
+        # Bounded above by now so the next incremental count starts exactly where this one stopped.
+        window = {'$lte': now}
+        if since is not None:
+            window['$gt'] = since
+        query = {'$and': [visibility, {'created_at': window}]}
+        read_ids = set(state.get('read_ids') or [])
+        for doc in self.notifications.find(query, {'_id': 1, 'expires_at': 1}):
+            if str(doc['_id']) in read_ids:
+                continue
+            count += 1
+            expires_at = _aware(doc.get('expires_at'))
+            if expires_at is not None and (valid_until is None or expires_at < valid_until):
+                valid_until = expires_at
+
+        self.collection.update_one(
+            {'_id': user_id, 'read_version': state.get('read_version', 0)},
+            {'$set': {'unread_cache': {
+                'count': count,
+                'counted_at': now,
+                'valid_until': valid_until,
+                'visibility': visibility_key,
+            }}},
+        )
+        return count
+
+    @staticmethod
+    def prefs_version(state: Dict[str, Any]) -> int:
+        return int(state.get('prefs_version', 0) or 0)
+
+    def bump_prefs_version(self, user_id: str) -> None:
+        self.get(user_id)  # make sure legacy read marks are seeded before the doc exists
+        self.collection.update_one({'_id': user_id}, {'$inc': {'prefs_version': 1}})
+
+    def mark_all(self, user_id: str) -> None:
+        now = datetime.now(timezone.utc)
+        self.collection.update_one(
+            {'_id': user_id},
+            {
+                '$set': {'last_read_at': now, 'read_ids': []},
+                '$inc': {'read_version': 1},
+                '$unset': {'unread_cache': ''},
+            },
+            upsert=True,
+        )
+
+    def mark_ids(self, user_id: str, object_ids: Iterable[Any]) -> int:
+        """Add items newer than the watermark to the read set; returns how many were newly marked."""
+        object_ids = list(object_ids)
+        if not object_ids:
+            return 0
+        state = self.get(user_id)
+        query: Dict[str, Any] = {'_id': {'$in': object_ids}}
+        watermark = state.get('last_read_at')
+        if watermark is not None:
+            query['created_at'] = {'$gt': watermark}
+        already = set(state.get('read_ids') or [])
+        new_ids = [str(doc['_id']) for doc in self.notifications.find(query, {'_id': 1}) if str(doc['_id']) not in already]
+        if not new_ids:
+            return 0
+        self.collection.update_one(
+            {'_id': user_id},
+            {
+                '$push': {'read_ids': {'$each': new_ids, '$slice': -self.read_set_limit}},
+                '$inc': {'read_version': 1},
+                '$unset': {'unread_cache': ''},
+            },
+        )
+        return len(new_ids)
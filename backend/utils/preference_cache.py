@@ -0,0 +1,66 @@
+"""In-process TTL/LRU cache for per-user preferences, invalidated across processes by a version number."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class VersionedPreferenceCache:
+    """user_id -> loader(user_id), reused while the caller's version still matches.
+
+    The version comes from a document the request reads anyway (for in-app
+    notifications: the user's notification_read_state), so a preference change
+    in any process bumps it and every other process reloads on its next hit
+    without an extra query. ttl_seconds bounds staleness for writes that do not
+    bump the version.
+    """
+
+    def __init__(self, loader: Callable[[str], Any], ttl_seconds: float = 300, max_entries: int = 10000):
+        self.loader = loader
+        self.ttl_seconds = max(1.0, float(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, Tuple[Any, Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale_version': 0, 'expired': 0}
+
+    def get(self, user_id: str, version: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                value, cached_version, loaded_at = entry
+                if cached_version != version:
+                    self._stats['stale_version'] += 1
+                elif now - loaded_at >= self.ttl_seconds:
+                    self._stats['expired'] += 1
+                else:
+                    self._entries.move_to_end(user_id)
+                    self._stats['hits'] += 1
+                    return value
+            self._stats['misses'] += 1
+
+        value = self.loader(user_id)
+        with self._lock:
+            self._entries[user_id] = (value, version, now)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._stats)
+            counters['entries'] = len(self._entries)
+        lookups = counters['hits'] + counters['misses']
+        counters['hit_rate'] = round(counters['hits'] / lookups, 4) if lookups else None
+        return counters
@@ -7,17 +7,33 @@ Sends notifications for:
   3. Security alerts (login from new device)
 """
 
-import requests
 import json
+import os
 import re
 from datetime import datetime, timezone
 from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
 from config.settings import MONGO_URI
+from utils.expo_push_sender import EXPO_PUSH_URL, ExpoPushSender
 
-EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+# Concurrent Expo batch requests per process (bounded by the shared HTTP pool size)
+try:
+    EXPO_PUSH_MAX_IN_FLIGHT = max(1, int(os.environ.get('EXPO_PUSH_MAX_IN_FLIGHT', '4')))
+except Exception:
+    EXPO_PUSH_MAX_IN_FLIGHT = 4
 
 # Impact level hierarchy for filtering
 IMPACT_LEVELS = {"high": 3, "medium": 2, "low": 1}
+# news_impact_filter -> lowest event priority the user wants (stored as news_min_priority)
+NEWS_FILTER_MIN_PRIORITY = {"all": 1, "medium": 2, "high": 3}
+DEFAULT_SIGNAL_THRESHOLD = 0.9
+# Recipient cursors: only push_token leaves the server, in large batches
+RECIPIENT_CURSOR_BATCH = 1000
+
+
+def news_min_priority(impact_filter) -> int:
+    """Unknown filters match nothing, as the old per-document check did."""
+    return NEWS_FILTER_MIN_PRIORITY.get(str(impact_filter or "high"), IMPACT_LEVELS["high"] + 1)
 EXPO_TOKEN_PATTERN = re.compile(r"^(Exponent|Expo)PushToken\[[^\]]+\]$")
 
 
@@ -25,6 +41,11 @@ class PushNotificationService:
     """Expo Push Notification-ийг удирдах сервис"""
 
     def __init__(self):
+        self.client = None
+        self.sender = ExpoPushSender(max_in_flight=EXPO_PUSH_MAX_IN_FLIGHT)
+        self._connect(ensure_indexes=True)
+
+    def _connect(self, ensure_indexes: bool = False):
         try:
             self.client = MongoClient(
                 MONGO_URI,
@@ -37,16 +58,60 @@ class PushNotificationService:
             self.db = self.client['users_db']
             self.push_tokens = self.db['push_tokens']
             self.notified_events = self.db['notified_events']  # Track sent news notifications
-            # Ensure index on user_id for fast lookups
-            self.push_tokens.create_index("user_id", unique=True)
-            # TTL index: auto-delete notified events after 24 hours
-            self.notified_events.create_index("notified_at", expireAfterSeconds=86400)
+            if ensure_indexes:
+                # Ensure index on user_id for fast lookups
+                self.push_tokens.create_index("user_id", unique=True)
+                # TTL index: auto-delete notified events after 24 hours
+                self.notified_events.create_index("notified_at", expireAfterSeconds=86400)
+                # Recipient selection: equality fields, then the range field, then push_token
+                # so the token cursors are covered by the index.
+                self.push_tokens.create_index(
+                    [("notifications_enabled", 1), ("signal_notifications", 1),
+                     ("signal_threshold", 1), ("push_token", 1)],
+                    name="idx_push_signal_recipients",
+                )
+                self.push_tokens.create_index(
+                    [("notifications_enabled", 1), ("news_notifications", 1),
+                     ("news_min_priority", 1), ("push_token", 1)],
+                    name="idx_push_news_recipients",
+                )
+                self._backfill_recipient_fields()
             print("[OK] PushNotificationService initialized")
         except Exception as e:
             print(f"[ERROR] PushNotificationService init failed: {e}")
             self.push_tokens = None
             self.notified_events = None
 
+    def _backfill_recipient_fields(self):
+        """Numeric fields the recipient indexes range over, for documents written before they existed."""
+        try:
+            self.push_tokens.update_many(
+                {"news_min_priority": {"$exists": False}},
+                [{"$set": {"news_min_priority": {"$switch": {
+                    "branches": [
+                        {"case": {"$eq": [{"$ifNull": ["$news_impact_filter", "high"]}, name]}, "then": priority}
+                        for name, priority in NEWS_FILTER_MIN_PRIORITY.items()
+                    ],
+                    "default": IMPACT_LEVELS["high"] + 1,
+                }}}}],
+            )
+            self.push_tokens.update_many(
+                {"signal_threshold": {"$exists": False}},
+                {"$set": {"signal_threshold": DEFAULT_SIGNAL_THRESHOLD}},
+            )
+        except Exception as e:
+            print(f"[WARN] Push recipient field backfill failed: {e}")
+
+    def reconnect(self):
+        """Replace the Mongo client after fork (pymongo clients are not fork-safe)."""
+        old_client = self.client
+        self._connect(ensure_indexes=False)
+        if old_client is not None and old_client is not self.client:
+            try:
+                old_client.close()
+            except Exception:
+                pass
+
     def register_token(self, user_id: str, push_token: str, platform: str = "unknown",
                        device_id: str = "") -> bool:
         """
@@ -79,8 +144,9 @@ class PushNotificationService:
                         "signal_notifications": True,
                         "news_notifications": True,
                         "news_impact_filter": "high",     # "high" | "medium" | "all"
+                        "news_min_priority": NEWS_FILTER_MIN_PRIORITY["high"],
                         "security_notifications": True,
-                        "signal_threshold": 0.9,           # 0.9-1.0 (user's personal confidence threshold)
+                        "signal_threshold": DEFAULT_SIGNAL_THRESHOLD,  # 0.9-1.0 (user's personal confidence threshold)
                     }
                 },
                 upsert=True
@@ -123,6 +189,8 @@ class PushNotificationService:
             for key in allowed_keys:
                 if key in preferences:
                     update_fields[key] = preferences[key]
+            if "news_impact_filter" in update_fields:
+                update_fields["news_min_priority"] = news_min_priority(update_fields["news_impact_filter"])
 
             result = self.push_tokens.update_one(
                 {"user_id": user_id},
@@ -190,6 +258,26 @@ class PushNotificationService:
             print(f"[ERROR] Get active tokens failed: {e}")
             return []
 
+    def _stream_tokens(self, query: dict):
+        """Push token-уудыг index-ээр шүүж, cursor-оос шууд урсгах"""
+        cursor = self.push_tokens.find(query, {"push_token": 1, "_id": 0}).batch_size(RECIPIENT_CURSOR_BATCH)
+        for doc in cursor:
+            token = doc.get("push_token")
+            if token:
+                yield token
+
+    def iter_news_tokens(self, impact_level: str):
+        """
+        Мэдээний impact-д тохирох хэрэглэгчдийн token-ууд (generator).
+        Users whose news_min_priority <= event priority, selected by idx_push_news_recipients.
+        """
+        event_priority = IMPACT_LEVELS.get(str(impact_level).lower(), 1)
+        return self._stream_tokens({
+            "notifications_enabled": True,
+            "news_notifications": True,
+            "news_min_priority": {"$lte": event_priority},
+        })
+
     def _get_news_tokens_by_impact(self, impact_level: str) -> list:
         """
         Мэдээний impact-д тохирох хэрэглэгчдийн token авах.
@@ -197,33 +285,40 @@ class PushNotificationService:
         Returns tokens of users whose news_impact_filter allows this impact level.
         """
         try:
-            event_priority = IMPACT_LEVELS.get(impact_level.lower(), 1)
-
-            query = {
-                "notifications_enabled": True,
-                "news_notifications": True
-            }
-            # Find all news-enabled users and filter by their preference
-            docs = self.push_tokens.find(query, {
-                "push_token": 1, "news_impact_filter": 1, "_id": 0
-            })
-
-            tokens = []
-            for doc in docs:
-                if not doc.get("push_token"):
-                    continue
-                user_filter = doc.get("news_impact_filter", "high")
-                if user_filter == "all":
-                    tokens.append(doc["push_token"])
-                elif user_filter == "medium" and event_priority >= IMPACT_LEVELS["medium"]:
-                    tokens.append(doc["push_token"])
-                elif user_filter == "high" and event_priority >= IMPACT_LEVELS["high"]:
-                    tokens.append(doc["push_token"])
-            return tokens
+            return list(self.iter_news_tokens(impact_level))
         except Exception as e:
             print(f"[ERROR] Get news tokens by impact failed: {e}")
             return []
 
+    def _send_expo_batch(self, messages: list) -> list:
+        """
+        Expo руу мессежүүдийг илгээж, мессеж бүрийн үр дүнг буцаах.
+        Returns [{ status: 'ok' | 'retry' | 'failed', error, ticket_id }] in input order.
+        'retry' = transient (HTTP/network/rate limit); 'failed' = permanent for that token.
+        Batches of 100 are sent concurrently; unregistered tokens are pruned in one delete.
+        """
+        outcomes = self.sender.send(messages)
+        dead_tokens = [
+            message.get("to")
+            for message, outcome in zip(messages, outcomes)
+            if outcome.get("error") == "DeviceNotRegistered" and message.get("to")
+        ]
+        if dead_tokens:
+            self.prune_tokens(dead_tokens)
+        return outcomes
+
+    def prune_tokens(self, tokens: list) -> int:
+        """Бүртгэлгүй болсон token-уудыг нэг query-ээр устгах"""
+        if not tokens:
+            return 0
+        try:
+            removed = self.push_tokens.delete_many({"push_token": {"$in": list(tokens)}}).deleted_count
+            print(f"[INFO] Removed {removed} invalid push token(s)")
+            return removed
+        except Exception as e:
+            print(f"[WARN] Prune push tokens failed: {e}")
+            return 0
+
     def _send_expo_notifications(self, messages: list) -> dict:
         """
         Expo Push API-руу мэдэгдэл илгээх
@@ -233,49 +328,10 @@ class PushNotificationService:
             return {"success": False, "error": "No messages to send"}
 
         try:
-            # Expo API accepts batches of up to 100.
-            results = []
-            had_http_error = False
-
-            for i in range(0, len(messages), 100):
-                batch = messages[i:i + 100]
-                response = requests.post(
-                    EXPO_PUSH_URL,
-                    json=batch,
-                    headers={
-                        "Accept": "application/json",
-                        "Accept-Encoding": "gzip, deflate",
-                        "Content-Type": "application/json",
-                    },
-                    timeout=10
-                )
+            outcomes = self._send_expo_batch(messages)
+            success_count = sum(1 for o in outcomes if o["status"] == "ok")
+            had_http_error = any(o["status"] == "retry" for o in outcomes)
 
-                if response.status_code != 200:
-                    had_http_error = True
-                    print(f"[ERROR] Expo push API error: {response.status_code} - {response.text}")
-                    continue
-
-                try:
-                    data = response.json()
-                except Exception as parse_err:
-                    had_http_error = True
-                    print(f"[ERROR] Expo push response parse error: {parse_err}")
-                    continue
-
-                batch_results = data.get("data", [])
-                results.extend(batch_results)
-
-                # Check for invalid tokens and remove them (batch-local mapping).
-                for j, result in enumerate(batch_results):
-                    if result.get("status") == "error":
-                        details = result.get("details", {})
-                        if details.get("error") == "DeviceNotRegistered":
-                            token = batch[j].get("to") if j < len(batch) else None
-                            if token:
-                                self.push_tokens.delete_one({"push_token": token})
-                                print(f"[INFO] Removed invalid token: {token[:30]}...")
-
-            success_count = sum(1 for r in results if r.get("status") == "ok")
             print(f"[OK] Push notifications sent: {success_count}/{len(messages)}")
             return {
                 "success": not had_http_error,
@@ -288,23 +344,90 @@ class PushNotificationService:
             print(f"[ERROR] Send push notifications failed: {e}")
             return {"success": False, "error": str(e)}
 
-    def is_event_notified(self, event_key: str) -> bool:
-        """Энэ мэдээний мэдэгдэл аль хэдийн илгээсэн эсэхийг шалгах"""
-        try:
-            return self.notified_events.find_one({"_id": event_key}) is not None
-        except Exception:
-            return False
-
-    def mark_event_notified(self, event_key: str):
-        """Мэдээний мэдэгдэл илгээснийг бүртгэх"""
+    def send_expo_batch(self, messages: list) -> list:
+        """Outbox fan-out entry point: per-message outcomes, sent as concurrent Expo batches."""
+        return self._send_expo_batch(messages)
+
+    def resolve_recipients(self, kind: str, payload: dict) -> list:
+        """Мэдэгдлийн төрөл бүрийн хүлээн авагч token-ууд; signal/news are streamed from the cursor."""
+        if kind == "signal":
+            return self.iter_signal_tokens(payload.get("confidence", 0))
+        if kind == "news":
+            return self.iter_news_tokens(str(payload.get("impact", "medium")))
+        if kind == "security":
+            try:
+                doc = self.push_tokens.find_one({
+                    "user_id": payload.get("user_id"),
+                    "notifications_enabled": True,
+                    "security_notifications": {"$ne": False}
+                }, {"push_token": 1, "_id": 0})
+            except Exception as e:
+                print(f"[ERROR] Get security token failed: {e}")
+                return []
+            return [doc["push_token"]] if doc and doc.get("push_token") else []
+        raise ValueError(f"unknown notification kind: {kind}")
+
+    def build_messages(self, kind: str, payload: dict, tokens: list) -> list:
+        """Outbox-ийн payload-оос token бүрийн Expo мессеж үүсгэх"""
+        if kind == "signal":
+            return self._signal_messages(payload, tokens)
+        if kind == "news":
+            return self._news_messages(payload, tokens)
+        if kind == "security":
+            return self._security_messages(payload.get("login_info") or {}, tokens)
+        raise ValueError(f"unknown notification kind: {kind}")
+
+    def claim_event_notification(self, event_key: str) -> bool:
+        """
+        Мэдээний мэдэгдлийг атомаар "эзэмших": True only for the one caller whose
+        upsert inserted the marker, so concurrent workers cannot both send it.
+        """
         try:
-            self.notified_events.update_one(
+            result = self.notified_events.update_one(
                 {"_id": event_key},
-                {"$set": {"notified_at": datetime.now(timezone.utc)}},
+                {"$setOnInsert": {"notified_at": datetime.now(timezone.utc)}},
                 upsert=True
             )
+            return result.upserted_id is not None
+        except DuplicateKeyError:
+            # Two upserts raced on the same _id; the other one won.
+            return False
         except Exception as e:
-            print(f"[WARN] Mark event notified failed: {e}")
+            # Fail open: the outbox dedupe key still keeps the push itself single.
+            print(f"[WARN] Claim event notification failed: {e}")
+            return True
+
+    def release_event_notification(self, event_key: str):
+        """Claim-ийг буцаах (alert could not be queued, so it may be retried)"""
+        try:
+            self.notified_events.delete_one({"_id": event_key})
+        except Exception as e:
+            print(f"[WARN] Release event notification failed: {e}")
+
+    def notified_event_keys(self, event_keys: list) -> set:
+        """Аль хэдийн илгээсэн мэдээний key-үүдийг нэг query-ээр авах"""
+        if not event_keys:
+            return set()
+        try:
+            return {doc["_id"] for doc in self.notified_events.find({"_id": {"$in": list(event_keys)}}, {"_id": 1})}
+        except Exception as e:
+            print(f"[WARN] Notified events lookup failed: {e}")
+            return set()
+
+    def iter_signal_tokens(self, confidence: float):
+        """
+        Хэрэглэгчийн signal_threshold-д тохирох token-ууд (generator).
+        Users whose signal_threshold <= confidence, selected by idx_push_signal_recipients.
+        """
+        # Convert confidence to 0-1 range if needed
+        confidence = float(confidence or 0)
+        if confidence > 1:
+            confidence = confidence / 100.0
+        return self._stream_tokens({
+            "notifications_enabled": True,
+            "signal_notifications": True,
+            "signal_threshold": {"$lte": confidence},
+        })
 
     def _get_signal_tokens_by_threshold(self, confidence: float) -> list:
         """
@@ -313,42 +436,12 @@ class PushNotificationService:
         Зөвхөн итгэлцүүр >= хэрэглэгчийн босго үед илгээнэ.
         """
         try:
-            # Convert confidence to 0-1 range if needed
-            if confidence > 1:
-                confidence = confidence / 100.0
-
-            query = {
-                "notifications_enabled": True,
-                "signal_notifications": True
-            }
-            docs = self.push_tokens.find(query, {
-                "push_token": 1, "signal_threshold": 1, "_id": 0
-            })
-
-            tokens = []
-            for doc in docs:
-                if not doc.get("push_token"):
-                    continue
-                user_threshold = doc.get("signal_threshold", 0.9)
-                if confidence >= user_threshold:
-                    tokens.append(doc["push_token"])
-            return tokens
+            return list(self.iter_signal_tokens(confidence))
         except Exception as e:
             print(f"[ERROR] Get signal tokens by threshold failed: {e}")
             return []
 
-    def send_signal_notification(self, signal_data: dict) -> dict:
-        """
-        Арилжааны сигнал мэдэгдэл илгээх (хэрэглэгч бүрийн босгоор шүүнэ)
-        signal_data: { signal_type, pair, confidence, entry_price, sl, tp }
-        confidence >= хэрэглэгчийн signal_threshold үед л мэдэгдэл илгээнэ.
-        """
-        confidence_raw = signal_data.get("confidence", 0)
-        tokens = self._get_signal_tokens_by_threshold(confidence_raw)
-        if not tokens:
-            print(f"[INFO] No active tokens for signal notifications (conf={confidence_raw})")
-            return {"success": True, "sent": 0}
-
+    def _signal_messages(self, signal_data: dict, tokens: list) -> list:
         signal_type = signal_data.get("signal_type", "HOLD").upper()
         pair = signal_data.get("pair", "EUR/USD")
         confidence = signal_data.get("confidence", 0)
@@ -372,7 +465,7 @@ class PushNotificationService:
         if signal_data.get("sl") and signal_data.get("tp"):
             body += f"\nSL: {signal_data['sl']} | TP: {signal_data['tp']}"
 
-        messages = [
+        return [
             {
                 "to": token,
                 "title": title,
@@ -392,24 +485,26 @@ class PushNotificationService:
             for token in tokens
         ]
 
-        return self._send_expo_notifications(messages)
-
-    def send_news_notification(self, news_data: dict) -> dict:
+    def send_signal_notification(self, signal_data: dict) -> dict:
         """
-        Мэдээний мэдэгдэл илгээх (impact-д тохируулан хэрэглэгч бүрд шүүнэ)
-        news_data: { title, impact, currency, description, event_time }
+        Арилжааны сигнал мэдэгдэл илгээх (хэрэглэгч бүрийн босгоор шүүнэ)
+        signal_data: { signal_type, pair, confidence, entry_price, sl, tp }
+        confidence >= хэрэглэгчийн signal_threshold үед л мэдэгдэл илгээнэ.
         """
+        confidence_raw = signal_data.get("confidence", 0)
+        tokens = self._get_signal_tokens_by_threshold(confidence_raw)
+        if not tokens:
+            print(f"[INFO] No active tokens for signal notifications (conf={confidence_raw})")
+            return {"success": True, "sent": 0}
+
+        return self._send_expo_notifications(self._signal_messages(signal_data, tokens))
+
+    def _news_messages(self, news_data: dict, tokens: list) -> list:
         impact = news_data.get("impact", "medium").lower()
         currency = news_data.get("currency", "USD")
         news_title = news_data.get("title", "Economic News")
         event_time = news_data.get("event_time", "")
 
-        # Get tokens filtered by each user's impact preference
-        tokens = self._get_news_tokens_by_impact(impact)
-        if not tokens:
-            print(f"[INFO] No active tokens for {impact} impact news notifications")
-            return {"success": True, "sent": 0}
-
         impact_emoji = "🔴" if impact == "high" else "🟡" if impact == "medium" else "🟢"
 
         title = f"{impact_emoji} {currency} - News Alert"
@@ -419,7 +514,7 @@ class PushNotificationService:
         if news_data.get("description"):
             body += f"\n{news_data['description'][:100]}"
 
-        messages = [
+        return [
             {
                 "to": token,
                 "title": title,
@@ -437,7 +532,41 @@ class PushNotificationService:
             for token in tokens
         ]
 
-        return self._send_expo_notifications(messages)
+    def send_news_notification(self, news_data: dict) -> dict:
+        """
+        Мэдээний мэдэгдэл илгээх (impact-д тохируулан хэрэглэгч бүрд шүүнэ)
+        news_data: { title, impact, currency, description, event_time }
+        """
+        impact = news_data.get("impact", "medium").lower()
+
+        # Get tokens filtered by each user's impact preference
+        tokens = self._get_news_tokens_by_impact(impact)
+        if not tokens:
+            print(f"[INFO] No active tokens for {impact} impact news notifications")
+            return {"success": True, "sent": 0}
+
+        return self._send_expo_notifications(self._news_messages(news_data, tokens))
+
+    def _security_messages(self, login_info: dict, tokens: list) -> list:
+        platform = login_info.get("platform", "Unknown device")
+        ip = login_info.get("ip", "Unknown IP")
+        login_time = login_info.get("login_time", datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M"))
+
+        title = "🔐 New Login Detected"
+        body = f"New login from {platform}\nIP: {ip}\nTime: {login_time}"
+
+        return [{
+            "to": token,
+            "title": title,
+            "body": body,
+            "sound": "default",
+            "priority": "high",
+            "channelId": "security",
+            "data": {
+                "type": "security",
+                "screen": "Profile"
+            }
+        } for token in tokens]
 
     def send_security_alert(self, user_id: str, login_info: dict) -> dict:
         """
@@ -454,27 +583,7 @@ class PushNotificationService:
                 print(f"[INFO] No active token for security alert (user: {user_id})")
                 return {"success": True, "sent": 0}
 
-            platform = login_info.get("platform", "Unknown device")
-            ip = login_info.get("ip", "Unknown IP")
-            login_time = login_info.get("login_time", datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M"))
-
-            title = "🔐 New Login Detected"
-            body = f"New login from {platform}\nIP: {ip}\nTime: {login_time}"
-
-            messages = [{
-                "to": doc["push_token"],
-                "title": title,
-                "body": body,
-                "sound": "default",
-                "priority": "high",
-                "channelId": "security",
-                "data": {
-                    "type": "security",
-                    "screen": "Profile"
-                }
-            }]
-
-            return self._send_expo_notifications(messages)
+            return self._send_expo_notifications(self._security_messages(login_info, [doc["push_token"]]))
         except Exception as e:
             print(f"[ERROR] Send security alert failed: {e}")
             return {"success": False, "error": str(e)}
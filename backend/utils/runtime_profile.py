@@ -0,0 +1,119 @@
+"""Process runtime profile: lazy heavy imports, import timings and memory usage."""
+
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Modules that dominate cold start and resident memory on the 1 GB machine.
+HEAVY_MODULES = (
+    "numpy",
+    "pandas",
+    "joblib",
+    "sklearn",
+    "lightgbm",
+    "xgboost",
+    "catboost",
+    "yfinance",
+    "google.genai",
+)
+
+_PROCESS_STARTED_AT = time.time()
+_import_timings: Dict[str, float] = {}
+_import_lock = threading.Lock()
+
+
+def lazy_import(module_name: str):
+    """Import a module on first use and record how long the import took."""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    with _import_lock:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        record_import_timing(module_name, time.perf_counter() - started)
+        return module
+
+
+def record_import_timing(name: str, seconds: float) -> None:
+    _import_timings[name] = round(float(seconds), 4)
+
+
+def loaded_heavy_modules() -> Dict[str, bool]:
+    return {name: name in sys.modules for name in HEAVY_MODULES}
+
+
+def _read_proc_kb(path: str, fields) -> Dict[str, int]:
+    values: Dict[str, int] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    parts = rest.split()
+                    if parts:
+                        values[key] = int(parts[0])
+    except Exception:
+        return {}
+    return values
+
+
+def memory_usage_mb() -> Dict[str, Optional[float]]:
+    """Resident/peak memory plus shared vs private split (Linux only for the split)."""
+    status = _read_proc_kb("/proc/self/status", ("VmRSS", "VmHWM"))
+    rollup = _read_proc_kb(
+        "/proc/self/smaps_rollup",
+        ("Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"),
+    )
+
+    rss_kb = status.get("VmRSS")
+    peak_kb = status.get("VmHWM")
+    if rss_kb is None:
+        try:
+            import resource
+
+            # ru_maxrss is KB on Linux, bytes on macOS.
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            peak_kb = peak // 1024 if sys.platform == "darwin" else peak
+        except Exception:
+            peak_kb = None
+
+    def _mb(kb):
+        return round(kb / 1024.0, 1) if kb is not None else None
+
+    shared_kb = None
+    private_kb = None
+    if rollup:
+        shared_kb = rollup.get("Shared_Clean", 0) + rollup.get("Shared_Dirty", 0)
+        private_kb = rollup.get("Private_Clean", 0) + rollup.get("Private_Dirty", 0)
+
+    return {
+        "rss_mb": _mb(rss_kb),
+        "peak_rss_mb": _mb(peak_kb),
+        "pss_mb": _mb(rollup.get("Pss")) if rollup else None,
+        "shared_mb": _mb(shared_kb),
+        "private_mb": _mb(private_kb),
+    }
+
+
+def runtime_report(role: str, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    report = {
+        "role": role,
+        "pid": os.getpid(),
+        "uptime_seconds": int(time.time() - _PROCESS_STARTED_AT),
+        "import_seconds": dict(_import_timings),
+        "heavy_modules_loaded": loaded_heavy_modules(),
+        "memory": memory_usage_mb(),
+    }
+    if extra:
+        report.update(extra)
+    return report
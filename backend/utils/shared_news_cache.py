@@ -0,0 +1,110 @@
+"""Versioned cross-process news snapshot: the worker publishes, API processes read."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+SNAPSHOT_ID = 'news'
+
+
+class SharedNewsStore:
+    """Single Mongo document holding the latest news cache plus a monotonically increasing version.
+
+    Readers keep a local copy and probe only the version field, at most once per
+    check interval; the full snapshot is re-read only when the version moved.
+    """
+
+    def __init__(self, collection, check_interval_seconds: float = 15.0, stale_after_seconds: float = 3600.0):
+        self.collection = collection
+        self.check_interval_seconds = max(0.0, float(check_interval_seconds))
+        self.stale_after_seconds = max(1.0, float(stale_after_seconds))
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._data: Optional[Dict[str, Any]] = None
+        self._updated_at: Optional[datetime] = None
+        self._checked_at = float('-inf')
+
+    def publish(self, data: Dict[str, Any], publisher: str = '') -> Optional[int]:
+        if self.collection is None:
+            return None
+
+        now = datetime.now(timezone.utc)
+        try:
+            doc = self.collection.find_one_and_update(
+                {'_id': SNAPSHOT_ID},
+                {
+                    '$inc': {'version': 1},
+                    '$set': {'data': data, 'updated_at': now, 'published_by': publisher},
+                },
+                projection={'version': 1},
+                upsert=True,
+                return_document=True,  # ReturnDocument.AFTER
+            )
+        except Exception as e:
+            print(f"[WARN] Shared news snapshot publish failed: {e}", flush=True)
+            return None
+
+        version = int((doc or {}).get('version') or 0)
+        with self._lock:
+            self._version = version
+            self._data = data
+            self._updated_at = now
+            self._checked_at = time.monotonic()
+        return version
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload the snapshot if another process published a newer version."""
+        if self.collection is None:
+            return False
+
+        now_mono = time.monotonic()
+        with self._lock:
+            if not force and now_mono - self._checked_at < self.check_interval_seconds:
+                return False
+            self._checked_at = now_mono
+            local_version = self._version
+
+        try:
+            head = self.collection.find_one({'_id': SNAPSHOT_ID}, {'version': 1})
+            if not head or head.get('version') == local_version:
+                return False
+            doc = self.collection.find_one({'_id': SNAPSHOT_ID})
+        except Exception as e:
+            print(f"[WARN] Shared news snapshot refresh failed: {e}", flush=True)
+            return False
+
+        if not doc:
+            return False
+
+        with self._lock:
+            self._version = doc.get('version')
+            self._data = doc.get('data') or {}
+            self._updated_at = doc.get('updated_at')
+        return True
+
+    def get(self, key: str):
+        self.refresh()
+        with self._lock:
+            return (self._data or {}).get(key)
+
+    def metadata(self) -> Dict[str, Any]:
+        with self._lock:
+            version = self._version
+            updated_at = self._updated_at
+
+        age_seconds = None
+        if isinstance(updated_at, datetime):
+            if updated_at.tzinfo is None:
+                # pymongo returns naive UTC datetimes unless tz_aware=True.
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            age_seconds = max(0, int((datetime.now(timezone.utc) - updated_at).total_seconds()))
+
+        return {
+            'version': version,
+            'updated_at': updated_at.isoformat() if isinstance(updated_at, datetime) else None,
+            'age_seconds': age_seconds,
+            'stale': age_seconds is None or age_seconds > self.stale_after_seconds,
+        }
@@ -0,0 +1,52 @@
+"""Field projections and the compact row format for signal list endpoints."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Fields a client may ask for with ?fields=; _id and created_at are always returned (cursors, ordering).
+SIGNAL_FIELDS = (
+    'pair', 'signal', 'confidence', 'entry_price', 'stop_loss', 'take_profit', 'sl_pips', 'tp_pips',
+    'risk_reward', 'atr_pips', 'reason', 'models_agree', 'model_probabilities', 'model_version',
+    'model_provenance', 'run_id', 'source', 'status',
+)
+ALWAYS_FIELDS = ('_id', 'created_at')
+
+
+def parse_fields(raw: Optional[str]) -> Optional[Dict[str, int]]:
+    """Mongo projection for a comma-separated ?fields= value; None means whole documents."""
+    names = [name.strip() for name in str(raw or '').split(',') if name.strip()]
+    if not names:
+        return None
+    unknown = sorted(set(names) - set(SIGNAL_FIELDS) - set(ALWAYS_FIELDS))
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    projection = {name: 1 for name in names}
+    projection.update({name: 1 for name in ALWAYS_FIELDS})
+    if 'model_provenance' in projection:
+        projection['run_id'] = 1  # compact mode keys the shared provenance by run_id
+        projection['provenance_ref'] = 1  # normalised signals reference model_runs
+    return projection
+
+
+def compact_signals(rows: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Rows without null fields and with model_provenance moved into a run_id-keyed dictionary.
+
+    Every signal from one model run carries the same provenance, so a page of
+    history repeats it on each row; compact responses send it once per run.
+    Rows whose provenance has no run_id keep it inline.
+    """
+    provenance: Dict[str, Dict[str, Any]] = {}
+    compacted: List[Dict[str, Any]] = []
+    for row in rows:
+        row = {key: value for key, value in row.items() if value is not None}
+        row_provenance = row.get('model_provenance')
+        if isinstance(row_provenance, dict):
+            run_id = row.get('run_id') or row_provenance.get('run_id')
+            if run_id:
+                run_id = str(run_id)
+                provenance.setdefault(run_id, {k: v for k, v in row_provenance.items() if v is not None})
+                row['run_id'] = run_id
+                del row['model_provenance']
+        compacted.append(row)
+    return compacted, provenance
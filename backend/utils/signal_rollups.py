@@ -0,0 +1,207 @@
+"""Pre-aggregated signal statistics: one rollup document per pair per UTC day plus an all-time document."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+ALL_TIME = 'all'
+SIGNAL_TYPES = ('BUY', 'SELL', 'HOLD')
+META_ID = '_meta'
+
+
+def _pair_key(pair: Any) -> str:
+    return str(pair or '').replace('/', '_')
+
+
+def _day_key(created_at: Any) -> Optional[str]:
+    if not isinstance(created_at, datetime):
+        return None
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.astimezone(timezone.utc).strftime('%Y-%m-%d')
+
+
+def _confidence(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _stats_from_parts(counts: Dict[str, int], conf_sum: float, conf_n: int,
+                      conf_max: Optional[float], conf_min: Optional[float]) -> Dict[str, Any]:
+    buy, sell, hold = (int(counts.get(t, 0) or 0) for t in SIGNAL_TYPES)
+    return {
+        # total_signals has always been BUY + SELL + HOLD; other labels are not counted
+        'total_signals': buy + sell + hold,
+        'buy_count': buy,
+        'sell_count': sell,
+        'hold_count': hold,
+        'avg_confidence': round(conf_sum / conf_n, 2) if conf_n else 0,
+        'max_confidence': round(conf_max, 2) if conf_max is not None else 0,
+        'min_confidence': round(conf_min, 2) if conf_min is not None else 0,
+    }
+
+
+class SignalRollups:
+    """signal_rollups documents keyed "<pair>:<YYYY-MM-DD>" and "<pair>:all".
+
+    record() folds each newly inserted trusted signal in with $inc/$max/$min, so
+    /signals/stats reads one or a few small documents instead of scanning the
+    pair's signals. The first time it runs, rebuild() derives the rollups from
+    the existing signals and writes the _meta marker. Until then summary()
+    returns None and callers fall back to range_stats(). last_signal is a plain
+    $set because the only writer is the leased signal_generator job.
+    """
+
+    def __init__(self, collection=None, signals=None, trusted_match: Optional[Dict[str, Any]] = None):
+        self.collection = collection
+        self.signals = signals
+        self.trusted_match = dict(trusted_match or {})
+        self._built = False
+
+    # ---- writes ----
+
+    def record(self, signal_doc: Dict[str, Any]) -> None:
+        pair = _pair_key(signal_doc.get('pair'))
+        created_at = signal_doc.get('created_at')
+        now = datetime.now(timezone.utc)
+        update: Dict[str, Any] = {
+            '$inc': {f"counts.{signal_doc.get('signal')}": 1},
+            '$set': {'last_signal': signal_doc, 'updated_at': now},
+            '$setOnInsert': {'pair': pair},
+        }
+        if isinstance(created_at, datetime):
+            update['$max'] = {'last_created_at': created_at}
+        confidence = _confidence(signal_doc.get('confidence'))
+        if confidence is not None:
+            update['$inc'].update({'conf_sum': confidence, 'conf_n': 1})
+            update.setdefault('$max', {})['conf_max'] = confidence
+            update['$min'] = {'conf_min': confidence}
+
+        day = _day_key(created_at)
+        for period in ([day] if day else []) + [ALL_TIME]:
+            period_update = {**update, '$setOnInsert': {**update['$setOnInsert'], 'period': period}}
+            self.collection.update_one({'_id': f"{pair}:{period}"}, period_update, upsert=True)
+
+    def ensure_built(self) -> None:
+        """Rebuild once per deployment (marker document), checked once per process."""
+        if self._built:
+            return
+        if self.collection.find_one({'_id': META_ID}) is None:
+            self.rebuild()
+        self._built = True
+
+    def rebuild(self) -> int:
+        """Recompute every rollup from the signals collection; returns the number of documents written."""
+        pipeline = [
+            {'$match': self.trusted_match},
+            {'$sort': {'created_at': 1}},
+            {'$group': {
+                '_id': {
+                    'pair': {'$replaceAll': {'input': {'$toString': '$pair'}, 'find': '/', 'replacement': '_'}},
+                    'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
+                    'signal': '$signal',
+                },
+                'n': {'$sum': 1},
+                'conf_sum': {'$sum': {'$cond': [{'$isNumber': '$confidence'}, '$confidence', 0]}},
+                'conf_n': {'$sum': {'$cond': [{'$isNumber': '$confidence'}, 1, 0]}},
+                'conf_max': {'$max': '$confidence'},
+                'conf_min': {'$min': '$confidence'},
+                'last_created_at': {'$max': '$created_at'},
+                'last_signal': {'$last': '$$ROOT'},
+            }},
+        ]
+        docs: Dict[str, Dict[str, Any]] = {}
+        for row in self.signals.aggregate(pipeline, allowDiskUse=True):
+            key = row['_id']
+            for period in ([key['day']] if key.get('day') else []) + [ALL_TIME]:
+                self._merge(docs, key['pair'], period, key.get('signal'), row)
+
+        now = datetime.now(timezone.utc)
+        self.collection.delete_many({'_id': {'$ne': META_ID}})
+        for doc in docs.values():
+            doc['updated_at'] = now
+            self.collection.replace_one({'_id': doc['_id']}, doc, upsert=True)
+        self.collection.replace_one({'_id': META_ID}, {'_id': META_ID, 'built_at': now, 'documents': len(docs)}, upsert=True)
+        return len(docs)
+
+    @staticmethod
+    def _merge(docs: Dict[str, Dict[str, Any]], pair: str, period: str, signal: Any, row: Dict[str, Any]) -> None:
+        doc = docs.setdefault(f"{pair}:{period}", {
+            '_id': f"{pair}:{period}", 'pair': pair, 'period': period,
+            'counts': {}, 'conf_sum': 0.0, 'conf_n': 0, 'conf_max': None, 'conf_min': None,
+            'last_created_at': None, 'last_signal': None,
+        })
+        doc['counts'][str(signal)] = doc['counts'].get(str(signal), 0) + row['n']
+        doc['conf_sum'] += row.get('conf_sum') or 0.0
+        doc['conf_n'] += row.get('conf_n') or 0
+        for field, pick in (('conf_max', max), ('conf_min', min)):
+            value = _confidence(row.get(field))
+            if value is not None:
+                doc[field] = value if doc[field] is None else pick(doc[field], value)
+        last = row.get('last_created_at')
+        if last is not None and (doc['last_created_at'] is None or last > doc['last_created_at']):
+            doc['last_created_at'] = last
+            doc['last_signal'] = row.get('last_signal')
+
+    # ---- reads ----
+
+    def summary(self, pair: str, days: Optional[int] = None):
+        """(stats, last_signal) from rollups in one query, or None while they are not built yet."""
+        pair = _pair_key(pair)
+        if days:
+            today = datetime.now(timezone.utc).date()
+            ids = [f"{pair}:{(today - timedelta(days=offset)).isoformat()}" for offset in range(int(days))]
+        else:
+            ids = [f"{pair}:{ALL_TIME}"]
+        found = list(self.collection.find({'_id': {'$in': [META_ID] + ids}}))
+        if not any(doc['_id'] == META_ID for doc in found):
+            return None
+        return self.combine(doc for doc in found if doc['_id'] != META_ID)
+
+    @staticmethod
+    def combine(docs: Iterable[Dict[str, Any]]):
+        counts: Dict[str, int] = {}
+        conf_sum, conf_n, conf_max, conf_min = 0.0, 0, None, None
+        last_signal, last_created_at = None, None
+        for doc in docs:
+            for signal, n in (doc.get('counts') or {}).items():
+                counts[signal] = counts.get(signal, 0) + int(n or 0)
+            conf_sum += float(doc.get('conf_sum') or 0.0)
+            conf_n += int(doc.get('conf_n') or 0)
+            if doc.get('conf_max') is not None:
+                conf_max = doc['conf_max'] if conf_max is None else max(conf_max, doc['conf_max'])
+            if doc.get('conf_min') is not None:
+                conf_min = doc['conf_min'] if conf_min is None else min(conf_min, doc['conf_min'])
+            created = doc.get('last_created_at')
+            if created is not None and (last_created_at is None or created > last_created_at):
+                last_created_at, last_signal = created, doc.get('last_signal')
+        return _stats_from_parts(counts, conf_sum, conf_n, conf_max, conf_min), last_signal
+
+    def range_stats(self, match: Dict[str, Any]):
+        """(stats, last_signal) for an arbitrary filter, e.g. a created_at range, in one $facet aggregate."""
+        pipeline: List[Dict[str, Any]] = [
+            {'$match': match},
+            {'$facet': {
+                'by_signal': [{'$group': {'_id': '$signal', 'n': {'$sum': 1}}}],
+                'confidence': [{'$group': {
+                    '_id': None,
+                    'conf_sum': {'$sum': {'$cond': [{'$isNumber': '$confidence'}, '$confidence', 0]}},
+                    'conf_n': {'$sum': {'$cond': [{'$isNumber': '$confidence'}, 1, 0]}},
+                    'conf_max': {'$max': '$confidence'},
+                    'conf_min': {'$min': '$confidence'},
+                }}],
+                'last': [{'$sort': {'created_at': -1}}, {'$limit': 1}],
+            }},
+        ]
+        result = next(iter(self.signals.aggregate(pipeline)), None) or {}
+        counts = {str(row['_id']): row['n'] for row in result.get('by_signal') or []}
+        conf = (result.get('confidence') or [{}])[0]
+        stats = _stats_from_parts(
+            counts, float(conf.get('conf_sum') or 0.0), int(conf.get('conf_n') or 0),
+            _confidence(conf.get('conf_max')), _confidence(conf.get('conf_min')),
+        )
+        last = result.get('last') or []
+        return stats, (last[0] if last else None)
@@ -0,0 +1,99 @@
+"""Opaque keyset cursors over (created_at, _id) for delta-sync list endpoints, plus page ETags."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+NEWEST_FIRST = [('created_at', -1), ('_id', -1)]
+OLDEST_FIRST = [('created_at', 1), ('_id', 1)]
+
+
+class CursorError(ValueError):
+    pass
+
+
+def _aware(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def encode_cursor(doc: Dict[str, Any]) -> Optional[str]:
+    """Cursor pointing at doc's (created_at, _id); None when the doc has no created_at."""
+    created_at = doc.get('created_at')
+    if not isinstance(created_at, datetime):
+        return None
+    # Millisecond precision, the same as BSON dates, so a cursor round-trips to the stored value.
+    millis = int(_aware(created_at).timestamp() * 1000)
+    raw = json.dumps([millis, str(doc.get('_id'))], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, id_type: Callable[[str], Any] = str) -> Tuple[datetime, Any]:
+    """(created_at, _id) from a cursor; id_type converts the id back (e.g. bson.ObjectId)."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        millis, raw_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = datetime.fromtimestamp(int(millis) / 1000.0, tz=timezone.utc)
+        return created_at, id_type(str(raw_id))
+    except Exception as e:
+        raise CursorError('invalid cursor') from e
+
+
+def after_clause(created_at: datetime, doc_id: Any) -> Dict[str, Any]:
+    """Documents strictly newer than the cursor in (created_at, _id) order."""
+    return {'$or': [
+        {'created_at': {'$gt': created_at}},
+        {'created_at': created_at, '_id': {'$gt': doc_id}},
+    ]}
+
+
+def before_clause(created_at: datetime, doc_id: Any) -> Dict[str, Any]:
+    """Documents strictly older than the cursor in (created_at, _id) order."""
+    return {'$or': [
+        {'created_at': {'$lt': created_at}},
+        {'created_at': created_at, '_id': {'$lt': doc_id}},
+    ]}
+
+
+def fetch_page(collection, query: Dict[str, Any], limit: int, since: Optional[Tuple[datetime, Any]] = None,
+               before: Optional[Tuple[datetime, Any]] = None, projection: Optional[Dict[str, Any]] = None):
+    """One keyset page, newest first, and whether more documents lie in the same direction.
+
+    since walks forward from the cursor (oldest new items first, so a client that
+    is far behind catches up page by page without gaps); before walks back.
+    Without either the newest page is returned, as before cursors existed.
+    """
+    clauses = [query]
+    if since is not None:
+        clauses.append(after_clause(*since))
+    if before is not None:
+        clauses.append(before_clause(*before))
+    full_query = clauses[0] if len(clauses) == 1 else {'$and': clauses}
+
+    sort = OLDEST_FIRST if since is not None and before is None else NEWEST_FIRST
+    docs = list(collection.find(full_query, projection).sort(sort).limit(limit + 1))
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    if sort is OLDEST_FIRST:
+        docs.reverse()
+    return docs, has_more
+
+
+def page_cursors(docs: List[Dict[str, Any]], since_token: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """next_since/next_before for a newest-first page; an empty delta keeps the caller's since cursor."""
+    return {
+        'next_since': encode_cursor(docs[0]) if docs else since_token,
+        'next_before': encode_cursor(docs[-1]) if docs else None,
+    }
+
+
+def page_etag(docs: Iterable[Dict[str, Any]], *extra: Any) -> str:
+    """Strong ETag over the page's (_id, created_at) keys plus anything else the body depends on."""
+    digest = hashlib.sha256()
+    for doc in docs:
+        digest.update(f"{doc.get('_id')}|{doc.get('created_at')}\n".encode('utf-8'))
+    digest.update(json.dumps(list(extra), default=str, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:32]
@@ -1,7 +1,21 @@
-import requests
 import datetime
 from typing import List, Dict, Optional
 
+from utils.http_client import http_client
+
+
+def calendar_window(days_back: int, days_forward: int, now: Optional[datetime.datetime] = None):
+    """from/to for the events query, widened to whole UTC days.
+
+    The URL then stays the same for the whole day, so conditional_get can send
+    the cached validators and get a 304 instead of a new body on every refresh.
+    """
+    today = (now or datetime.datetime.now(datetime.timezone.utc)).date()
+    start = today - datetime.timedelta(days=days_back)
+    end = today + datetime.timedelta(days=days_forward + 1)
+    return start.strftime("%Y-%m-%dT00:00:00.000Z"), end.strftime("%Y-%m-%dT00:00:00.000Z")
+
+
 class TradingViewHandler:
     def __init__(self):
         self.base_url = "https://economic-calendar.tradingview.com/events"
@@ -23,10 +37,8 @@ class TradingViewHandler:
         Returns:
             List of dictionaries with event details.
         """
-        today = datetime.datetime.now()
-        start_date = (today - datetime.timedelta(days=days_back)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
-        end_date = (today + datetime.timedelta(days=days_forward)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
-        
+        start_date, end_date = calendar_window(days_back, days_forward)
+
         params = {
             "from": start_date,
             "to": end_date
@@ -36,7 +48,14 @@ class TradingViewHandler:
             params["countries"] = ",".join(countries)
             
         try:
-            response = requests.get(self.base_url, headers=self.headers, params=params, timeout=10)
+            response = http_client.conditional_get(
+                self.base_url,
+                params=params,
+                headers=self.headers,
+                upstream="tradingview",
+                timeout=(3.05, 10),
+                retries=2,
+            )
             response.raise_for_status()
             
             data = response.json()
@@ -0,0 +1,203 @@
+"""Background job leases: singleton leader election and N-slot sharded consumers, renewed by one heartbeat per process."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+def lease_ids(job_name: str, slots: int = 1) -> List[str]:
+    """Singleton jobs keep the bare job name as lock id; sharded jobs use job#0..job#N-1."""
+    slots = max(1, int(slots))
+    if slots == 1:
+        return [job_name]
+    return [f'{job_name}#{slot}' for slot in range(slots)]
+
+
+class LeaseManager:
+    """Leases in the job_locks collection: {_id, owner_id, ttl_seconds, updated_at, expires_at}.
+
+    acquire() takes the first free (missing or expired) slot. Held leases are
+    renewed together by a heartbeat thread with a single update_many per tick,
+    so renew() is a local check of the last heartbeat rather than a DB write.
+    renew() is also the job's progress mark: the heartbeat only extends leases
+    whose job called it within the TTL, so a hung job thread lets its lease
+    expire and another worker takes over, as with per-job renewal.
+    Without a collection every lease is granted (single-process mode).
+    """
+
+    def __init__(self, collection=None, owner_id: Union[str, Callable[[], str]] = '',
+                 heartbeat_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.collection = collection
+        self._owner_id = owner_id
+        self.heartbeat_seconds = max(1.0, float(heartbeat_seconds))
+        self._lock = threading.Lock()
+        self._acquire_lock = threading.Lock()  # one slot per consumer thread in this process
+        self._held: Dict[str, int] = {}  # lease id -> ttl seconds
+        self._progress: Dict[str, float] = {}  # lease id -> clock() of the job's last renew()
+        self._clock = clock
+        self._lost: set = set()
+        self._heartbeat: Optional[threading.Thread] = None
+        self._heartbeats = 0
+        self._last_heartbeat_at: Optional[datetime] = None
+
+    @property
+    def owner_id(self) -> str:
+        return self._owner_id() if callable(self._owner_id) else self._owner_id
+
+    def acquire(self, job_name: str, ttl_seconds: int, slots: int = 1) -> Optional[str]:
+        """Return the acquired lease id, or None when every slot is held by live owners."""
+        ttl_seconds = max(int(ttl_seconds or 60), 30)
+        with self._acquire_lock:
+            with self._lock:
+                held_here = {lease_id for lease_id in self._held if lease_id not in self._lost}
+
+            for lease_id in lease_ids(job_name, slots):
+                if lease_id in held_here:
+                    continue
+                if self._try_acquire(lease_id, ttl_seconds):
+                    with self._lock:
+                        self._held[lease_id] = ttl_seconds
+                        self._progress[lease_id] = self._clock()
+                        self._lost.discard(lease_id)
+                    self._ensure_heartbeat()
+                    return lease_id
+        return None
+
+    def _try_acquire(self, lease_id: str, ttl_seconds: int) -> bool:
+        if self.collection is None:
+            return True
+
+        owner_id = self.owner_id
+        now = datetime.now(timezone.utc)
+        try:
+            doc = self.collection.find_one_and_update(
+                {
+                    '_id': lease_id,
+                    '$or': [
+                        {'expires_at': {'$lte': now}},
+                        {'owner_id': owner_id},
+                    ],
+                },
+                {
+                    '$set': {
+                        'owner_id': owner_id,
+                        'ttl_seconds': ttl_seconds,
+                        'updated_at': now,
+                        'expires_at': now + timedelta(seconds=ttl_seconds),
+                    },
+                    '$setOnInsert': {'created_at': now},
+                },
+                upsert=True,
+                return_document=True,  # ReturnDocument.AFTER
+            )
+            return bool(doc and doc.get('owner_id') == owner_id)
+        except Exception as e:
+            if getattr(e, 'code', None) == 11000:
+                # Upsert raced with a live owner's document.
+                return False
+            print(f"[WARN] Lease acquire fallback for {lease_id}: {e}", flush=True)
+            return True
+
+    def _stalled(self, lease_id: str, now: float) -> bool:
+        return now - self._progress.get(lease_id, now) > self._held[lease_id]
+
+    def renew(self, lease_id: str) -> bool:
+        """True while the lease is held, and records progress; the heartbeat does the actual renewal.
+
+        False once the job went a whole TTL without calling renew(): the heartbeat
+        stopped extending the lease, so another worker may already hold it.
+        """
+        with self._lock:
+            if lease_id not in self._held or lease_id in self._lost:
+                return False
+            now = self._clock()
+            if self._stalled(lease_id, now):
+                return False
+            self._progress[lease_id] = now
+            return True
+
+    def release(self, lease_id: str) -> None:
+        with self._lock:
+            self._held.pop(lease_id, None)
+            self._progress.pop(lease_id, None)
+            self._lost.discard(lease_id)
+        if self.collection is None:
+            return
+        try:
+            self.collection.delete_one({'_id': lease_id, 'owner_id': self.owner_id})
+        except Exception as e:
+            print(f"[WARN] Lease release failed for {lease_id}: {e}", flush=True)
+
+    def heartbeat(self) -> None:
+        """Extend every lease whose job made progress within its TTL with one write; mark the ones another owner took."""
+        with self._lock:
+            now = self._clock()
+            held = {
+                lease_id: ttl for lease_id, ttl in self._held.items()
+                if lease_id not in self._lost and not self._stalled(lease_id, now)
+            }
+        if not held or self.collection is None:
+            return
+
+        owner_id = self.owner_id
+        try:
+            # expires_at = $$NOW + ttl_seconds, computed server-side so differing TTLs share one update.
+            result = self.collection.update_many(
+                {'_id': {'$in': list(held)}, 'owner_id': owner_id},
+                [{'$set': {
+                    'updated_at': '$$NOW',
+                    'expires_at': {'$add': ['$$NOW', {'$multiply': [{'$ifNull': ['$ttl_seconds', 300]}, 1000]}]},
+                }}],
+            )
+            lost = set()
+            if result.matched_count < len(held):
+                still_owned = {
+                    doc['_id'] for doc in self.collection.find(
+                        {'_id': {'$in': list(held)}, 'owner_id': owner_id}, {'_id': 1}
+                    )
+                }
+                lost = set(held) - still_owned
+        except Exception as e:
+            print(f"[WARN] Lease heartbeat failed: {e}", flush=True)
+            return
+
+        with self._lock:
+            self._heartbeats += 1
+            self._last_heartbeat_at = datetime.now(timezone.utc)
+            self._lost.update(lease_id for lease_id in lost if lease_id in self._held)
+        for lease_id in sorted(lost):
+            print(f"[WARN] Lease lost: {lease_id}", flush=True)
+
+    def _ensure_heartbeat(self) -> None:
+        with self._lock:
+            if self._heartbeat is not None and self._heartbeat.is_alive():
+                return
+            self._heartbeat = threading.Thread(target=self._heartbeat_loop, name='lease-heartbeat', daemon=True)
+            self._heartbeat.start()
+
+    def _heartbeat_loop(self) -> None:
+        while True:
+            with self._lock:
+                shortest_ttl = min(self._held.values(), default=self.heartbeat_seconds * 3)
+            # At least three heartbeats per TTL so one slow write does not expire a lease.
+            time.sleep(min(self.heartbeat_seconds, shortest_ttl / 3))
+            with self._lock:
+                if not self._held:
+                    self._heartbeat = None
+                    return
+            self.heartbeat()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            return {
+                'owner_id': self.owner_id,
+                'held': sorted(lease_id for lease_id in self._held if lease_id not in self._lost),
+                'lost': sorted(self._lost),
+                'stalled': sorted(lease_id for lease_id in self._held if self._stalled(lease_id, now)),
+                'heartbeats': self._heartbeats,
+                'last_heartbeat_at': self._last_heartbeat_at.isoformat() if self._last_heartbeat_at else None,
+            }
@@ -8,8 +8,7 @@ an HTTP listener.
 import signal
 import time
 
-# Import side effects initialize background workers depending on APP_PROCESS_ROLE.
-import app as backend_app  # noqa: F401
+RUNTIME_REPORT_INTERVAL_SECONDS = 60
 
 _running = True
 
@@ -19,11 +18,26 @@ def _stop(_signum, _frame):
     _running = False
 
 
-signal.signal(signal.SIGTERM, _stop)
-signal.signal(signal.SIGINT, _stop)
+def main():
+    # Imported here, not at module level: process pool children started with
+    # spawn/forkserver re-import this script as __mp_main__ and must not boot the app.
+    # Import side effects initialize background workers depending on APP_PROCESS_ROLE.
+    import app as backend_app
 
-print("[INFO] Worker process started and waiting for background jobs", flush=True)
-while _running:
-    time.sleep(5)
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
 
-print("[INFO] Worker process shutting down", flush=True)
+    print("[INFO] Worker process started and waiting for background jobs", flush=True)
+    last_runtime_report = time.monotonic()
+    while _running:
+        time.sleep(5)
+        if time.monotonic() - last_runtime_report >= RUNTIME_REPORT_INTERVAL_SECONDS:
+            # Memory grows as jobs lazily import their stacks; keep the report current.
+            backend_app.publish_runtime_report()
+            last_runtime_report = time.monotonic()
+
+    print("[INFO] Worker process shutting down", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Throughput benchmark for the Expo push sender against a local Expo stand-in.
+
+    python tests/expo_push_benchmark.py --tokens 100000 --latency-ms 20 --in-flight 1 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import sys
+import threading
+import time
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.expo_push_sender import ExpoPushSender  # noqa: E402
+from utils.http_client import HttpClient  # noqa: E402
+
+
+class _ExpoStandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like exp.host
+    latency_seconds = 0.02
+
+    def log_message(self, *_args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(_ExpoStandIn.latency_seconds)
+        if self.path == "/send":
+            data = [{"status": "ok", "id": f"ticket-{message['to']}"} for message in payload]
+        else:
+            data = {ticket_id: {"status": "ok"} for ticket_id in payload["ids"]}
+        body = json.dumps({"data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _run(base_url: str, tokens: int, in_flight: int):
+    sender = ExpoPushSender(
+        client=HttpClient(pool_maxsize=max(16, in_flight)),
+        push_url=f"{base_url}/send",
+        receipts_url=f"{base_url}/getReceipts",
+        max_in_flight=in_flight,
+    )
+    messages = [{"to": f"ExponentPushToken[{i:06d}]", "title": "bench", "body": "bench"} for i in range(tokens)]
+
+    started = time.perf_counter()
+    outcomes = sender.send(messages)
+    send_seconds = time.perf_counter() - started
+    ok = sum(1 for outcome in outcomes if outcome["status"] == "ok")
+
+    ticket_ids = [outcome["ticket_id"] for outcome in outcomes if outcome["ticket_id"]]
+    started = time.perf_counter()
+    receipts = sender.get_receipts(ticket_ids)
+    receipt_seconds = time.perf_counter() - started
+    return ok, send_seconds, len(receipts), receipt_seconds
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated Expo response time per request")
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    _ExpoStandIn.latency_seconds = args.latency_ms / 1000.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ExpoStandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"tokens={args.tokens} simulated latency={args.latency_ms:g}ms")
+    print(f"{'in_flight':>9} {'sent':>8} {'send_s':>8} {'msg/s':>9} {'receipts':>9} {'receipt_s':>9}")
+    try:
+        for in_flight in args.in_flight:
+            ok, send_seconds, receipt_count, receipt_seconds = _run(base_url, args.tokens, in_flight)
+            if ok != args.tokens or receipt_count != args.tokens:
+                raise SystemExit(f"Benchmark failed: sent={ok} receipts={receipt_count} expected={args.tokens}")
+            print(f"{in_flight:>9} {ok:>8} {send_seconds:>8.2f} {ok / send_seconds:>9.0f} "
+                  f"{receipt_count:>9} {receipt_seconds:>9.2f}")
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
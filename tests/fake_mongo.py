@@ -0,0 +1,453 @@
+"""In-memory stand-in for the pymongo Collection calls the backend utilities make.
+
+Shared by the behavior tests so query and update semantics live in one place
+and follow MongoDB's rules (missing fields, $ne on absent values, upsert
+seeding, duplicate keys on a lost upsert race) instead of each test file
+re-implementing the handful of operators its module happens to use.
+aggregate() is not emulated; tests that need it subclass FakeCollection.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+class DuplicateKeyError(Exception):
+    code = 11000
+
+
+class BulkWriteError(Exception):
+    code = 65
+
+    def __init__(self, write_errors: List[Dict[str, Any]]):
+        super().__init__(f"{len(write_errors)} write error(s)")
+        self.details = {"writeErrors": write_errors}
+
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int, modified_count: int, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+
+
+# ---- values and paths ----
+
+def _comparable(value: Any) -> Any:
+    # BSON dates carry no zone: naive datetimes are UTC.
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _get(doc: Any, path: str) -> Any:
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return _MISSING
+        doc = doc[part]
+    return doc
+
+
+def _parent(doc: Dict[str, Any], path: str) -> Tuple[Dict[str, Any], str]:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    return doc, parts[-1]
+
+
+def _set(doc: Dict[str, Any], path: str, value: Any) -> None:
+    target, key = _parent(doc, path)
+    target[key] = value
+
+
+def _unset(doc: Dict[str, Any], path: str) -> None:
+    target, key = _parent(doc, path)
+    target.pop(key, None)
+
+
+_TYPE_NAMES = {
+    "object": dict, "array": list, "string": str, "bool": bool, "date": datetime,
+    "double": float, "int": int, "long": int, "number": (int, float), "null": type(None),
+}
+
+
+def _compare(value: Any, op: str, arg: Any) -> bool:
+    if value is _MISSING or value is None or arg is None:
+        return False
+    value, arg = _comparable(value), _comparable(arg)
+    try:
+        return {"$gt": value > arg, "$gte": value >= arg, "$lt": value < arg, "$lte": value <= arg}[op]
+    except TypeError:  # different BSON types never compare
+        return False
+
+
+def _equals(value: Any, cond: Any) -> bool:
+    if value is _MISSING:
+        return cond is None
+    if isinstance(value, list) and not isinstance(cond, list):
+        return any(_comparable(item) == _comparable(cond) for item in value)
+    return _comparable(value) == _comparable(cond)
+
+
+def _match_operator(value: Any, op: str, arg: Any) -> bool:
+    if op == "$eq":
+        return _equals(value, arg)
+    if op == "$ne":
+        return not _equals(value, arg)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        if isinstance(value, list):
+            return any(_compare(item, op, arg) for item in value)
+        return _compare(value, op, arg)
+    if op == "$in":
+        return any(_equals(value, item) for item in arg)
+    if op == "$nin":
+        return not any(_equals(value, item) for item in arg)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if op == "$type":
+        return value is not _MISSING and isinstance(value, _TYPE_NAMES[arg]) and not (
+            arg in ("int", "long", "number", "double") and isinstance(value, bool)
+        )
+    raise NotImplementedError(f"query operator {op}")
+
+
+def matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    for key, cond in (query or {}).items():
+        if key == "$and":
+            if not all(matches(doc, q) for q in cond):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, q) for q in cond):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, q) for q in cond):
+                return False
+        elif isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            value = _get(doc, key)
+            if not all(_match_operator(value, op, arg) for op, arg in cond.items()):
+                return False
+        elif not _equals(_get(doc, key), cond):
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        projected = {}
+        for path in include:
+            value = _get(doc, path)
+            if value is not _MISSING:
+                _set(projected, path, value)
+        if projection.get("_id", 1) and "_id" in doc:
+            projected["_id"] = doc["_id"]
+        return projected
+    for path, flag in projection.items():
+        if not flag:
+            _unset(doc, path)
+    return doc
+
+
+def _sort_key(field: str):
+    def key(doc):
+        value = _comparable(_get(doc, field))
+        # Missing/null sort first, like MongoDB.
+        return (0, "") if value is _MISSING or value is None else (1, value)
+    return key
+
+
+def _sort(docs: List[Dict[str, Any]], spec) -> List[Dict[str, Any]]:
+    for field, direction in reversed(list(spec or [])):
+        docs = sorted(docs, key=_sort_key(field), reverse=direction < 0)
+    return docs
+
+
+def _evaluate(expr: Any, doc: Dict[str, Any], now: datetime) -> Any:
+    """The aggregation expressions used by pipeline-style updates."""
+    if isinstance(expr, str):
+        if expr == "$$NOW":
+            return now
+        if expr.startswith("$"):
+            value = _get(doc, expr[1:])
+            return None if value is _MISSING else value
+        return expr
+    if isinstance(expr, dict) and len(expr) == 1:
+        (op, args), = expr.items()
+        values = [_evaluate(arg, doc, now) for arg in (args if isinstance(args, list) else [args])]
+        if op == "$ifNull":
+            return next((value for value in values if value is not None), None)
+        if op == "$multiply":
+            result = 1
+            for value in values:
+                result *= value
+            return result
+        if op == "$add":
+            dates = [value for value in values if isinstance(value, datetime)]
+            millis = sum(value for value in values if not isinstance(value, datetime))
+            return dates[0] + timedelta(milliseconds=millis) if dates else millis
+        raise NotImplementedError(f"expression {op}")
+    return expr
+
+
+def _apply_update(doc: Dict[str, Any], update, inserting: bool) -> None:
+    if isinstance(update, list):
+        now = datetime.now(timezone.utc)
+        for stage in update:
+            for path, expr in stage["$set"].items():
+                _set(doc, path, _evaluate(expr, doc, now))
+        return
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for path, value in fields.items():
+            current = _get(doc, path)
+            if op in ("$set", "$setOnInsert"):
+                _set(doc, path, copy.deepcopy(value))
+            elif op == "$unset":
+                _unset(doc, path)
+            elif op == "$inc":
+                _set(doc, path, (0 if current is _MISSING else current) + value)
+            elif op in ("$max", "$min"):
+                pick = max if op == "$max" else min
+                if current is _MISSING or current is None:
+                    _set(doc, path, value)
+                else:
+                    _set(doc, path, pick(current, value, key=_comparable))
+            elif op == "$push":
+                items = list(value["$each"]) if isinstance(value, dict) and "$each" in value else [value]
+                pushed = ([] if current is _MISSING else list(current)) + items
+                if isinstance(value, dict) and "$slice" in value:
+                    limit = value["$slice"]
+                    pushed = pushed[limit:] if limit < 0 else pushed[:limit]
+                _set(doc, path, pushed)
+            elif op == "$addToSet":
+                items = list(value["$each"]) if isinstance(value, dict) and "$each" in value else [value]
+                existing = [] if current is _MISSING else list(current)
+                _set(doc, path, existing + [item for item in items if item not in existing])
+            else:
+                raise NotImplementedError(f"update operator {op}")
+
+
+def _upsert_seed(query: Dict[str, Any]) -> Dict[str, Any]:
+    seed: Dict[str, Any] = {}
+    for key, cond in query.items():
+        if key.startswith("$"):
+            continue
+        if isinstance(cond, dict) and any(k.startswith("$") for k in cond):
+            if "$eq" in cond:
+                _set(seed, key, cond["$eq"])
+            continue
+        _set(seed, key, cond)
+    return seed
+
+
+# ---- cursor and collection ----
+
+class FakeCursor:
+    """Lazily sorted/skipped/limited like a pymongo cursor, whatever order the calls come in."""
+
+    def __init__(self, docs: List[Dict[str, Any]], projection=None):
+        self._docs = docs
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = [(key_or_list, direction or 1)] if isinstance(key_or_list, str) else list(key_or_list)
+        return self
+
+    def skip(self, count: int):
+        self._skip = int(count)
+        return self
+
+    def limit(self, count: int):
+        self._limit = int(count)
+        return self
+
+    def batch_size(self, _count: int):
+        return self
+
+    def _results(self) -> List[Dict[str, Any]]:
+        docs = _sort(self._docs, self._sort)[self._skip:]
+        if self._limit:
+            docs = docs[:abs(self._limit)]
+        return [_project(doc, self._projection) for doc in docs]
+
+    def __iter__(self):
+        return iter(self._results())
+
+
+class FakeCollection:
+    """Dict-backed collection: docs maps _id to the stored document.
+
+    calls counts every method invocation by name. Assign an exception to
+    errors[<method name>] to make that method raise it (e.g. a write timeout).
+    """
+
+    def __init__(self, docs: Iterable[Dict[str, Any]] = ()):
+        self.docs: Dict[Any, Dict[str, Any]] = {}
+        self.calls: Counter = Counter()
+        self.errors: Dict[str, Exception] = {}
+        self.indexes: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        for doc in docs:
+            self.docs[doc["_id"]] = copy.deepcopy(doc)
+
+    def _call(self, name: str) -> None:
+        self.calls[name] += 1
+        if name in self.errors:
+            raise self.errors[name]
+
+    def _matching(self, query, sort=None) -> List[Dict[str, Any]]:
+        return _sort([doc for doc in self.docs.values() if matches(doc, query)], sort)
+
+    # ---- reads ----
+
+    def find(self, query=None, projection=None):
+        self._call("find")
+        with self._lock:
+            return FakeCursor(self._matching(query), projection)
+
+    def find_one(self, query=None, projection=None, sort=None):
+        self._call("find_one")
+        with self._lock:
+            found = self._matching(query, sort)
+            return _project(found[0], projection) if found else None
+
+    def count_documents(self, query):
+        self._call("count_documents")
+        with self._lock:
+            return len(self._matching(query))
+
+    def aggregate(self, pipeline, **kwargs):
+        raise NotImplementedError("subclass FakeCollection to answer a specific pipeline")
+
+    def options(self):
+        return {}
+
+    def create_index(self, keys, name=None, **kwargs):
+        self._call("create_index")
+        name = name or "_".join(f"{k}_{d}" for k, d in ([(keys, 1)] if isinstance(keys, str) else keys))
+        self.indexes[name] = {"key": keys, **kwargs}
+        return name
+
+    # ---- writes ----
+
+    def _insert(self, doc: Dict[str, Any]) -> Any:
+        doc.setdefault("_id", uuid.uuid4().hex)  # pymongo also sets _id on the caller's dict
+        doc = copy.deepcopy(doc)
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError(f"duplicate key: {doc['_id']!r}")
+        self.docs[doc["_id"]] = doc
+        return doc["_id"]
+
+    def insert_one(self, doc):
+        self._call("insert_one")
+        with self._lock:
+            return InsertOneResult(self._insert(doc))
+
+    def insert_many(self, docs, ordered=True):
+        self._call("insert_many")
+        errors = []
+        with self._lock:
+            for index, doc in enumerate(docs):
+                try:
+                    self._insert(doc)
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": DuplicateKeyError.code, "errmsg": str(e)})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError(errors)
+
+    def _update(self, query, update, upsert: bool, many: bool, sort=None):
+        found = self._matching(query, sort)
+        if not found:
+            if not upsert:
+                return UpdateResult(0, 0), None
+            doc = _upsert_seed(query)
+            _apply_update(doc, update, inserting=True)
+            # An existing _id that did not match the filter makes the upsert's insert collide.
+            return UpdateResult(0, 0, self._insert(doc)), self.docs[doc["_id"]]
+        modified = 0
+        for doc in found if many else found[:1]:
+            before = copy.deepcopy(doc)
+            _apply_update(doc, update, inserting=False)
+            modified += doc != before
+        return UpdateResult(len(found) if many else 1, modified), found[0]
+
+    def update_one(self, query, update, upsert=False, **kwargs):
+        self._call("update_one")
+        with self._lock:
+            return self._update(query, update, upsert, many=False)[0]
+
+    def update_many(self, query, update, upsert=False, **kwargs):
+        self._call("update_many")
+        with self._lock:
+            return self._update(query, update, upsert, many=True)[0]
+
+    def find_one_and_update(self, query, update, projection=None, sort=None, upsert=False,
+                            return_document=False, **kwargs):
+        """return_document=True is ReturnDocument.AFTER."""
+        self._call("find_one_and_update")
+        with self._lock:
+            found = self._matching(query, sort)
+            before = copy.deepcopy(found[0]) if found else None
+            _result, doc = self._update(query, update, upsert, many=False, sort=sort)
+            if doc is None:
+                return None
+            if not return_document:
+                return _project(before, projection) if before is not None else None
+            return _project(doc, projection)
+
+    def replace_one(self, query, replacement, upsert=False):
+        self._call("replace_one")
+        with self._lock:
+            found = self._matching(query)
+            if not found:
+                if not upsert:
+                    return UpdateResult(0, 0)
+                doc = {**_upsert_seed(query), **copy.deepcopy(replacement)}
+                return UpdateResult(0, 0, self._insert(doc))
+            doc_id = found[0]["_id"]
+            self.docs[doc_id] = {**copy.deepcopy(replacement), "_id": doc_id}
+            return UpdateResult(1, int(found[0] != self.docs[doc_id]))
+
+    def delete_one(self, query):
+        self._call("delete_one")
+        with self._lock:
+            found = self._matching(query)
+            if found:
+                del self.docs[found[0]["_id"]]
+            return DeleteResult(len(found[:1]))
+
+    def delete_many(self, query):
+        self._call("delete_many")
+        with self._lock:
+            found = self._matching(query)
+            for doc in found:
+                del self.docs[doc["_id"]]
+            return DeleteResult(len(found))
@@ -0,0 +1,118 @@
+"""Signal storage and read latency with embedded provenance vs model_runs references.
+
+    python tests/model_runs_benchmark.py --signals 20000
+    python tests/model_runs_benchmark.py --signals 20000 --mongo-uri mongodb://localhost:27017
+
+Without --mongo-uri only BSON document sizes are compared. With it, a scratch
+database is filled, measured (collStats, history query latency), migrated and
+measured again, then dropped.
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import statistics
+import sys
+import time
+
+import bson
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.model_runs import ModelRunRegistry  # noqa: E402
+
+
+def _signal(i: int):
+    """A document shaped like continuous_signal_generator's inserts (one model run per 500 signals)."""
+    run_id = f"run-{i // 500:04d}"
+    return {
+        "pair": "EUR_USD",
+        "signal": "BUY" if i % 3 else "SELL",
+        "confidence": 90.0 + (i % 90) / 10,
+        "entry_price": 1.08412, "stop_loss": 1.08112, "take_profit": 1.09012,
+        "sl_pips": 30.0, "tp_pips": 60.0, "risk_reward": 2.0,
+        "model_probabilities": {m: {"SELL": 3.1, "HOLD": 4.2, "BUY": 92.7} for m in ("lightgbm", "xgboost", "catboost")},
+        "model_version": "gbdt-multitf-v3",
+        "model_provenance": {
+            "schema_version": 2, "model_version": "gbdt-multitf-v3", "run_id": run_id, "seed": 42,
+            "dataset_hash": "9f2c1e7d" * 8, "commit_id": "4be9a0c71d2f", "feature_schema_hash": "b71d0e44" * 8,
+            "model_file_sha256": "e3b0c442" * 8, "trained_at_utc": "2025-12-28T04:00:00Z",
+        },
+        "run_id": run_id,
+        "models_agree": True, "atr_pips": 11.4, "reason": None, "source": "auto", "status": "active",
+        "created_at": datetime(2026, 1, 5, tzinfo=timezone.utc) - timedelta(minutes=i),
+    }
+
+
+def _offline(count: int) -> None:
+    docs = [_signal(i) for i in range(count)]
+    before = sum(len(bson.encode(doc)) for doc in docs)
+    runs = {}
+    for doc in docs:
+        provenance = doc.pop("model_provenance")
+        runs.setdefault(provenance["run_id"], provenance)
+        doc["provenance_ref"] = "0" * 32
+    after = sum(len(bson.encode(doc)) for doc in docs)
+    runs_bytes = sum(len(bson.encode({"_id": "0" * 32, "provenance": p})) for p in runs.values())
+    print(f"signals={count} runs={len(runs)}")
+    print(f"avg signal BSON: {before / count:.0f} -> {after / count:.0f} bytes")
+    print(f"signals total:   {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB (+ model_runs {runs_bytes / 1e3:.1f} kB)")
+
+
+def _history_latency_ms(signals, registry, rounds: int = 50):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        rows = list(signals.find({"pair": {"$in": ["EUR_USD", "EUR/USD"]}, "source": {"$in": ["auto", None]}})
+                    .sort([("created_at", -1), ("_id", -1)]).limit(200))
+        registry.attach(rows)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _live(count: int, mongo_uri: str) -> None:
+    from pymongo import MongoClient
+
+    client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+    db = client[f"predictrix_bench_{int(time.time())}"]
+    try:
+        signals = db["signals"]
+        signals.create_index([("pair", 1), ("created_at", -1), ("_id", -1)])
+        for start in range(0, count, 1000):
+            signals.insert_many([_signal(i) for i in range(start, min(count, start + 1000))])
+        registry = ModelRunRegistry(db["model_runs"])
+
+        def report(label):
+            stats = db.command("collStats", "signals")
+            latency = _history_latency_ms(signals, registry)
+            print(f"{label:<7} size={stats['size'] / 1e6:.2f}MB avgObjSize={stats['avgObjSize']:.0f}B "
+                  f"storage={stats['storageSize'] / 1e6:.2f}MB history(200) p50={latency:.2f}ms")
+
+        report("before")
+        started = time.perf_counter()
+        result = registry.migrate(signals)
+        print(f"migrate: {result} in {time.perf_counter() - started:.1f}s")
+        try:
+            db.command("compact", "signals")  # reclaim freed space so storageSize reflects the change
+        except Exception as e:
+            print(f"compact skipped: {e}")
+        report("after")
+    finally:
+        client.drop_database(db.name)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signals", type=int, default=20000)
+    parser.add_argument("--mongo-uri", default=None)
+    args = parser.parse_args()
+    _offline(args.signals)
+    if args.mongo_uri:
+        _live(args.signals, args.mongo_uri)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+"""Bytes per /signals/history response: full documents vs projections vs compact format, plain and gzipped.
+
+    python tests/signal_payload_benchmark.py --rows 50 200
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+import gzip
+import json
+from pathlib import Path
+import sys
+import time
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils import fast_json  # noqa: E402
+from utils.signal_payloads import compact_signals, parse_fields  # noqa: E402
+
+LEAN_FIELDS = "pair,signal,confidence,entry_price,stop_loss,take_profit,run_id"
+
+
+def _signal(i: int, run_id: str):
+    """A document shaped like continuous_signal_generator's inserts."""
+    created_at = datetime(2026, 1, 5, tzinfo=timezone.utc) - timedelta(minutes=7 * i)
+    return {
+        "_id": f"65a1f0c2e4b0{i:012x}",
+        "pair": "EUR_USD",
+        "signal": "BUY" if i % 3 else "SELL",
+        "confidence": 90.0 + (i % 90) / 10,
+        "entry_price": 1.08412 + i / 1e5,
+        "stop_loss": 1.08112 + i / 1e5,
+        "take_profit": 1.09012 + i / 1e5,
+        "sl_pips": 30.0,
+        "tp_pips": 60.0,
+        "risk_reward": 2.0,
+        "model_probabilities": {
+            name: {"SELL": 3.1 + i % 5, "HOLD": 4.2, "BUY": 92.7 - i % 5}
+            for name in ("lightgbm", "xgboost", "catboost")
+        },
+        "model_version": "gbdt-multitf-v3",
+        "model_provenance": {
+            "schema_version": 2,
+            "model_version": "gbdt-multitf-v3",
+            "run_id": run_id,
+            "seed": 42,
+            "dataset_hash": "9f2c1e7d" * 8,
+            "commit_id": "4be9a0c71d2f",
+            "feature_schema_hash": "b71d0e44" * 8,
+            "model_file_sha256": "e3b0c442" * 8,
+            "trained_at_utc": "2025-12-28T04:00:00Z",
+        },
+        "run_id": run_id,
+        "models_agree": True,
+        "atr_pips": 11.4,
+        "reason": None,
+        "source": "auto",
+        "created_at": created_at.isoformat(),
+        "status": "active",
+    }
+
+
+def _response(rows, compact=False):
+    rows = [dict(row) for row in rows]
+    if not compact:
+        return {"success": True, "count": len(rows), "signals": rows}
+    rows, provenance = compact_signals(rows)
+    return {"success": True, "count": len(rows), "signals": rows, "format": "compact", "provenance": provenance}
+
+
+def _project(rows, fields):
+    projection = parse_fields(fields)
+    return [{k: v for k, v in row.items() if k in projection} for row in rows]
+
+
+def _encode_seconds(encode, payload, repeat=200):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encode(payload)
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 200])
+    args = parser.parse_args()
+
+    def stdlib(payload):  # what jsonify produced before (sorted keys, compact separators)
+        return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    print(f"encoder={fast_json.encoder_name()}")
+    print(f"{'rows':>5} {'variant':<22} {'bytes':>8} {'gzip':>7} {'stdlib_ms':>9} {'fast_ms':>8}")
+    for count in args.rows:
+        rows = [_signal(i, run_id=f"run-{i // 100}") for i in range(count)]
+        variants = [
+            ("full (before)", _response(rows)),
+            ("compact", _response(rows, compact=True)),
+            ("fields=lean", _response(_project(rows, LEAN_FIELDS))),
+            ("fields=lean compact", _response(_project(rows, LEAN_FIELDS), compact=True)),
+        ]
+        for name, payload in variants:
+            plain = fast_json.dumps(payload)
+            compressed, _ = fast_json.maybe_gzip(plain, "gzip", min_bytes=0)
+            print(f"{count:>5} {name:<22} {len(stdlib(payload)):>8} {len(compressed):>7} "
+                  f"{_encode_seconds(stdlib, payload) * 1000:>9.3f} {_encode_seconds(fast_json.dumps, payload) * 1000:>8.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import threading
+import time
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.market_analyst import MarketAnalyst  # noqa: E402
+
+
+def _analyst(gemini, pollinations):
+    analyst = MarketAnalyst()
+    analyst.allow_external_fallback = True
+    analyst.HEDGE_ENABLED = True
+    analyst.HEDGE_MIN_SECONDS = 0.05
+    analyst.HEDGE_MAX_SECONDS = 1.0
+    analyst.HEDGE_DEFAULT_SECONDS = 0.2
+    analyst._ensure_gemini = lambda: True
+    analyst._call_gemini = gemini
+    analyst._call_pollinations = pollinations
+    return analyst
+
+
+class AIHedgingBehaviorTest(unittest.TestCase):
+    def test_fast_primary_does_not_fire_fallback(self):
+        fallback_calls = []
+        analyst = _analyst(
+            gemini=lambda prompt, force_json, model, served: "primary",
+            pollinations=lambda *args, **kwargs: fallback_calls.append(1) or "fallback",
+        )
+
+        self.assertEqual(analyst._call_ai_uncached("prompt"), "primary")
+        self.assertEqual(fallback_calls, [])
+        self.assertNotIn("hedged", analyst.ai_provider_stats()["hedge"])
+
+    def test_slow_primary_is_hedged_and_fallback_wins(self):
+        release = threading.Event()
+
+        def slow_gemini(prompt, force_json, model, served):
+            release.wait(2)
+            return "primary"
+
+        analyst = _analyst(gemini=slow_gemini, pollinations=lambda *args, **kwargs: "fallback")
+        started = time.monotonic()
+        try:
+            self.assertEqual(analyst._call_ai_uncached("prompt"), "fallback")
+        finally:
+            release.set()
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        hedge = analyst.ai_provider_stats()["hedge"]
+        self.assertEqual(hedge["hedged"], 1)
+        self.assertEqual(hedge["fallback_wins"], 1)
+
+    def test_invalid_fallback_lets_slow_primary_win(self):
+        def slow_gemini(prompt, force_json, model, served):
+            time.sleep(0.4)
+            return "primary"
+
+        analyst = _analyst(gemini=slow_gemini, pollinations=lambda *args, **kwargs: None)
+        self.assertEqual(analyst._call_ai_uncached("prompt"), "primary")
+        self.assertEqual(analyst.ai_provider_stats()["hedge"]["primary_wins"], 1)
+
+    def test_unparseable_fallback_does_not_beat_valid_json_primary(self):
+        def slow_gemini(prompt, force_json, model, served):
+            time.sleep(0.4)
+            return '{"signal": "BUY"}'
+
+        analyst = _analyst(gemini=slow_gemini, pollinations=lambda *args, **kwargs: "Sure! Here is the JSON")
+        self.assertEqual(analyst._call_ai_uncached("prompt", force_json=True), '{"signal": "BUY"}')
+        self.assertEqual(analyst.ai_provider_stats()["hedge"]["primary_wins"], 1)
+
+    def test_primary_failing_fast_falls_back_sequentially(self):
+        analyst = _analyst(
+            gemini=lambda prompt, force_json, model, served: None,
+            pollinations=lambda *args, **kwargs: "fallback",
+        )
+        self.assertEqual(analyst._call_ai_uncached("prompt"), "fallback")
+        self.assertNotIn("hedged", analyst.ai_provider_stats()["hedge"])
+
+    def test_cache_stores_answers_under_the_model_that_served_them(self):
+        def downgraded_gemini(prompt, force_json, model, served):
+            served["model"] = analyst.LITE_MODEL  # Flash exhausted → Lite answered
+            return "lite answer"
+
+        analyst = _analyst(gemini=downgraded_gemini, pollinations=lambda *args, **kwargs: "fallback")
+        analyst.HEDGE_ENABLED = False
+        self.assertEqual(analyst._call_ai("prompt", model=analyst.FLASH_MODEL), "lite answer")
+
+        analyst._call_gemini = lambda prompt, force_json, model, served: None
+        self.assertEqual(analyst._call_ai("prompt", model=analyst.FLASH_MODEL), "fallback")
+        self.assertEqual(analyst._call_ai("prompt", model=analyst.LITE_MODEL), "lite answer")
+        self.assertEqual(analyst.llm_cache.stats()["by_prompt_type"]["generic"]["stores"], 1)
+
+    def test_hedge_delay_tracks_primary_latency_percentile(self):
+        analyst = _analyst(gemini=None, pollinations=None)
+        self.assertEqual(analyst._hedge_delay_seconds(), 0.2)
+
+        for seconds in (0.1, 0.2, 0.3, 0.4, 0.5):
+            analyst._provider_latency["gemini"].observe(seconds)
+        analyst.HEDGE_PERCENTILE = 80
+        self.assertAlmostEqual(analyst._hedge_delay_seconds(), 0.4)
+
+        analyst._provider_latency["gemini"].observe(30)
+        analyst.HEDGE_PERCENTILE = 99
+        self.assertEqual(analyst._hedge_delay_seconds(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
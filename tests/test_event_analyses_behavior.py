@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from backend.utils.event_analyses import EventAnalysisStore, SingleFlight, event_analysis_key
+from tests.fake_mongo import FakeCollection
+
+
+class EventAnalysesBehaviorTest(unittest.TestCase):
+    def test_key_matches_raw_and_formatted_event(self):
+        raw = {"event_name": "Nonfarm Payrolls", "currency": "USD", "date": "2026-05-08T12:30:00.000Z",
+               "actual": "", "forecast": "180K"}
+        formatted = {"title": "Nonfarm Payrolls", "date": "2026-05-08 12:30", "actual": "", "forecast": "180K",
+                     "raw": raw}
+        self.assertEqual(event_analysis_key(formatted), event_analysis_key({**raw, "title": "Nonfarm Payrolls"}))
+        self.assertNotEqual(event_analysis_key(formatted), event_analysis_key({**formatted, "actual": "250K"}))
+
+    def test_store_keeps_only_the_keyed_event_fields(self):
+        store = EventAnalysisStore(FakeCollection())
+        event = {"title": "USD  - CPI", "currency": "USD", "date": "2026-05-12", "forecast": "0.3%",
+                 "actual": "x" * 5000, "blob": "y" * 100000, "nested": {"any": "thing"}}
+
+        store.get_or_generate(event_analysis_key(event), lambda: "text", event=event)
+
+        stored = store.collection.docs[event_analysis_key(event)]["event"]
+        self.assertEqual(set(stored), {"title", "currency", "date", "actual", "forecast"})
+        self.assertEqual((stored["title"], stored["forecast"], len(stored["actual"])), ("usd - cpi", "0.3%", 200))
+
+    def test_single_flight_shares_one_call(self):
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def _slow():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return "result"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", _slow))) for _ in range(5)]
+        threads[0].start()
+        started.wait(2)
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 5)
+
+    def test_get_or_generate_stores_valid_and_skips_invalid(self):
+        store = EventAnalysisStore(FakeCollection())
+        analysis, cached = store.get_or_generate("a", lambda: "text")
+        self.assertEqual((analysis, cached), ("text", False))
+        self.assertEqual(store.get_or_generate("a", lambda: "other"), ("text", True))
+
+        analysis, cached = store.get_or_generate("b", lambda: "failed", is_valid=lambda text: text != "failed")
+        self.assertEqual((analysis, cached), ("failed", False))
+        self.assertIsNone(store.get("b"))
+        self.assertNotIn("b", store.collection.docs)
+
+    def test_waits_for_other_process_claim(self):
+        collection = FakeCollection()
+        other_process = EventAnalysisStore(collection)
+        self.assertTrue(other_process._claim("k"))
+
+        def _finish():
+            time.sleep(0.1)
+            other_process.put("k", "from other process")
+
+        threading.Thread(target=_finish).start()
+        store = EventAnalysisStore(collection)
+        analysis, cached = store.get_or_generate("k", lambda: "local", wait_seconds=2, poll_seconds=0.02)
+        self.assertEqual((analysis, cached), ("from other process", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
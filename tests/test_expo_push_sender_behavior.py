@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import json
+import sys
+import threading
+import time
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+try:
+    from utils.expo_push_sender import ExpoPushSender, ExpoReceiptPoller
+    from utils.http_client import HttpClient
+    SENDER_AVAILABLE = True
+except ImportError:  # requests is not installed in minimal environments
+    SENDER_AVAILABLE = False
+
+from tests.fake_mongo import FakeCollection  # noqa: E402
+
+
+class _ExpoStandIn(BaseHTTPRequestHandler):
+    """Expo push API stand-in: tickets for /send, receipts for /getReceipts."""
+
+    rate_limit_next = 0
+    fail_next = 0
+    in_flight = 0
+    max_in_flight = 0
+    requests = 0
+    lock = threading.Lock()
+
+    def log_message(self, *_args):
+        pass
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = _ExpoStandIn
+        with cls.lock:
+            cls.requests += 1
+            rejected = None
+            if cls.fail_next > 0:
+                cls.fail_next -= 1
+                rejected = 503
+            elif cls.rate_limit_next > 0:
+                cls.rate_limit_next -= 1
+                rejected = 429
+            else:
+                cls.in_flight += 1
+                cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        if rejected == 503:
+            self._reply(503, {"errors": [{"code": "INTERNAL_SERVER_ERROR"}]})
+            return
+        if rejected == 429:
+            self._reply(429, {"errors": [{"code": "TOO_MANY_REQUESTS"}]}, {"Retry-After": "0"})
+            return
+        try:
+            if self.path == "/send":
+                time.sleep(0.05)
+                tickets = []
+                for message in payload:
+                    token = message["to"]
+                    if "dead" in token:
+                        tickets.append({"status": "error", "details": {"error": "DeviceNotRegistered"}})
+                    elif "busy" in token:
+                        tickets.append({"status": "error", "details": {"error": "MessageRateExceeded"}})
+                    else:
+                        tickets.append({"status": "ok", "id": f"t-{token}"})
+                self._reply(200, {"data": tickets})
+            else:
+                receipts = {}
+                for ticket_id in payload["ids"]:
+                    if "late" in ticket_id:
+                        continue  # receipt not ready yet
+                    if "gone" in ticket_id:
+                        receipts[ticket_id] = {"status": "error", "details": {"error": "DeviceNotRegistered"}}
+                    else:
+                        receipts[ticket_id] = {"status": "ok"}
+                self._reply(200, {"data": receipts})
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+@unittest.skipUnless(SENDER_AVAILABLE, "requests is not installed")
+class ExpoPushSenderBehaviorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _ExpoStandIn)
+        base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.push_url = f"{base_url}/send"
+        cls.receipts_url = f"{base_url}/getReceipts"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        _ExpoStandIn.rate_limit_next = 0
+        _ExpoStandIn.fail_next = 0
+        _ExpoStandIn.max_in_flight = 0
+        _ExpoStandIn.requests = 0
+
+    def _sender(self, **kwargs):
+        return ExpoPushSender(client=HttpClient(), push_url=self.push_url, receipts_url=self.receipts_url,
+                              backoff_seconds=0.01, **kwargs)
+
+    def test_batches_are_sent_concurrently_and_outcomes_keep_order(self):
+        sender = self._sender(max_in_flight=4)
+        messages = [{"to": f"tok{i}"} for i in range(400)]
+
+        outcomes = sender.send(messages)
+
+        self.assertEqual(_ExpoStandIn.requests, 4)
+        self.assertGreater(_ExpoStandIn.max_in_flight, 1)
+        self.assertEqual([o["ticket_id"] for o in outcomes], [f"t-tok{i}" for i in range(400)])
+        self.assertEqual(sender.stats()["ok"], 400)
+
+    def test_rate_limit_pauses_and_retries(self):
+        _ExpoStandIn.rate_limit_next = 2
+        sender = self._sender(max_in_flight=2)
+
+        outcomes = sender.send([{"to": "tok"}])
+
+        self.assertEqual(outcomes[0]["status"], "ok")
+        self.assertEqual(sender.stats()["rate_limited"], 2)
+
+    def test_gives_up_as_transient_after_max_retries(self):
+        _ExpoStandIn.rate_limit_next = 5
+        sender = self._sender(max_retries=1)
+
+        self.assertEqual(sender.send([{"to": "tok"}])[0], {"status": "retry", "error": "HTTP 429", "ticket_id": None})
+
+    def test_server_error_is_not_resent_but_receipts_are_refetched(self):
+        _ExpoStandIn.fail_next = 1
+        sender = self._sender()
+
+        # Expo may have accepted the batch before failing: leave the retry to the outbox.
+        self.assertEqual(sender.send([{"to": "tok"}])[0], {"status": "retry", "error": "HTTP 503", "ticket_id": None})
+        self.assertEqual(_ExpoStandIn.requests, 1)
+
+        _ExpoStandIn.fail_next = 1
+        self.assertEqual(sender.get_receipts(["t-tok"]), {"t-tok": {"status": "ok"}})
+        self.assertEqual(_ExpoStandIn.requests, 3)
+
+    def test_ticket_errors_are_classified(self):
+        outcomes = self._sender().send([{"to": "dead-1"}, {"to": "busy-1"}, {"to": "ok-1"}])
+        self.assertEqual([o["status"] for o in outcomes], ["failed", "retry", "ok"])
+        self.assertEqual(outcomes[0]["error"], "DeviceNotRegistered")
+
+    def test_receipt_poll_records_failures_and_prunes_dead_tokens_in_bulk(self):
+        old = datetime.now(timezone.utc) - timedelta(minutes=30)
+        tickets = FakeCollection([
+            {"_id": "t-ok", "token": "a", "delivery_id": "d1", "sent_at": old},
+            {"_id": "t-gone-1", "token": "b", "delivery_id": "d2", "sent_at": old},
+            {"_id": "t-gone-2", "token": "c", "delivery_id": "d3", "sent_at": old},
+            {"_id": "t-late", "token": "d", "delivery_id": "d4", "sent_at": old},
+            {"_id": "t-fresh", "token": "e", "delivery_id": "d5", "sent_at": datetime.now(timezone.utc)},
+        ])
+        deliveries = FakeCollection({"_id": f"d{i}", "status": "sent"} for i in range(1, 6))
+        prune_calls = []
+        poller = ExpoReceiptPoller(self._sender(), tickets=tickets, deliveries=deliveries,
+                                   prune_tokens=lambda tokens: prune_calls.append(tokens) or len(tokens))
+
+        result = poller.poll_once()
+
+        self.assertEqual(result, {"checked": 4, "ok": 1, "error": 2, "pruned": 2})
+        self.assertEqual(prune_calls, [["b", "c"]])
+        self.assertEqual(sorted(tickets.docs), ["t-fresh", "t-late"])
+        self.assertEqual(deliveries.docs["d2"]["receipt_error"], "DeviceNotRegistered")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+import threading
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+try:
+    from utils.http_client import HttpClient, backoff_delay
+    from utils.tradingview_handler import calendar_window
+    HTTP_CLIENT_AVAILABLE = True
+except ImportError:  # requests is not installed in minimal environments
+    HTTP_CLIENT_AVAILABLE = False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    flaky_failures = 0
+    posts = 0
+
+    def log_message(self, *_args):
+        pass
+
+    def do_POST(self):
+        _Handler.posts += 1
+        self.send_response(503)
+        self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.startswith("/etag"):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = b'{"value": 1}'
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.path.startswith("/flaky") and _Handler.flaky_failures > 0:
+            _Handler.flaky_failures -= 1
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+
+@unittest.skipUnless(HTTP_CLIENT_AVAILABLE, "requests is not installed")
+class HttpClientBehaviorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def test_conditional_get_reuses_cached_body_on_304(self):
+        client = HttpClient()
+        first = client.conditional_get(f"{self.base_url}/etag", upstream="local")
+        second = client.conditional_get(f"{self.base_url}/etag", upstream="local")
+
+        self.assertEqual(first.json(), {"value": 1})
+        self.assertIs(second, first)
+        self.assertEqual(client.stats()["local"]["not_modified"], 1)
+
+    def test_calendar_window_is_stable_within_a_day(self):
+        morning = calendar_window(3, 7, now=datetime(2026, 10, 19, 0, 5, tzinfo=timezone.utc))
+        evening = calendar_window(3, 7, now=datetime(2026, 10, 19, 23, 55, tzinfo=timezone.utc))
+
+        self.assertEqual(morning, evening)
+        self.assertEqual(morning, ("2026-10-16T00:00:00.000Z", "2026-10-27T00:00:00.000Z"))
+
+    def test_retries_retryable_status_then_succeeds(self):
+        _Handler.flaky_failures = 2
+        client = HttpClient()
+        response = client.get(f"{self.base_url}/flaky", upstream="local", retries=2, backoff=0.01)
+
+        self.assertEqual(response.status_code, 200)
+        stats = client.stats()["local"]
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(stats["latency"]["count"], 3)
+
+    def test_post_is_not_replayed_after_server_error(self):
+        _Handler.posts = 0
+        client = HttpClient()
+        response = client.post(f"{self.base_url}/submit", upstream="local-post", retries=2, backoff=0.01)
+
+        self.assertEqual((response.status_code, _Handler.posts), (503, 1))
+        self.assertEqual(client.stats()["local-post"]["retries"], 0)
+
+    def test_backoff_is_bounded(self):
+        for attempt in range(10):
+            self.assertLessEqual(backoff_delay(attempt, base=0.5, cap=2.0), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import threading
+import unittest
+
+from backend.utils.job_events import JobEventHub, sse_event
+
+
+class _JobTable:
+    def __init__(self, jobs):
+        self.jobs = {job["job_id"]: dict(job) for job in jobs}
+        self.loads = []
+        self._lock = threading.Lock()
+
+    def load(self, job_ids):
+        with self._lock:
+            self.loads.append(sorted(job_ids))
+            return [dict(self.jobs[job_id]) for job_id in job_ids if job_id in self.jobs]
+
+    def set_status(self, job_id, status, updated_ts):
+        with self._lock:
+            self.jobs[job_id].update(status=status, updated_ts=updated_ts)
+
+
+class JobEventHubBehaviorTest(unittest.TestCase):
+    def test_sse_event_frames_json_payload(self):
+        frame = sse_event("status", {"job_status": "running"}, event_id="7")
+
+        self.assertTrue(frame.endswith("\n\n"))
+        lines = frame.strip().split("\n")
+        self.assertEqual(lines[0], "id: 7")
+        self.assertEqual(lines[1], "event: status")
+        self.assertEqual(json.loads(lines[2][len("data: "):]), {"job_status": "running"})
+
+    def test_watcher_batches_all_subscribed_jobs_into_one_load(self):
+        table = _JobTable([
+            {"job_id": "a", "status": "queued", "updated_ts": 1.0},
+            {"job_id": "b", "status": "queued", "updated_ts": 1.0},
+        ])
+        hub = JobEventHub(table.load, poll_seconds=0.1)
+        first = hub.subscribe("a")
+        second = hub.subscribe("b")
+        try:
+            self.assertEqual(first.get(timeout=2)["status"], "queued")
+            self.assertEqual(second.get(timeout=2)["status"], "queued")
+
+            table.set_status("a", "completed", 2.0)
+            self.assertEqual(first.get(timeout=2)["status"], "completed")
+            self.assertTrue(any(ids == ["a", "b"] for ids in table.loads))
+        finally:
+            hub.unsubscribe(first)
+            hub.unsubscribe(second)
+
+    def test_unchanged_state_is_delivered_once(self):
+        table = _JobTable([{"job_id": "a", "status": "running", "updated_ts": 5.0}])
+        hub = JobEventHub(table.load, poll_seconds=0.1)
+        subscription = hub.subscribe("a", current=dict(table.jobs["a"]))
+        try:
+            self.assertEqual(subscription.get(timeout=1)["status"], "running")
+            self.assertIsNone(subscription.get(timeout=0.4))
+        finally:
+            hub.unsubscribe(subscription)
+
+    def test_publish_pushes_local_changes_immediately(self):
+        hub = JobEventHub(lambda ids: [], poll_seconds=60)
+        subscription = hub.subscribe("a")
+        try:
+            hub.publish({"job_id": "a", "status": "failed", "updated_ts": 3.0})
+            self.assertEqual(subscription.get(timeout=0.5)["status"], "failed")
+        finally:
+            hub.unsubscribe(subscription)
+
+    def test_subscriber_cap_and_release(self):
+        hub = JobEventHub(lambda ids: [], poll_seconds=60, max_subscribers=1)
+        subscription = hub.subscribe("a")
+        self.assertIsNone(hub.subscribe("b"))
+
+        hub.unsubscribe(subscription)
+        hub.unsubscribe(subscription)
+        self.assertEqual(hub.stats()["subscribers"], 0)
+        self.assertIsNotNone(hub.subscribe("b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+import sys
+import threading
+import time
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.job_scheduler import CronTrigger, IntervalTrigger, JobScheduler, OnceTrigger  # noqa: E402
+
+
+def _ts(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+class _Leases:
+    def __init__(self, grant=True):
+        self.grant = grant
+        self.acquired = []
+
+    def acquire(self, job_name, ttl_seconds, slots=1):
+        self.acquired.append(job_name)
+        return job_name if self.grant else None
+
+    def renew(self, lease_id):
+        return self.grant
+
+    def release(self, lease_id):
+        pass
+
+
+class TriggerBehaviorTest(unittest.TestCase):
+    def test_interval_slots_stay_anchored_and_count_missed(self):
+        trigger = IntervalTrigger(60)
+        first = trigger.first_run(1000.0)
+
+        self.assertEqual(trigger.next_run(first, first + 2.5), (first + 60, 0))
+        self.assertEqual(trigger.next_run(first, first + 185), (first + 240, 3))
+
+    def test_cron_fires_on_matching_minutes_in_utc(self):
+        trigger = CronTrigger("*/30 * * * *")
+        self.assertEqual(trigger.first_run(_ts(2026, 3, 2, 12, 7, 30)), _ts(2026, 3, 2, 12, 30))
+        self.assertEqual(trigger.next_run(_ts(2026, 3, 2, 12, 30), _ts(2026, 3, 2, 12, 31)), (_ts(2026, 3, 2, 13, 0), 0))
+        self.assertEqual(trigger.next_run(_ts(2026, 3, 2, 12, 30), _ts(2026, 3, 2, 14, 5)), (_ts(2026, 3, 2, 14, 30), 3))
+
+    def test_cron_weekday_and_hour_ranges(self):
+        trigger = CronTrigger("0 8-9 * * 0-4")
+        # Saturday 2026-03-07 -> Monday 08:00
+        self.assertEqual(trigger.first_run(_ts(2026, 3, 7, 10, 0)), _ts(2026, 3, 9, 8, 0))
+        self.assertEqual(CronTrigger("0 * * * *", run_at_start=True).first_run(123.0), 123.0)
+
+    def test_cron_rejects_unsupported_fields(self):
+        with self.assertRaises(ValueError):
+            CronTrigger("0 0 1 * *")
+        with self.assertRaises(ValueError):
+            CronTrigger("61 * * * *")
+
+
+class JobSchedulerBehaviorTest(unittest.TestCase):
+    def _wait_idle(self, scheduler, name, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while scheduler.stats()[name]["running"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_overrunning_job_is_skipped_not_stacked(self):
+        release = threading.Event()
+        calls = []
+        scheduler = JobScheduler()
+        scheduler.add_job("slow", lambda: calls.append(1) or release.wait(2), IntervalTrigger(60))
+        job = scheduler._jobs["slow"]
+
+        scheduler._dispatch(job)
+        scheduler._dispatch(job)
+        release.set()
+        self._wait_idle(scheduler, "slow")
+
+        stats = scheduler.stats()["slow"]
+        self.assertEqual(calls, [1])
+        self.assertEqual(stats["skipped_runs"]["overrun"], 1)
+        self.assertEqual(stats["runs"], 1)
+        self.assertIsNotNone(stats["last_success_at"])
+        self.assertEqual(stats["duration"]["count"], 1)
+
+    def test_runs_only_while_holding_the_lease(self):
+        leases = _Leases(grant=False)
+        standby = []
+        scheduler = JobScheduler(leases=leases, on_standby=lambda name, msg: standby.append(name))
+        calls = []
+        scheduler.add_job("news_updater", lambda: calls.append(1), IntervalTrigger(60), lease_ttl_seconds=300)
+
+        scheduler._dispatch(scheduler._jobs["news_updater"])
+        self.assertEqual(calls, [])
+        self.assertEqual(standby, ["news_updater"])
+        self.assertEqual(scheduler.stats()["news_updater"]["skipped_runs"]["not_leader"], 1)
+
+        leases.grant = True
+        scheduler._dispatch(scheduler._jobs["news_updater"])
+        self._wait_idle(scheduler, "news_updater")
+        self.assertEqual(calls, [1])
+
+    def test_failures_are_reported_and_one_shot_is_not_rescheduled(self):
+        errors = []
+        scheduler = JobScheduler(on_error=lambda name, msg: errors.append((name, msg)))
+
+        def boom():
+            raise RuntimeError("provider down")
+
+        scheduler.add_job("historical_preload", boom, OnceTrigger())
+        scheduler._dispatch(scheduler._jobs["historical_preload"])
+        self._wait_idle(scheduler, "historical_preload")
+
+        stats = scheduler.stats()["historical_preload"]
+        self.assertEqual(errors, [("historical_preload", "provider down")])
+        self.assertEqual(stats["failures"], 1)
+        self.assertIsNone(stats["next_run_at"])
+        self.assertEqual(stats["trigger"], "once")
+
+    def test_dispatcher_thread_runs_due_jobs(self):
+        ran = threading.Event()
+        scheduler = JobScheduler()
+        thread = threading.Thread(target=scheduler.run, daemon=True)
+        thread.start()
+        try:
+            scheduler.add_job("tick", ran.set, IntervalTrigger(60, start_delay=0.05))
+            self.assertTrue(ran.wait(2))
+        finally:
+            scheduler.stop()
+            thread.join(2)
+
+
+if __name__ == "__main__":
+    unittest.main()
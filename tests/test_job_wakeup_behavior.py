@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from backend.utils.job_wakeup import IdleBackoff, JobWakeup
+
+
+class _UnsupportedError(Exception):
+    code = 40573
+
+
+class _StandaloneCollection:
+    def watch(self, *_args, **_kwargs):
+        raise _UnsupportedError("The $changeStream stage is only supported on replica sets")
+
+
+class _Stream:
+    def __init__(self, changes):
+        self.changes = changes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def __iter__(self):
+        for change in self.changes:
+            time.sleep(0.05)
+            yield change
+        threading.Event().wait()  # keep the stream open like a real cursor
+
+
+class _ReplicaSetCollection:
+    def __init__(self):
+        self.pipelines = []
+
+    def watch(self, pipeline, **_kwargs):
+        self.pipelines.append(pipeline)
+        return _Stream([{"operationType": "insert"}])
+
+
+class IdleBackoffBehaviorTest(unittest.TestCase):
+    def test_doubles_to_cap_and_resets(self):
+        backoff = IdleBackoff(min_seconds=1, max_seconds=5)
+        self.assertEqual([backoff.next_delay() for _ in range(5)], [1, 2, 4, 5, 5])
+        backoff.reset()
+        self.assertEqual(backoff.next_delay(), 1)
+
+
+class JobWakeupBehaviorTest(unittest.TestCase):
+    def test_notify_wakes_waiter_before_timeout(self):
+        wakeup = JobWakeup("test")
+        threading.Timer(0.05, wakeup.notify).start()
+
+        started = time.monotonic()
+        self.assertTrue(wakeup.wait(5))
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertFalse(wakeup.wait(0.01))
+        self.assertEqual(wakeup.stats()["wakeups"], 1)
+        self.assertEqual(wakeup.stats()["idle_timeouts"], 1)
+
+    def test_change_stream_insert_wakes_waiter(self):
+        collection = _ReplicaSetCollection()
+        wakeup = JobWakeup("test")
+        wakeup.watch(collection)
+
+        self.assertTrue(wakeup.wait(2))
+        self.assertEqual(collection.pipelines[0], [{"$match": {"operationType": "insert"}}])
+
+    def test_standalone_server_falls_back_to_backoff(self):
+        wakeup = JobWakeup("test")
+        wakeup.watch(_StandaloneCollection())
+
+        deadline = time.monotonic() + 2
+        while wakeup.stats()["change_stream"] != "unsupported" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(wakeup.stats()["change_stream"], "unsupported")
+        self.assertFalse(wakeup.wait(0.01))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import unittest
+
+from backend.utils.llm_cache import LLMResponseCache, llm_cache_key
+from tests.fake_mongo import FakeCollection
+
+
+class LLMCacheBehaviorTest(unittest.TestCase):
+    def test_key_ignores_whitespace_but_not_model_or_safety(self):
+        base = llm_cache_key("flash", "Analyse  EUR/USD\n now", "balanced")
+        self.assertEqual(base, llm_cache_key("flash", "Analyse EUR/USD now ", "balanced"))
+        self.assertNotEqual(base, llm_cache_key("lite", "Analyse EUR/USD now", "balanced"))
+        self.assertNotEqual(base, llm_cache_key("flash", "Analyse EUR/USD now", "strict"))
+
+    def test_persistent_hit_survives_new_process_cache(self):
+        collection = FakeCollection()
+        key = llm_cache_key("flash", "prompt")
+        LLMResponseCache(collection).put(key, "answer", prompt_type="pair_insight", model="flash")
+
+        fresh = LLMResponseCache(collection)
+        self.assertEqual(fresh.get(key, "pair_insight"), "answer")
+        self.assertIsNone(fresh.get(llm_cache_key("flash", "other"), "pair_insight"))
+        stats = fresh.stats()["by_prompt_type"]["pair_insight"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+    def test_size_bounds(self):
+        collection = FakeCollection()
+        cache = LLMResponseCache(collection, max_entries=3, max_response_chars=10)
+        self.assertFalse(cache.put("too-big", "x" * 11))
+
+        cache.TRIM_EVERY_PUTS = 1
+        for index in range(5):
+            cache.put(f"k{index}", "v")
+            collection.docs[f"k{index}"]["created_at"] = datetime(2026, 1, 1, index, tzinfo=timezone.utc)
+        cache.put("k5", "v")
+        self.assertLessEqual(len(collection.docs), 3)
+        self.assertIn("k5", collection.docs)
+
+
+if __name__ == "__main__":
+    unittest.main()
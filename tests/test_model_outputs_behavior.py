@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import gzip
+import json
+import sys
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.model_outputs import ModelOutputSeries, choose_bucket_seconds, output_row, query_range  # noqa: E402
+from tests.fake_mongo import FakeCollection  # noqa: E402
+
+
+class _FakeSeriesCollection(FakeCollection):
+    """Evaluates the downsample $group in Python."""
+
+    def aggregate(self, pipeline):
+        match, _, group, _ = pipeline
+        bucket_ms = group["$group"]["_id"]["$subtract"][1]["$mod"][1]
+        buckets = {}
+        for row in sorted(self.find(match["$match"]), key=lambda r: r["ts"]):
+            ms = int(row["ts"].timestamp() * 1000)
+            buckets.setdefault(ms - ms % bucket_ms, []).append(row)
+        for start, rows in sorted(buckets.items()):
+            bucket = {"_id": start, "n": len(rows), "lean": rows[-1]["lean"],
+                      "actionable": sum(1 for r in rows if r["actionable"])}
+            for field in ("buy", "sell", "hold", "confidence", "atr_pips"):
+                values = [r[field] for r in rows]
+                bucket.update({f"{field}_min": min(values), f"{field}_max": max(values), f"{field}_last": values[-1]})
+            yield bucket
+
+
+def _result(buy, sell, hold, signal="HOLD", lean="BUY"):
+    return {
+        "signal": signal, "directional_signal": lean, "confidence": max(buy, sell),
+        "probabilities": {"BUY": buy, "SELL": sell, "HOLD": hold},
+        "atr_pips": 7.345, "model_version": "gbdt-v3",
+    }
+
+
+START = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+class ModelOutputSeriesBehaviorTest(unittest.TestCase):
+    def test_output_row_keeps_probabilities_lean_and_atr(self):
+        row = output_row("EUR/USD", _result(61.234, 20.0, 18.766), actionable=False, ts=START)
+
+        self.assertEqual(row["meta"], {"pair": "EUR_USD", "model_version": "gbdt-v3"})
+        self.assertEqual((row["buy"], row["sell"], row["hold"]), (61.23, 20.0, 18.77))
+        self.assertEqual((row["signal"], row["lean"], row["atr_pips"]), ("HOLD", "BUY", 7.34))
+        self.assertIsNone(output_row("EUR_USD", {"error": "no model"}, actionable=False))
+
+    def test_rows_are_written_in_batches(self):
+        collection = _FakeSeriesCollection()
+        series = ModelOutputSeries(collection, flush_rows=5)
+
+        for minute in range(12):
+            series.append(output_row("EUR_USD", _result(50, 30, 20), False, START + timedelta(minutes=minute)))
+        series.append(None)
+
+        self.assertEqual((collection.calls["insert_many"], len(collection.docs)), (2, 10))
+        self.assertEqual(series.stats()["buffered"], 2)
+        self.assertEqual(series.flush(), 2)
+        self.assertEqual(series.stats()["written"], 12)
+
+    def test_failed_flush_keeps_rows_for_the_next_one(self):
+        collection = _FakeSeriesCollection()
+        collection.errors["insert_many"] = RuntimeError("write concern timeout")
+        series = ModelOutputSeries(collection, flush_rows=2)
+
+        for minute in range(3):
+            series.append(output_row("EUR_USD", _result(50, 30, 20), False, START + timedelta(minutes=minute)))
+        del collection.errors["insert_many"]
+        series.flush()
+
+        stamps = [row["ts"] for row in collection.docs.values()]
+        self.assertEqual(len(stamps), 3)
+        self.assertEqual(stamps, sorted(stamps))
+        self.assertEqual(series.stats()["errors"], 2)
+
+    def test_bucket_size_keeps_points_under_the_limit(self):
+        self.assertEqual(choose_bucket_seconds(3600, 300), 60)
+        self.assertEqual(choose_bucket_seconds(3 * 86400, 300), 900)
+        self.assertEqual(choose_bucket_seconds(365 * 86400, 300), 86400)
+
+    def test_query_range_treats_naive_datetimes_as_utc(self):
+        start, end = query_range("2026-10-01T00:00:00", None, 24, now=START + timedelta(days=1))
+        self.assertEqual((start, end), (START, START + timedelta(days=1)))
+
+        start, end = query_range("2026-10-01T00:00:00Z", "2026-10-01T06:00:00", 24)
+        self.assertEqual(end - start, timedelta(hours=6))
+        self.assertEqual(query_range(None, None, 6, now=START), (START - timedelta(hours=6), START))
+
+        for bad in (("2026-10-02T00:00:00", "2026-10-01T00:00:00+00:00"), ("yesterday", None)):
+            with self.assertRaises(ValueError):
+                query_range(*bad, 24)
+
+    def test_downsample_returns_min_max_last_per_bucket(self):
+        collection = _FakeSeriesCollection()
+        series = ModelOutputSeries(collection, flush_rows=100)
+        for minute in range(3 * 24 * 60):
+            buy = 40 + minute % 30
+            row = output_row("EUR_USD", _result(buy, 90 - buy, 10, signal="BUY" if buy >= 65 else "HOLD"),
+                             actionable=buy >= 65, ts=START + timedelta(minutes=minute))
+            series.append(row)
+        series.append(output_row("GBP_USD", _result(50, 30, 20), False, START))
+        series.flush()
+
+        result = series.downsample("EUR_USD", START, START + timedelta(days=3), max_points=300)
+        buy = result["series"]["buy"]
+
+        self.assertEqual((result["bucket_seconds"], result["points"]), (900, 288))
+        self.assertEqual(result["series"]["n"][0], 15)
+        self.assertEqual((buy["min"][0], buy["max"][0], buy["last"][0]), (40.0, 54.0, 54.0))
+        self.assertEqual(result["series"]["actionable"][1], 5)
+        self.assertEqual(result["series"]["t"][1] - result["series"]["t"][0], 900)
+        # Three days of minute rows in a few KB on the wire
+        self.assertLess(len(gzip.compress(json.dumps(result).encode("utf-8"))), 8 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.model_runs import ModelRunRegistry, provenance_ref  # noqa: E402
+from tests.fake_mongo import FakeCollection  # noqa: E402
+
+
+PROVENANCE = {"run_id": "run-7", "model_version": "gbdt-v3", "dataset_hash": "9f2c" * 16, "seed": 42}
+
+
+class ModelRunRegistryBehaviorTest(unittest.TestCase):
+    def setUp(self):
+        self.runs = FakeCollection()
+        self.registry = ModelRunRegistry(self.runs)
+
+    def test_register_writes_each_run_once(self):
+        refs = {self.registry.register(dict(PROVENANCE)) for _ in range(5)}
+
+        self.assertEqual(len(refs), 1)
+        self.assertEqual(self.runs.calls["update_one"], 1)
+        self.assertEqual(self.runs.docs[refs.pop()]["run_id"], "run-7")
+        self.assertIsNone(self.registry.register({}))
+
+    def test_client_supplied_provenance_cannot_take_over_a_run_id(self):
+        forged = dict(PROVENANCE, dataset_hash="forged")
+        self.assertNotEqual(provenance_ref(forged), provenance_ref(PROVENANCE))
+
+    def test_attach_restores_the_original_row_shape_from_cache(self):
+        ref = self.registry.register(dict(PROVENANCE))
+        reader = ModelRunRegistry(self.runs)  # another process: empty cache
+        rows = [{"_id": i, "signal": "BUY", "provenance_ref": ref} for i in range(3)]
+        rows.append({"_id": 9, "signal": "SELL", "model_provenance": {"run_id": "legacy"}})
+
+        reader.attach(rows)
+        reader.attach([{"_id": 10, "provenance_ref": ref}])
+
+        self.assertEqual(rows[0], {"_id": 0, "signal": "BUY", "model_provenance": PROVENANCE})
+        self.assertEqual(rows[3]["model_provenance"], {"run_id": "legacy"})
+        self.assertEqual(self.runs.calls["find"], 1)
+        self.assertEqual(reader.stats()["hits"], 1)
+
+    def test_migration_moves_embedded_provenance_and_is_idempotent(self):
+        other = dict(PROVENANCE, run_id="run-8")
+        signals = FakeCollection(
+            [{"_id": i, "signal": "BUY", "model_provenance": dict(PROVENANCE if i % 2 else other)} for i in range(7)]
+            + [{"_id": 99, "signal": "SELL", "model_provenance": {}}]
+        )
+
+        self.assertEqual(self.registry.migrate(signals, batch_size=3), {"migrated": 7, "runs": 2})
+        self.assertEqual(self.registry.migrate(signals, batch_size=3), {"migrated": 0, "runs": 0})
+
+        self.assertNotIn("model_provenance", signals.docs[1])
+        self.assertEqual(signals.docs[1]["provenance_ref"], provenance_ref(PROVENANCE))
+        self.assertEqual(signals.docs[99]["model_provenance"], {})
+        self.assertEqual(len(self.runs.docs), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -31,5 +31,31 @@ class MongoIndexContractTest(unittest.TestCase):
         )
 
 
+    def test_keyset_sync_indexes_present(self):
+        self.assertIn(
+            "_ensure_index(signals_collection, [('pair', 1), ('created_at', -1), ('_id', -1)], name='idx_signals_pair_created_id')",
+            self.content,
+        )
+        self.assertIn(
+            "_ensure_index(in_app_notifications, [('created_at', -1), ('_id', -1)], name='idx_in_app_created_id')",
+            self.content,
+        )
+
+
+class PushRecipientIndexContractTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.content = (ROOT_DIR / "backend" / "utils" / "push_notifications.py").read_text(encoding="utf-8")
+
+    def test_recipient_indexes_cover_token_cursor(self):
+        self.assertIn('("signal_threshold", 1), ("push_token", 1)],\n                    name="idx_push_signal_recipients"', self.content)
+        self.assertIn('("news_min_priority", 1), ("push_token", 1)],\n                    name="idx_push_news_recipients"', self.content)
+
+    def test_recipient_filters_run_in_the_database(self):
+        self.assertIn('"signal_threshold": {"$lte": confidence}', self.content)
+        self.assertIn('"news_min_priority": {"$lte": event_priority}', self.content)
+        self.assertNotIn('doc.get("news_impact_filter", "high")', self.content)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import unittest
+
+from backend.utils.news_deadlines import AlertDeadlines, news_alert_key, parse_alert_event_time
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def _event(title, minutes_from_now, formatted=False):
+    event_time = NOW + timedelta(minutes=minutes_from_now)
+    if formatted:
+        return {"title": title, "date": event_time.strftime("%Y-%m-%d %H:%M")}
+    return {"title": title, "date": event_time.isoformat().replace("+00:00", "Z")}
+
+
+class NewsDeadlinesBehaviorTest(unittest.TestCase):
+    def test_parses_raw_and_formatted_dates(self):
+        self.assertEqual(parse_alert_event_time(_event("CPI", 30)), NOW + timedelta(minutes=30))
+        self.assertEqual(parse_alert_event_time(_event("CPI", 30, formatted=True)), NOW + timedelta(minutes=30))
+        raw = {"title": "NFP", "date": "2026-03-02 12:30", "raw": {"date": "2026-03-02T12:45:00Z"}}
+        self.assertEqual(parse_alert_event_time(raw), NOW + timedelta(minutes=45))
+        self.assertIsNone(parse_alert_event_time({"title": "x", "date": "soon"}))
+
+    def test_alerts_become_due_lead_seconds_before_event(self):
+        deadlines = AlertDeadlines(lead_seconds=600)
+        deadlines.rebuild([_event("Late", 60), _event("Soon", 25), _event("Past", -5)], now=NOW)
+
+        self.assertEqual(len(deadlines), 2)
+        self.assertEqual(deadlines.seconds_until_next(NOW), 15 * 60)
+        self.assertEqual(deadlines.pop_due(NOW + timedelta(minutes=14)), [])
+
+        due = deadlines.pop_due(NOW + timedelta(minutes=15))
+        self.assertEqual([event["title"] for _t, _k, event in due], ["Soon"])
+        self.assertEqual(deadlines.seconds_until_next(NOW + timedelta(minutes=15)), 35 * 60)
+
+    def test_event_learned_inside_lead_window_is_due_immediately(self):
+        deadlines = AlertDeadlines(lead_seconds=600)
+        deadlines.rebuild([_event("CPI", 4)], now=NOW)
+        self.assertEqual(deadlines.seconds_until_next(NOW), 0)
+        self.assertEqual(len(deadlines.pop_due(NOW)), 1)
+
+    def test_rebuild_filters_notified_with_one_lookup(self):
+        lookups = []
+        events = [_event("A", 30), _event("B", 40)]
+
+        def notified(keys):
+            lookups.append(sorted(keys))
+            return {news_alert_key(events[0])}
+
+        deadlines = AlertDeadlines()
+        self.assertEqual(deadlines.rebuild(events, notified_keys=notified, now=NOW), 1)
+        self.assertEqual(len(lookups), 1)
+
+    def test_failed_send_retries_until_event_starts(self):
+        deadlines = AlertDeadlines(lead_seconds=600, retry_seconds=60)
+        deadlines.rebuild([_event("CPI", 10)], now=NOW)
+        event_time, key, event = deadlines.pop_due(NOW)[0]
+
+        self.assertTrue(deadlines.retry_later(event_time, key, event, now=NOW))
+        self.assertEqual(deadlines.seconds_until_next(NOW), 60)
+        self.assertFalse(deadlines.retry_later(event_time, key, event, now=event_time - timedelta(seconds=30)))
+
+    def test_started_events_are_dropped_not_sent(self):
+        deadlines = AlertDeadlines(lead_seconds=600)
+        deadlines.rebuild([_event("CPI", 12)], now=NOW)
+        self.assertEqual(deadlines.pop_due(NOW + timedelta(minutes=13)), [])
+        self.assertEqual(len(deadlines), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
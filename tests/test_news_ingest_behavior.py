@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import unittest
+
+from backend.utils.news_ingest import CalendarIngest, fetch_calendar_ingest
+
+
+def _iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class _FakeTradingView:
+    def __init__(self, events):
+        self.events = events
+        self.calls = []
+
+    def get_events(self, days_back=3, days_forward=7, countries=None):
+        self.calls.append((days_back, days_forward))
+        return list(self.events)
+
+
+class _FakeAlphaVantage:
+    def __init__(self, news):
+        self.news = news
+        self.calls = []
+
+    def get_forex_news(self, limit=10):
+        self.calls.append(limit)
+        return self.news[:limit]
+
+
+class NewsIngestBehaviorTest(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2026, 5, 6, 12, 0, tzinfo=timezone.utc)
+        self.events = [
+            {"event_name": "six_days_ago", "date": _iso(self.now - timedelta(days=6))},
+            {"event_name": "two_days_ago", "date": _iso(self.now - timedelta(days=2))},
+            {"event_name": "in_twelve_hours", "date": _iso(self.now + timedelta(hours=12))},
+            {"event_name": "in_five_days", "date": _iso(self.now + timedelta(days=5))},
+            {"event_name": "undated", "date": None},
+        ]
+
+    def _names(self, events):
+        return [event["event_name"] for event in events]
+
+    def test_windows_partition_the_union_fetch(self):
+        ingest = CalendarIngest(self.events, [], fetched_at=self.now)
+        self.assertEqual(self._names(ingest.window(3, 0)), ["two_days_ago", "undated"])
+        self.assertEqual(self._names(ingest.window(0, 7)), ["in_twelve_hours", "in_five_days", "undated"])
+        self.assertEqual(self._names(ingest.window(1, 1)), ["in_twelve_hours", "undated"])
+        self.assertEqual(self._names(ingest.window(7, 0)), ["six_days_ago", "two_days_ago", "undated"])
+
+    def test_fetch_calls_each_provider_once(self):
+        tradingview = _FakeTradingView(self.events)
+        alphavantage = _FakeAlphaVantage([{"title": str(i)} for i in range(20)])
+
+        ingest = fetch_calendar_ingest(tradingview, alphavantage)
+        self.assertEqual(tradingview.calls, [(7, 7)])
+        self.assertEqual(alphavantage.calls, [10])
+        self.assertEqual(len(ingest.latest_news(6)), 6)
+        self.assertEqual(len(ingest.events), len(self.events))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.notification_outbox import NotificationOutbox  # noqa: E402
+from tests.fake_mongo import FakeCollection  # noqa: E402
+
+
+class _Expo:
+    def __init__(self, outcomes=None):
+        self.outcomes = outcomes or {}
+        self.batches = []
+
+    def send(self, messages):
+        self.batches.append([m["to"] for m in messages])
+        return [{"status": self.outcomes.get(m["to"], "ok"), "error": "boom"} for m in messages]
+
+
+def _outbox(expo, tokens, **kwargs):
+    return NotificationOutbox(
+        outbox=FakeCollection(),
+        deliveries=FakeCollection(),
+        resolve_recipients=lambda kind, payload: list(tokens),
+        build_messages=lambda kind, payload, recipients: [{"to": t, "title": kind} for t in recipients],
+        send_batch=expo.send,
+        owner_id="worker-a",
+        **kwargs,
+    )
+
+
+class NotificationOutboxBehaviorTest(unittest.TestCase):
+    def test_enqueue_writes_one_document_and_dedupes(self):
+        outbox = _outbox(_Expo(), [])
+        first = outbox.enqueue("news", {"title": "CPI"}, dedupe_key="news:cpi")
+        second = outbox.enqueue("news", {"title": "CPI"}, dedupe_key="news:cpi")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(outbox.outbox.docs), 1)
+        self.assertEqual(outbox.stats()["enqueued"], 1)
+        self.assertEqual(outbox.enqueue_once("news", {"title": "CPI"}, dedupe_key="news:cpi"), (first, False))
+        self.assertTrue(outbox.enqueue_once("news", {"title": "PPI"}, dedupe_key="news:ppi")[1])
+
+        outbox.outbox = None
+        self.assertEqual(outbox.enqueue_once("news", {"title": "GDP"}), (None, False))
+
+    def test_fan_out_sends_in_batches_and_completes(self):
+        expo = _Expo()
+        tokens = [f"ExponentPushToken[{i}]" for i in range(250)]
+        outbox = _outbox(expo, tokens + tokens[:5])
+        outbox_id = outbox.enqueue("signal", {"pair": "EUR/USD"})
+
+        self.assertTrue(outbox.run_once())
+        self.assertFalse(outbox.run_once())
+
+        doc = outbox.outbox.docs[outbox_id]
+        self.assertEqual([len(b) for b in expo.batches], [100, 100, 50])
+        self.assertEqual((doc["status"], doc["sent"], doc["failed"], doc["recipients_total"]), ("done", 250, 0, 250))
+        stats = outbox.stats()
+        self.assertEqual(stats["sent"], 250)
+        self.assertEqual(stats["batch_latency"]["count"], 3)
+
+    def test_recipients_are_streamed_into_delivery_rows_in_chunks(self):
+        consumed = []
+
+        def stream(kind, payload):
+            for i in range(2500):
+                consumed.append(i)
+                yield f"tok{i}"
+
+        outbox = _outbox(_Expo(), [], batch_size=1000)
+        outbox.resolve_recipients = stream
+        outbox_id = outbox.enqueue("news", {"impact": "high"})
+        outbox.run_once()
+
+        self.assertEqual(outbox.deliveries.calls["insert_many"], 3)
+        self.assertEqual(len(consumed), 2500)
+        self.assertEqual(outbox.outbox.docs[outbox_id]["sent"], 2500)
+
+    def test_transient_failures_retry_with_backoff_until_attempts_run_out(self):
+        expo = _Expo({"bad": "failed", "flaky": "retry"})
+        outbox = _outbox(expo, ["ok", "bad", "flaky"], max_attempts=2, backoff_seconds=30)
+        outbox_id = outbox.enqueue("news", {"title": "NFP"})
+
+        outbox.run_once()
+        deliveries = outbox.deliveries.docs
+        self.assertEqual(deliveries[f"{outbox_id}:ok"]["status"], "sent")
+        self.assertEqual(deliveries[f"{outbox_id}:bad"]["status"], "failed")
+        flaky = deliveries[f"{outbox_id}:flaky"]
+        self.assertEqual((flaky["status"], flaky["attempts"]), ("pending", 1))
+
+        doc = outbox.outbox.docs[outbox_id]
+        self.assertEqual(doc["status"], "sending")
+        self.assertEqual(doc["available_at"], flaky["next_attempt_at"])
+        self.assertFalse(outbox.run_once())  # retry not due yet
+
+        past = datetime.now(timezone.utc) - timedelta(seconds=1)
+        flaky["next_attempt_at"] = doc["available_at"] = past
+        self.assertTrue(outbox.run_once())
+
+        self.assertEqual(expo.batches[-1], ["flaky"])
+        self.assertEqual(deliveries[f"{outbox_id}:flaky"]["status"], "failed")
+        doc = outbox.outbox.docs[outbox_id]
+        self.assertEqual((doc["status"], doc["sent"], doc["failed"]), ("done", 1, 2))
+
+    def test_expired_claim_is_taken_over_without_duplicate_recipients(self):
+        expo = _Expo()
+        outbox = _outbox(expo, ["a", "b"])
+        outbox_id = outbox.enqueue("security", {"user_id": "u1"})
+        self.assertIsNotNone(outbox.claim())
+        self.assertFalse(outbox.run_once())  # still leased by the first claim
+
+        outbox.outbox.docs[outbox_id]["lease_expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+        self.assertTrue(outbox.run_once())
+        self.assertEqual(expo.batches, [["a", "b"]])
+
+    def test_worker_stops_sending_once_its_claim_is_taken_over(self):
+        expo = _Expo()
+        outbox = _outbox(expo, ["a", "b", "c"], batch_size=1)
+        outbox_id = outbox.enqueue("news", {"title": "FOMC"})
+        send = outbox.send_batch
+
+        def send_then_lose_claim(messages):
+            outcomes = send(messages)
+            outbox.outbox.docs[outbox_id]["lease_owner"] = "worker-b/1234"
+            return outcomes
+
+        outbox.send_batch = send_then_lose_claim
+        self.assertTrue(outbox.run_once())
+
+        doc = outbox.outbox.docs[outbox_id]
+        self.assertEqual(expo.batches, [["a"]])
+        self.assertEqual((doc["status"], doc["lease_owner"]), ("sending", "worker-b/1234"))
+        self.assertEqual(outbox.stats()["claims_lost"], 1)
+
+    def test_resolution_errors_back_off_the_whole_notification(self):
+        outbox = _outbox(_Expo(), [])
+
+        def broken(kind, payload):
+            raise RuntimeError("mongo down")
+
+        outbox.resolve_recipients = broken
+        outbox_id = outbox.enqueue("signal", {})
+        self.assertTrue(outbox.run_once())
+
+        doc = outbox.outbox.docs[outbox_id]
+        self.assertEqual((doc["status"], doc["attempts"], doc["last_error"]), ("pending", 1, "mongo down"))
+        self.assertGreater(doc["available_at"], datetime.now(timezone.utc))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.notification_reads import NotificationReadState  # noqa: E402
+from tests.fake_mongo import FakeCollection  # noqa: E402
+
+
+NOW = datetime.now(timezone.utc)
+VISIBLE = {"$or": [{"type": {"$ne": "news"}}, {"type": "news", "data.impact": {"$in": ["high"]}}]}
+
+
+def _notification(notifications, nid, minutes_ago, ntype="signal", impact=None, read_by=None):
+    notifications.docs[nid] = {
+        "_id": nid,
+        "type": ntype,
+        "data": {"impact": impact} if impact else {},
+        "created_at": NOW - timedelta(minutes=minutes_ago),
+        "expires_at": NOW + timedelta(days=7),
+        "read_by": read_by or [],
+    }
+
+
+class NotificationReadStateBehaviorTest(unittest.TestCase):
+    def setUp(self):
+        self.notifications = FakeCollection()
+        self.states = FakeCollection()
+        self.reads = NotificationReadState(self.states, self.notifications)
+
+    def test_watermark_and_read_set_decide_is_read(self):
+        _notification(self.notifications, "old", 30)
+        _notification(self.notifications, "new", 5)
+        _notification(self.notifications, "newer", 1)
+        self.reads.mark_all("u1")
+        self.states.docs["u1"]["last_read_at"] = NOW - timedelta(minutes=10)
+        self.assertEqual(self.reads.mark_ids("u1", ["old", "new"]), 1)  # "old" is already under the watermark
+
+        is_read = self.reads.is_read_fn(self.reads.get("u1"))
+        self.assertEqual([is_read(self.notifications.docs[n]) for n in ("old", "new", "newer")], [True, True, False])
+
+    def test_unread_count_respects_visibility_and_is_topped_up_incrementally(self):
+        _notification(self.notifications, "sig", 5)
+        _notification(self.notifications, "low-news", 5, ntype="news", impact="low")
+        _notification(self.notifications, "high-news", 5, ntype="news", impact="high")
+
+        self.assertEqual(self.reads.unread_count("u1", VISIBLE, "high|"), 2)
+        cache = self.states.docs["u1"]["unread_cache"]
+        self.assertEqual(cache["count"], 2)
+
+        # Pretend the cache was computed a minute ago, then one notification arrives.
+        cache["counted_at"] = NOW - timedelta(minutes=1)
+        _notification(self.notifications, "sig2", 0.5)
+        self.assertEqual(self.reads.unread_count("u1", VISIBLE, "high|"), 3)
+
+    def test_mark_all_moves_the_watermark_without_touching_notifications(self):
+        _notification(self.notifications, "sig", 5)
+        self.assertEqual(self.reads.unread_count("u1", VISIBLE, "high|"), 1)
+        before = dict(self.notifications.docs["sig"])
+
+        self.reads.mark_all("u1")
+
+        self.assertEqual(self.notifications.docs["sig"], before)
+        self.assertEqual(self.reads.unread_count("u1", VISIBLE, "high|"), 0)
+
+    def test_visibility_change_forces_a_recount(self):
+        _notification(self.notifications, "low-news", 5, ntype="news", impact="low")
+        self.assertEqual(self.reads.unread_count("u1", VISIBLE, "high|"), 0)
+
+        all_news = {"$or": [{"type": {"$ne": "news"}}, {"type": "news", "data.impact": {"$in": ["high", "medium", "low"]}}]}
+        self.assertEqual(self.reads.unread_count("u1", all_news, "high,medium,low|"), 1)
+
+    def test_prefs_version_bump_keeps_read_state(self):
+        _notification(self.notifications, "seen", 5, read_by=["u1"])
+        self.reads.bump_prefs_version("u1")
+        self.reads.bump_prefs_version("u1")
+
+        state = self.reads.get("u1")
+        self.assertEqual(self.reads.prefs_version(state), 2)
+        self.assertEqual(state["read_ids"], ["seen"])
+
+    def test_legacy_read_by_marks_are_carried_over_once(self):
+        _notification(self.notifications, "seen", 5, read_by=["u1"])
+        _notification(self.notifications, "unseen", 5)
+
+        self.assertEqual(self.reads.get("u1")["read_ids"], ["seen"])
+        self.assertEqual(self.reads.unread_count("u1", VISIBLE, "high|"), 1)
+
+        finds = self.notifications.calls["find"]
+        self.reads.get("u1")
+        self.assertEqual(self.notifications.calls["find"], finds)
+
+
+if __name__ == "__main__":
+    unittest.main()
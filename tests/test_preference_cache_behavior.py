@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import time
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.preference_cache import VersionedPreferenceCache  # noqa: E402
+
+
+class VersionedPreferenceCacheBehaviorTest(unittest.TestCase):
+    def setUp(self):
+        self.loads = []
+        self.prefs = {"u1": "high", "u2": "all"}
+
+        def loader(user_id):
+            self.loads.append(user_id)
+            return self.prefs[user_id]
+
+        self.cache = VersionedPreferenceCache(loader, ttl_seconds=60, max_entries=2)
+
+    def test_same_version_is_served_from_memory(self):
+        self.assertEqual(self.cache.get("u1", 0), "high")
+        self.assertEqual(self.cache.get("u1", 0), "high")
+        self.assertEqual(self.loads, ["u1"])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_version_bump_from_another_process_reloads(self):
+        self.cache.get("u1", 0)
+        self.prefs["u1"] = "medium"
+        self.assertEqual(self.cache.get("u1", 1), "medium")
+        self.assertEqual(self.cache.stats()["stale_version"], 1)
+
+    def test_ttl_and_lru_bound_the_cache(self):
+        self.cache.get("u1", 0)
+        self.cache.ttl_seconds = 0.01
+        time.sleep(0.02)
+        self.cache.get("u1", 0)
+        self.assertEqual(self.cache.stats()["expired"], 1)
+
+        self.cache.ttl_seconds = 60
+        self.prefs["u3"] = "high"
+        self.cache.get("u2", 0)
+        self.cache.get("u3", 0)
+        self.assertEqual(self.cache.stats()["entries"], 2)
+        self.loads.clear()
+        self.cache.get("u1", 0)  # evicted as least recently used
+        self.assertEqual(self.loads, ["u1"])
+
+    def test_local_invalidate_drops_the_entry(self):
+        self.cache.get("u1", 0)
+        self.cache.invalidate("u1")
+        self.cache.get("u1", 0)
+        self.assertEqual(self.loads, ["u1", "u1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
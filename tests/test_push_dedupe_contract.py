@@ -0,0 +1,30 @@
+from pathlib import Path
+import unittest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_APP_PATH = ROOT_DIR / "backend" / "app.py"
+PUSH_SERVICE_PATH = ROOT_DIR / "backend" / "utils" / "push_notifications.py"
+
+
+class PushDedupeContractTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = BACKEND_APP_PATH.read_text(encoding="utf-8")
+        cls.push = PUSH_SERVICE_PATH.read_text(encoding="utf-8")
+
+    def test_event_claim_is_a_single_insert_if_absent(self):
+        self.assertIn('{"$setOnInsert": {"notified_at": datetime.now(timezone.utc)}},', self.push)
+        self.assertIn("return result.upserted_id is not None", self.push)
+        self.assertNotIn("def is_event_notified", self.push)
+
+    def test_news_alerts_use_the_claim(self):
+        self.assertEqual(self.app.count("push_service.claim_event_notification(event_key)"), 2)
+        self.assertIn("push_service.release_event_notification(event_key)", self.app)
+
+    def test_dead_tokens_are_pruned_in_bulk(self):
+        self.assertIn('self.push_tokens.delete_many({"push_token": {"$in": list(tokens)}})', self.push)
+        self.assertNotIn('self.push_tokens.delete_one({"push_token": token})', self.push)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import sys
+import unittest
+
+from backend.utils import runtime_profile
+
+
+class RuntimeProfileBehaviorTest(unittest.TestCase):
+    def test_lazy_import_records_first_import_only(self):
+        sys.modules.pop("colorsys", None)
+        runtime_profile._import_timings.pop("colorsys", None)
+
+        module = runtime_profile.lazy_import("colorsys")
+        self.assertIs(module, sys.modules["colorsys"])
+        self.assertIn("colorsys", runtime_profile._import_timings)
+
+        runtime_profile._import_timings.pop("colorsys")
+        self.assertIs(runtime_profile.lazy_import("colorsys"), module)
+        self.assertNotIn("colorsys", runtime_profile._import_timings)
+
+    def test_runtime_report_shape(self):
+        report = runtime_profile.runtime_report("api", {"instance_id": "abc"})
+        self.assertEqual(report["role"], "api")
+        self.assertEqual(report["instance_id"], "abc")
+        self.assertEqual(set(report["heavy_modules_loaded"]), set(runtime_profile.HEAVY_MODULES))
+        self.assertIn("rss_mb", report["memory"])
+        self.assertIn("pss_mb", report["memory"])
+
+
+if __name__ == "__main__":
+    unittest.main()
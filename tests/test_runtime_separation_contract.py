@@ -5,6 +5,8 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 FLY_TOML_PATH = ROOT_DIR / "backend" / "fly.toml"
 START_API_PATH = ROOT_DIR / "backend" / "start-api.sh"
 START_WORKER_PATH = ROOT_DIR / "backend" / "start-worker.sh"
+APP_PATH = ROOT_DIR / "backend" / "app.py"
+GUNICORN_CONF_PATH = ROOT_DIR / "backend" / "gunicorn.conf.py"
 
 
 class RuntimeSeparationContractTest(unittest.TestCase):
@@ -13,6 +15,8 @@ class RuntimeSeparationContractTest(unittest.TestCase):
         cls.fly_toml = FLY_TOML_PATH.read_text(encoding="utf-8")
         cls.start_api = START_API_PATH.read_text(encoding="utf-8")
         cls.start_worker = START_WORKER_PATH.read_text(encoding="utf-8")
+        cls.app_source = APP_PATH.read_text(encoding="utf-8")
+        cls.gunicorn_conf = GUNICORN_CONF_PATH.read_text(encoding="utf-8")
 
     def test_fly_process_groups_include_app_and_worker(self):
         self.assertIn("[processes]", self.fly_toml)
@@ -27,6 +31,20 @@ class RuntimeSeparationContractTest(unittest.TestCase):
         self.assertIn('APP_PROCESS_ROLE="worker"', self.start_worker)
         self.assertIn('BACKGROUND_WORKERS_ENABLED="true"', self.start_worker)
 
+    def test_heavy_stacks_are_not_imported_at_module_load(self):
+        self.assertNotIn("from ml.signal_generator_gbdt import get_signal_generator_gbdt\n", self.app_source.split("def load_signal_generator")[0])
+        self.assertNotIn("from utils.yfinance_handler import", self.app_source)
+        self.assertIn("SIGNAL_MODEL_ENABLED = _env_bool('SIGNAL_MODEL_ENABLED'", self.app_source)
+
+    def test_preload_mode_defers_threads_and_mongo_until_after_fork(self):
+        self.assertIn("--config gunicorn.conf.py", self.start_api)
+        self.assertIn("preload_app =", self.gunicorn_conf)
+        self.assertIn("def post_fork(server, worker):", self.gunicorn_conf)
+        self.assertIn("start_post_fork_services()", self.gunicorn_conf)
+        self.assertIn("def start_post_fork_services():", self.app_source)
+        self.assertIn("_start_thread(_runner)", self.app_source)
+        self.assertIn("push_service.reconnect()", self.app_source)
+
 
 if __name__ == "__main__":
     unittest.main()
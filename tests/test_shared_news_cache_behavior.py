@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import unittest
+
+from backend.utils.shared_news_cache import SNAPSHOT_ID, SharedNewsStore
+from tests.fake_mongo import FakeCollection
+
+
+class _FakeSnapshotCollection(FakeCollection):
+    """Counts full snapshot reads separately from the version probes."""
+
+    def __init__(self):
+        super().__init__()
+        self.full_reads = 0
+
+    def find_one(self, query=None, projection=None, sort=None):
+        if projection is None:
+            self.full_reads += 1
+        return super().find_one(query, projection, sort)
+
+
+class SharedNewsStoreBehaviorTest(unittest.TestCase):
+    def test_reader_sees_new_versions_and_skips_unchanged(self):
+        collection = _FakeSnapshotCollection()
+        writer = SharedNewsStore(collection)
+        reader = SharedNewsStore(collection, check_interval_seconds=0)
+
+        self.assertIsNone(reader.get("upcoming"))
+        self.assertEqual(writer.publish({"upcoming": ["a"]}), 1)
+        self.assertEqual(reader.get("upcoming"), ["a"])
+        self.assertEqual(reader.get("upcoming"), ["a"])
+        self.assertEqual(collection.full_reads, 1)
+
+        writer.publish({"upcoming": ["b"]})
+        self.assertEqual(reader.get("upcoming"), ["b"])
+        self.assertEqual(reader.metadata()["version"], 2)
+        self.assertFalse(reader.metadata()["stale"])
+
+    def test_probe_is_rate_limited_by_check_interval(self):
+        collection = _FakeSnapshotCollection()
+        reader = SharedNewsStore(collection, check_interval_seconds=3600)
+        self.assertIsNone(reader.get("latest"))
+
+        SharedNewsStore(collection).publish({"latest": [1]})
+        self.assertIsNone(reader.get("latest"))
+        self.assertTrue(reader.refresh(force=True))
+        self.assertEqual(reader.get("latest"), [1])
+
+    def test_metadata_marks_old_snapshots_stale(self):
+        collection = _FakeSnapshotCollection()
+        SharedNewsStore(collection).publish({"history": []})
+        collection.docs[SNAPSHOT_ID]["updated_at"] = (datetime.now(timezone.utc) - timedelta(hours=3)).replace(tzinfo=None)
+
+        reader = SharedNewsStore(collection, check_interval_seconds=0, stale_after_seconds=3600)
+        reader.refresh()
+        meta = reader.metadata()
+        self.assertTrue(meta["stale"])
+        self.assertGreaterEqual(meta["age_seconds"], 3 * 3600 - 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import threading
+import time
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from ml.signal_executor import SignalExecutor, SignalExecutorBusy
+from utils.metrics import LatencyHistogram
+
+
+def _square(value):
+    return value * value
+
+
+def _hang(seconds):
+    time.sleep(seconds)
+
+
+class SignalExecutorBehaviorTest(unittest.TestCase):
+    def test_inline_mode_runs_and_records_metrics(self):
+        executor = SignalExecutor(workers=0, max_pending=2)
+        self.assertEqual(executor.run(_square, value=7), 49)
+
+        stats = executor.stats()
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["exec_time"]["count"], 1)
+        self.assertEqual(stats["queue_wait"]["count"], 1)
+
+    def test_rejects_when_pending_limit_reached(self):
+        executor = SignalExecutor(workers=0, max_pending=1)
+        entered = threading.Event()
+        release = threading.Event()
+
+        def _blocking():
+            entered.set()
+            release.wait(5)
+            return "done"
+
+        worker = threading.Thread(target=executor.run, args=(_blocking,))
+        worker.start()
+        self.assertTrue(entered.wait(5))
+
+        with self.assertRaises(SignalExecutorBusy) as ctx:
+            executor.run(_square, value=2)
+        self.assertGreaterEqual(ctx.exception.retry_after, 1)
+
+        release.set()
+        worker.join(5)
+        self.assertEqual(executor.stats()["rejected"], 1)
+        self.assertEqual(executor.run(_square, value=3), 9)
+
+    def test_process_pool_mode(self):
+        executor = SignalExecutor(workers=1, max_pending=2, initializer=None)
+        self.assertEqual(executor.run(_square, value=5), 25)
+        self.assertEqual(executor.stats()["completed"], 1)
+
+    def test_lazy_pool_does_not_fork_a_threaded_process(self):
+        executor = SignalExecutor(workers=1, initializer=None)
+        self.assertIn(executor.stats()["start_method"], ("forkserver", "spawn"))
+
+    def test_prefork_starts_workers_once(self):
+        executor = SignalExecutor(workers=1, max_pending=2, initializer=None)
+        self.assertTrue(executor.prefork())
+        self.assertFalse(executor.prefork())
+        self.assertEqual(executor.run(_square, value=6), 36)
+
+    def test_hung_job_times_out_frees_its_slot_and_recycles_the_pool(self):
+        executor = SignalExecutor(workers=1, max_pending=1, timeout_seconds=1, initializer=None)
+        self.assertEqual(executor.run(_square, value=2), 4)
+
+        with self.assertRaises(TimeoutError):
+            executor.run(_hang, seconds=30)
+
+        self.assertEqual(executor.run(_square, value=4), 16)
+        stats = executor.stats()
+        self.assertEqual((stats["timeouts"], stats["pool_restarts"], stats["in_flight"]), (1, 1, 0))
+
+
+class LatencyHistogramBehaviorTest(unittest.TestCase):
+    def test_percentiles_over_recent_window(self):
+        histogram = LatencyHistogram(max_samples=100)
+        for ms in range(1, 101):
+            histogram.observe(ms / 1000.0)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 100)
+        self.assertEqual(snapshot["p50_ms"], 50.0)
+        self.assertEqual(snapshot["p90_ms"], 90.0)
+        self.assertEqual(snapshot["max_ms"], 100.0)
+        self.assertIsNone(LatencyHistogram().percentile(50))
+
+
+if __name__ == "__main__":
+    unittest.main()
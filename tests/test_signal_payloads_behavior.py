@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import gzip
+import json
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils import fast_json  # noqa: E402
+from utils.signal_payloads import compact_signals, parse_fields  # noqa: E402
+
+PROVENANCE = {"run_id": "run-7", "model_version": "gbdt-v3", "seed": 42, "commit_id": None}
+
+
+def _row(i, run_id="run-7"):
+    return {"_id": f"id{i}", "created_at": "2026-01-05T12:00:00+00:00", "signal": "BUY", "confidence": 92.5,
+            "reason": None, "run_id": run_id, "model_provenance": dict(PROVENANCE, run_id=run_id)}
+
+
+class SignalPayloadsBehaviorTest(unittest.TestCase):
+    def test_fields_become_a_projection_that_keeps_keys(self):
+        self.assertIsNone(parse_fields(""))
+        self.assertEqual(parse_fields("signal, confidence"),
+                         {"signal": 1, "confidence": 1, "_id": 1, "created_at": 1})
+        self.assertEqual(parse_fields("model_provenance")["run_id"], 1)
+        with self.assertRaises(ValueError):
+            parse_fields("signal,password_hash")
+
+    def test_compact_moves_provenance_to_one_entry_per_run(self):
+        rows, provenance = compact_signals([_row(1), _row(2), _row(3, run_id="run-8")])
+
+        self.assertEqual(sorted(provenance), ["run-7", "run-8"])
+        self.assertNotIn("commit_id", provenance["run-7"])
+        self.assertEqual(rows[0], {"_id": "id1", "created_at": "2026-01-05T12:00:00+00:00", "signal": "BUY",
+                                   "confidence": 92.5, "run_id": "run-7"})
+
+    def test_provenance_without_run_id_stays_inline(self):
+        row = _row(1, run_id=None)
+        row["model_provenance"]["run_id"] = None
+        rows, provenance = compact_signals([row])
+        self.assertEqual(provenance, {})
+        self.assertIn("model_provenance", rows[0])
+
+
+class FastJsonBehaviorTest(unittest.TestCase):
+    def test_dumps_round_trips_with_datetimes_and_ids(self):
+        class _Id:
+            def __str__(self):
+                return "abc"
+
+        payload = {"when": datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc), "id": _Id(), "text": "Монгол"}
+        decoded = json.loads(fast_json.dumps(payload))
+        self.assertEqual(decoded["id"], "abc")
+        self.assertEqual(decoded["text"], "Монгол")
+        self.assertTrue(decoded["when"].startswith("2026-01-05T12:00:00"))
+
+    def test_gzip_only_for_large_bodies_and_willing_clients(self):
+        body = fast_json.dumps({"rows": [_row(i) for i in range(50)]})
+        self.assertEqual(fast_json.maybe_gzip(body, "br"), (body, False))
+        self.assertEqual(fast_json.maybe_gzip(body, "gzip;q=0"), (body, False))
+        self.assertEqual(fast_json.maybe_gzip(b"{}", "gzip"), (b"{}", False))
+
+        compressed, gzipped = fast_json.maybe_gzip(body, "gzip, deflate")
+        self.assertTrue(gzipped)
+        self.assertEqual(gzip.decompress(compressed), body)
+
+
+if __name__ == "__main__":
+    unittest.main()
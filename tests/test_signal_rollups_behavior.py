@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.signal_rollups import META_ID, SignalRollups  # noqa: E402
+from tests.fake_mongo import FakeCollection  # noqa: E402
+
+
+class _FakeSignals(FakeCollection):
+    """Answers the rebuild $group the way Mongo would, from raw signal documents."""
+
+    def aggregate(self, pipeline, allowDiskUse=False):
+        groups = {}
+        for doc in sorted(self.docs.values(), key=lambda d: d["created_at"]):
+            if doc.get("source") not in ("auto", None):
+                continue
+            key = (doc["pair"].replace("/", "_"), doc["created_at"].strftime("%Y-%m-%d"), doc["signal"])
+            row = groups.setdefault(key, {"n": 0, "conf_sum": 0.0, "conf_n": 0, "conf_max": None, "conf_min": None})
+            row["n"] += 1
+            row["conf_sum"] += doc["confidence"]
+            row["conf_n"] += 1
+            row["conf_max"] = doc["confidence"] if row["conf_max"] is None else max(row["conf_max"], doc["confidence"])
+            row["conf_min"] = doc["confidence"] if row["conf_min"] is None else min(row["conf_min"], doc["confidence"])
+            row["last_created_at"] = doc["created_at"]
+            row["last_signal"] = doc
+        return [{"_id": {"pair": k[0], "day": k[1], "signal": k[2]}, **row} for k, row in groups.items()]
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def _signal(signal, confidence, days_ago=0, minutes=0, pair="EUR_USD", source="auto"):
+    return {"_id": f"{signal}-{confidence}-{days_ago}-{minutes}", "pair": pair, "signal": signal,
+            "confidence": confidence, "source": source,
+            "created_at": NOW - timedelta(days=days_ago, minutes=minutes)}
+
+
+class SignalRollupsBehaviorTest(unittest.TestCase):
+    def setUp(self):
+        self.rollups = SignalRollups(FakeCollection(), _FakeSignals([]), trusted_match={"source": {"$in": ["auto", None]}})
+
+    def test_summary_is_unavailable_until_built(self):
+        self.assertIsNone(self.rollups.summary("EUR_USD"))
+
+    def test_recorded_signals_roll_up_in_one_read(self):
+        self.rollups.ensure_built()
+        for doc in (_signal("BUY", 91.0, days_ago=2), _signal("SELL", 97.5, days_ago=1), _signal("BUY", 93.0)):
+            self.rollups.record(doc)
+
+        reads = self.rollups.collection.calls["find"]
+        stats, last = self.rollups.summary("EUR/USD")
+        self.assertEqual(self.rollups.collection.calls["find"], reads + 1)
+        self.assertEqual(stats, {"total_signals": 3, "buy_count": 2, "sell_count": 1, "hold_count": 0,
+                                 "avg_confidence": 93.83, "max_confidence": 97.5, "min_confidence": 91.0})
+        self.assertEqual(last["confidence"], 93.0)
+
+        stats, last = self.rollups.summary("EUR_USD", days=2)
+        self.assertEqual((stats["total_signals"], stats["buy_count"], stats["sell_count"]), (2, 1, 1))
+
+    def test_rebuild_matches_incremental_records(self):
+        history = [_signal("BUY", 90.0 + i, days_ago=i % 3, minutes=i) for i in range(6)]
+        history += [_signal("SELL", 95.0, days_ago=1), _signal("BUY", 99.0, source="manual")]
+        rebuilt = SignalRollups(FakeCollection(), _FakeSignals(history), trusted_match={})
+        rebuilt.ensure_built()
+        self.assertIn(META_ID, rebuilt.collection.docs)
+
+        incremental = self.rollups
+        incremental.ensure_built()
+        for doc in sorted(history, key=lambda d: d["created_at"]):
+            if doc["source"] == "auto":
+                incremental.record(doc)
+
+        for days in (None, 1, 3):
+            self.assertEqual(rebuilt.summary("EUR_USD", days=days), incremental.summary("EUR_USD", days=days))
+
+    def test_rebuild_runs_once(self):
+        self.rollups.ensure_built()
+        self.rollups.record(_signal("BUY", 92.0))
+        SignalRollups(self.rollups.collection, _FakeSignals([])).ensure_built()
+        self.assertEqual(self.rollups.summary("EUR_USD")[0]["total_signals"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
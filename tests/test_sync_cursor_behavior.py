@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from utils.sync_cursor import CursorError, decode_cursor, encode_cursor, fetch_page, page_cursors, page_etag  # noqa: E402
+from tests.fake_mongo import FakeCollection  # noqa: E402
+
+
+BASE = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+
+def _docs(n, same_time_every=1):
+    # Several documents share a created_at so the _id tie-break is exercised.
+    return [{"_id": f"id{i:03d}", "pair": "EUR_USD", "created_at": BASE + timedelta(seconds=i // same_time_every)}
+            for i in range(n)]
+
+
+class SyncCursorBehaviorTest(unittest.TestCase):
+    def test_cursor_round_trips_and_rejects_garbage(self):
+        doc = {"_id": "abc", "created_at": BASE.replace(tzinfo=None)}
+        self.assertEqual(decode_cursor(encode_cursor(doc)), (BASE, "abc"))
+        with self.assertRaises(CursorError):
+            decode_cursor("not-a-cursor")
+
+    def test_before_walks_back_without_gaps_or_duplicates(self):
+        collection = FakeCollection(_docs(25, same_time_every=3))
+        seen, before = [], None
+        while True:
+            page, has_more = fetch_page(collection, {"pair": "EUR_USD"}, 10, before=before)
+            seen.extend(d["_id"] for d in page)
+            if not has_more:
+                break
+            before = decode_cursor(page_cursors(page)["next_before"])
+        self.assertEqual(seen, [f"id{i:03d}" for i in reversed(range(25))])
+
+    def test_since_returns_only_new_items_oldest_page_first(self):
+        collection = FakeCollection(_docs(5, same_time_every=2))
+        first, _ = fetch_page(collection, {"pair": "EUR_USD"}, 3)
+        since_token = page_cursors(first)["next_since"]
+
+        page, has_more = fetch_page(collection, {"pair": "EUR_USD"}, 3, since=decode_cursor(since_token))
+        self.assertEqual((page, has_more), ([], False))
+        self.assertEqual(page_cursors(page, since_token)["next_since"], since_token)
+
+        collection.insert_many([{"_id": f"new{i}", "pair": "EUR_USD", "created_at": BASE + timedelta(minutes=1, seconds=i)}
+                                for i in range(5)])
+        page, has_more = fetch_page(collection, {"pair": "EUR_USD"}, 3, since=decode_cursor(since_token))
+        self.assertEqual([d["_id"] for d in page], ["new2", "new1", "new0"])
+        self.assertTrue(has_more)
+        page, has_more = fetch_page(collection, {"pair": "EUR_USD"}, 3,
+                                    since=decode_cursor(page_cursors(page)["next_since"]))
+        self.assertEqual(([d["_id"] for d in page], has_more), (["new4", "new3"], False))
+
+    def test_etag_tracks_page_keys_and_extra_state(self):
+        docs = _docs(3)
+        self.assertEqual(page_etag(docs, 1), page_etag([dict(d) for d in docs], 1))
+        self.assertNotEqual(page_etag(docs, 1), page_etag(docs, 2))
+        self.assertNotEqual(page_etag(docs, 1), page_etag(docs[:2], 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
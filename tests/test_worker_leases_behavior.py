@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import unittest
+
+from backend.utils.worker_leases import LeaseManager, lease_ids
+from tests.fake_mongo import FakeCollection
+
+
+def _expire(collection, lease_id):
+    collection.docs[lease_id]["expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+
+class WorkerLeasesBehaviorTest(unittest.TestCase):
+    def test_lease_ids_keep_singleton_name(self):
+        self.assertEqual(lease_ids("news_updater"), ["news_updater"])
+        self.assertEqual(lease_ids("pair_analysis_worker", 3), [
+            "pair_analysis_worker#0", "pair_analysis_worker#1", "pair_analysis_worker#2",
+        ])
+
+    def test_singleton_has_one_leader(self):
+        collection = FakeCollection()
+        first = LeaseManager(collection, owner_id="a")
+        second = LeaseManager(collection, owner_id="b")
+
+        self.assertEqual(first.acquire("news_updater", 300), "news_updater")
+        self.assertIsNone(second.acquire("news_updater", 300))
+
+        _expire(collection, "news_updater")
+        self.assertEqual(second.acquire("news_updater", 300), "news_updater")
+
+    def test_slots_are_shared_across_processes(self):
+        collection = FakeCollection()
+        first = LeaseManager(collection, owner_id="a")
+        second = LeaseManager(collection, owner_id="b")
+
+        self.assertEqual(first.acquire("pair_analysis_worker", 900, slots=2), "pair_analysis_worker#0")
+        self.assertEqual(second.acquire("pair_analysis_worker", 900, slots=2), "pair_analysis_worker#1")
+        self.assertIsNone(first.acquire("pair_analysis_worker", 900, slots=2))
+
+        second.release("pair_analysis_worker#1")
+        self.assertEqual(first.acquire("pair_analysis_worker", 900, slots=2), "pair_analysis_worker#1")
+
+    def test_one_heartbeat_write_renews_every_lease_and_detects_takeover(self):
+        collection = FakeCollection()
+        leases = LeaseManager(collection, owner_id="a", heartbeat_seconds=3600)
+        held = [leases.acquire(name, 300) for name in ("news_updater", "news_scheduler", "signal_generator")]
+
+        leases.heartbeat()
+        self.assertEqual(collection.calls["update_many"], 1)
+        self.assertTrue(all(leases.renew(lease_id) for lease_id in held))
+
+        _expire(collection, "news_scheduler")
+        self.assertEqual(LeaseManager(collection, owner_id="b").acquire("news_scheduler", 300), "news_scheduler")
+        leases.heartbeat()
+
+        self.assertFalse(leases.renew("news_scheduler"))
+        self.assertTrue(leases.renew("news_updater"))
+        self.assertEqual(leases.stats()["lost"], ["news_scheduler"])
+
+    def test_hung_job_stops_being_renewed_and_loses_its_lease(self):
+        collection = FakeCollection()
+        clock = [1000.0]
+        leases = LeaseManager(collection, owner_id="a", heartbeat_seconds=3600, clock=lambda: clock[0])
+        stuck = leases.acquire("news_scheduler", 300)
+        busy = leases.acquire("notification_fanout", 300)
+        stuck_expires_at = collection.docs[stuck]["expires_at"]
+
+        clock[0] += 200
+        self.assertTrue(leases.renew(busy))
+        clock[0] += 200  # news_scheduler has not called renew() for 400 s
+        leases.heartbeat()
+
+        self.assertEqual(collection.docs[stuck]["expires_at"], stuck_expires_at)
+        self.assertGreater(collection.docs[busy]["expires_at"], stuck_expires_at)
+        self.assertEqual(leases.stats()["stalled"], ["news_scheduler"])
+        self.assertFalse(leases.renew(stuck))
+
+        _expire(collection, stuck)
+        self.assertEqual(LeaseManager(collection, owner_id="b").acquire("news_scheduler", 300), "news_scheduler")
+
+    def test_without_collection_every_lease_is_granted(self):
+        leases = LeaseManager(None, owner_id="a")
+        self.assertEqual(leases.acquire("pair_analysis_worker", 900, slots=2), "pair_analysis_worker#0")
+        self.assertEqual(leases.acquire("pair_analysis_worker", 900, slots=2), "pair_analysis_worker#1")
+        self.assertTrue(leases.renew("pair_analysis_worker#1"))
+
+
+if __name__ == "__main__":
+    unittest.main()